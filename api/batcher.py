@@ -0,0 +1,122 @@
+"""
+Micro-batching asynchrone des requêtes /predict.
+
+Les requêtes concurrentes sont regroupées pendant au plus max_wait_ms
+(ou jusqu'à max_batch_size clients), puis scorées en un seul appel
+vectorisé (modèle compilé + TreeSHAP) exécuté hors de la boucle
+d'événements. Chaque appelant récupère son résultat via une future.
+
+Une requête qui arrive alors qu'aucun lot n'est en cours de scoring est
+scorée tout de suite (un client seul n'attend pas la fenêtre) ; celles qui
+arrivent pendant un scoring s'accumulent et partent dès qu'il se termine
+(ou à l'échéance de la fenêtre).
+"""
+import asyncio
+import os
+import threading
+
+from starlette.concurrency import run_in_threadpool
+
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "1") == "1"
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "2"))
+MICROBATCH_MAX_QUEUE = int(os.getenv("MICROBATCH_MAX_QUEUE", "1024"))
+
+
+class QueueFullError(RuntimeError):
+    """Trop de requêtes en attente de scoring"""
+
+
+class MicroBatcher:
+    """Regroupe les appels concurrents en lots scorés par score_fn(records)"""
+
+    def __init__(self, score_fn, max_batch_size=MICROBATCH_MAX_SIZE,
+                 max_wait_ms=MICROBATCH_MAX_WAIT_MS, max_queue=MICROBATCH_MAX_QUEUE,
+                 enabled=MICROBATCH_ENABLED):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.enabled = enabled
+
+        self._pending = []
+        self._timer = None
+        self._in_flight = 0  # lots en cours de scoring
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "rejected": 0,
+            "max_batch_size_seen": 0,
+            "max_queue_depth": 0,
+        }
+
+    async def submit(self, record):
+        """Ajoute un client au lot courant et attend son résultat"""
+        if len(self._pending) >= self.max_queue:
+            self._count(rejected=1)
+            raise QueueFullError(f"File de scoring pleine ({self.max_queue} requêtes)")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((record, future))
+        self._count(requests=1, queue_depth=len(self._pending))
+
+        if len(self._pending) >= self.max_batch_size or self._in_flight == 0:
+            self._flush(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush, loop)
+
+        return await future
+
+    def stats(self):
+        """Compteurs : requêtes, lots, taille moyenne et file d'attente"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = len(self._pending)
+        stats["mean_batch_size"] = stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        stats.update(max_size=self.max_batch_size, max_wait_ms=self.max_wait * 1000,
+                     max_queue=self.max_queue, enabled=self.enabled)
+        return stats
+
+    def _flush(self, loop):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        if self._pending:
+            self._timer = loop.call_later(self.max_wait, self._flush, loop)
+
+        self._count(batches=1, batch_size=len(batch))
+        self._in_flight += 1
+        loop.create_task(self._run(batch, loop))
+
+    async def _run(self, batch, loop):
+        try:
+            results = await run_in_threadpool(self.score_fn, [record for record, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            # Les requêtes arrivées pendant ce scoring ont déjà attendu : on les envoie
+            self._in_flight -= 1
+            if self._pending and self._in_flight == 0:
+                self._flush(loop)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _count(self, requests=0, batches=0, rejected=0, batch_size=0, queue_depth=0):
+        with self._stats_lock:
+            s = self._stats
+            s["requests"] += requests
+            s["batches"] += batches
+            s["rejected"] += rejected
+            s["max_batch_size_seen"] = max(s["max_batch_size_seen"], batch_size)
+            s["max_queue_depth"] = max(s["max_queue_depth"], queue_depth)
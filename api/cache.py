@@ -0,0 +1,96 @@
+"""
+Cache LRU / TTL des prédictions, en mémoire du process.
+
+La clé est un hash du vecteur de features canonique (ordre du modèle,
+float64, -0.0 ramené à 0.0, arrondi optionnel à PREDICTION_CACHE_ROUND
+décimales) et de la version du modèle : deux payloads ClientData
+équivalents (ordre des champs, entier / flottant) partagent la même
+entrée. Chaque modèle chargé a son propre cache (api/registry.py), vide
+au chargement et abandonné avec le modèle qu'il remplace.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "1") == "1"
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))  # secondes, 0 = sans expiration
+# Décimales gardées avant hachage (et scoring) ; vide = valeurs exactes
+PREDICTION_CACHE_ROUND = int(os.getenv("PREDICTION_CACHE_ROUND")) if os.getenv("PREDICTION_CACHE_ROUND") else None
+
+
+class PredictionCache:
+    """Cache borné (LRU) avec expiration (TTL) et compteurs"""
+
+    def __init__(self, max_size=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL,
+                 round_decimals=PREDICTION_CACHE_ROUND, enabled=PREDICTION_CACHE_ENABLED):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.round_decimals = round_decimals
+        self.enabled = enabled and max_size > 0
+
+        self._entries = OrderedDict()  # clé -> (échéance, résultat)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def canonical(self, x):
+        """Vecteur de features canonique (celui qui est haché et scoré)"""
+        x = np.asarray(x, dtype=np.float64)
+        if self.round_decimals is not None:
+            x = np.round(x, self.round_decimals)
+        return x + 0.0  # -0.0 -> 0.0
+
+    def key(self, x, model_version):
+        """Clé d'un vecteur canonique pour une version du modèle (None si cache désactivé)"""
+        if not self.enabled:
+            return None
+        digest = hashlib.blake2b(np.ascontiguousarray(x).tobytes(), digest_size=16)
+        digest.update(str(model_version).encode())
+        return digest.digest()
+
+    def get(self, key):
+        """Résultat en cache (copie) ou None"""
+        if key is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                entry = None
+
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        return dict(entry[1])
+
+    def put(self, key, result):
+        """Enregistre un résultat ; l'entrée la moins récemment utilisée sort si le cache est plein"""
+        if key is None:
+            return
+
+        expires = time.monotonic() + self.ttl if self.ttl > 0 else float("inf")
+        with self._lock:
+            self._entries[key] = (expires, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def stats(self):
+        """Compteurs : hits, misses, évictions, expirations et taux de hit"""
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats.update(max_size=self.max_size, ttl=self.ttl, round_decimals=self.round_decimals,
+                     enabled=self.enabled)
+        return stats
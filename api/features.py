@@ -0,0 +1,58 @@
+"""
+Vecteurs de features du modèle construits à partir des champs de
+ClientData, sans pandas ni parcours du dict en Python.
+
+Le constructeur est compilé une fois par modèle chargé : table d'index
+champ du schéma -> position dans feature_names (champs inconnus du modèle
+écartés) et itemgetter sur ces champs. Un client est écrit dans un vecteur
+float64 préalloué par thread dont les autres positions restent à 0, valeur
+des features non fournies (comme fill_value=0 à l'entraînement) ; un lot
+est écrit colonne par colonne dans une matrice.
+"""
+import operator
+import threading
+
+import numpy as np
+from api.schema import ClientData
+
+
+class FeatureBuilder:
+    """Champs de ClientData -> vecteur ou matrice de features dans l'ordre du modèle"""
+
+    def __init__(self, feature_names, fields=tuple(ClientData.model_fields)):
+        index = {name: i for i, name in enumerate(feature_names)}
+        self.n_features = len(index)
+        self.fields = tuple(f for f in fields if f in index)
+        self.positions = np.array([index[f] for f in self.fields], dtype=np.intp)
+
+        # itemgetter renvoie un tuple à partir de deux champs seulement
+        if len(self.fields) > 1:
+            self._values = operator.itemgetter(*self.fields)
+        else:
+            self._values = lambda record: tuple(record[f] for f in self.fields)
+        self._local = threading.local()
+
+    def _get(self, record):
+        try:
+            return self._values(record)
+        except KeyError:
+            return tuple(record.get(f, 0.0) for f in self.fields)
+
+    def vector(self, record):
+        """
+        Vecteur de features d'un client (dict des champs), écrit dans le
+        tampon du thread courant : réécrit à l'appel suivant, à copier s'il
+        doit être conservé
+        """
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = np.zeros(self.n_features)
+        buffer[self.positions] = self._get(record)
+        return buffer
+
+    def matrix(self, records):
+        """Matrice (n, n_features) des features d'une liste de clients"""
+        X = np.zeros((len(records), self.n_features))
+        if records and self.fields:
+            X[:, self.positions] = [self._get(r) for r in records]
+        return X
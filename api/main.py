@@ -1,14 +1,103 @@
-from fastapi import FastAPI
-from api.schema import ClientData
-from api.utils import predict_client
+import os
+import secrets
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from api.batcher import MicroBatcher, QueueFullError
+from api.metrics import BATCH_SIZE, CONTENT_TYPE, Gauge, MetricsMiddleware, lap, render
+from api.schema import Prediction, PredictionBatch
+from api.serialization import (
+    CLIENT_FIELDS, CLIENT_REQUEST_BODY, FastJSONResponse, loads, parse_client, validate_client,
+    validation_errors
+)
+from api.utils import (
+    ModelNotReadyError, ReloadInProgressError, cached_prediction, counterfactual, global_explanation,
+    load_model, model_status, predict_batch, predict_client, registry, start_loading
+)
+
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# Jeton exigé par les routes /admin (en-tête X-Admin-Token) ; vide = routes désactivées
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+
+
+def _score_microbatch(records):
+    BATCH_SIZE.observe(len(records), source="microbatch")
+    if len(records) == 1:  # requête seule : chemin 1-D, sans matrice
+        return [predict_client(records[0], lookup=False)]
+    return predict_batch(records, lookup=False)
+
+
+# Regroupe les appels concurrents à /predict en lots vectorisés
+# (le cache a déjà été consulté par l'endpoint : les lots ne font que l'alimenter)
+batcher = MicroBatcher(_score_microbatch)
+
+
+def _model_info():
+    status = model_status()
+    return {(status["version"] or "", status["status"]): 1}
+
+
+def _cache_lookups():
+    model = registry.current
+    stats = model.cache.stats() if model else {"hits": 0, "misses": 0}
+    return {("hit",): stats["hits"], ("miss",): stats["misses"]}
+
+
+# Jauges de /metrics, lues au moment de l'export
+Gauge("credit_api_model_info", "Modèle servi (version : empreinte du bundle) et état du chargement",
+      _model_info, ("version", "status"))
+Gauge("credit_api_model_reloads_total", "Rechargements à chaud réussis",
+      lambda: model_status()["reloads"], kind="counter")
+Gauge("credit_api_microbatch_queue_depth", "Requêtes /predict en attente de micro-batch",
+      lambda: batcher.stats()["queue_depth"])
+Gauge("credit_api_prediction_cache_lookups_total", "Consultations du cache des prédictions du modèle courant",
+      _cache_lookups, ("result",), kind="counter")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Le modèle se charge en arrière-plan : l'API répond aux sondes immédiatement
+    start_loading()
+    yield
 
 
 # Création de l'application
 app = FastAPI(
     title="API Credit Scoring",
     description="Prédiction du risque de défaut client",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(ModelNotReadyError)
+@app.exception_handler(QueueFullError)
+def unavailable_handler(request, exc):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+def _validated(request):
+    """Fin de l'étape de validation (corps lu, décodé et validé) d'une requête"""
+    start = getattr(request.state, "request_start", None)
+    if start is not None:
+        lap("validation", start)
+
+
+def _json_response(content):
+    """Réponse JSON (orjson), encodage chronométré (étape serialization)"""
+    start = time.perf_counter()
+    response = FastJSONResponse(content)
+    lap("serialization", start)
+    return response
 
 # Route de test
 @app.get("/")
@@ -18,13 +107,154 @@ def root():
         "projet": "REG08 - Credit Scoring ML"
     }
 
+# Sondes de vivacité et de disponibilité
+@app.get("/health/live")
+def health_live():
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+def health_ready():
+    status = model_status()
+    code = 200 if status["status"] == "ready" else 503
+    return JSONResponse(status_code=code, content=status)
+
 # Endpoint de prédiction
-@app.post("/predict")
-def predict(data: ClientData):
+@app.post("/predict", response_model=Prediction, openapi_extra=CLIENT_REQUEST_BODY)
+async def predict(request: Request):
     """
     Prédiction du risque client
-    Entrée : données client
+    Entrée : données client (objet à champs nommés ou tableau compact, voir /predict/fields)
     Sortie : score + décision + explication
     """
-    result = predict_client(data.dict())
-    return result
+    record = parse_client(await request.body())
+    _validated(request)
+
+    # Payload déjà scoré : réponse immédiate, sans micro-batch ni SHAP
+    result = cached_prediction(record)
+    if result is None:
+        if batcher.enabled:
+            result = await batcher.submit(record)
+        else:
+            result = await run_in_threadpool(predict_client, record, False)
+    return _json_response(result)
+
+
+# Recherche contrefactuelle
+@app.post("/counterfactual", openapi_extra=CLIENT_REQUEST_BODY)
+async def counterfactual_endpoint(request: Request):
+    """
+    Plus petite modification des montants (crédit, mensualité, valeur du
+    bien) qui ferait accorder le crédit
+    Entrée : données client
+    Sortie : score actuel + modifications, score et décision après modification
+    """
+    record = parse_client(await request.body())
+    _validated(request)
+    result = await run_in_threadpool(counterfactual, record)
+    return _json_response(result)
+
+
+@app.get("/metrics")
+def metrics():
+    """Métriques au format texte de Prometheus (requêtes, latences par étape, échecs SHAP, lots, modèle)"""
+    return Response(render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/predict/fields")
+def predict_fields():
+    """Ordre des valeurs du format tableau compact ([v1, v2, ...] au lieu d'un objet)"""
+    return {"fields": CLIENT_FIELDS}
+
+
+@app.get("/predict/stats")
+def predict_stats():
+    """Statistiques du micro-batching de /predict"""
+    return batcher.stats()
+
+
+@app.get("/predict/cache/stats")
+def predict_cache_stats():
+    """Compteurs du cache des prédictions du modèle courant (hits, misses, évictions...)"""
+    model = registry.require_nowait()
+    return {**model.cache.stats(), "model_version": model.version}
+
+
+def _parse_batch(body, content_type):
+    """Décode un corps JSON (tableau) ou NDJSON (un client par ligne)."""
+    try:
+        if content_type.split(";")[0].strip() in NDJSON_TYPES:
+            return [loads(line) for line in body.splitlines() if line.strip()]
+        items = loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Corps invalide : {e}")
+
+    if not isinstance(items, list):
+        raise HTTPException(status_code=422, detail="Un tableau de clients est attendu")
+    return items
+
+
+# Endpoint de prédiction par lot
+@app.post("/predict/batch", response_model=PredictionBatch)
+async def predict_batch_endpoint(request: Request, explain: bool = True):
+    """
+    Prédiction pour une liste de clients
+    Entrée : tableau JSON ou NDJSON de données client (objets ou tableaux compacts)
+    (?explain=false : sans facteurs SHAP, pour les grilles de sensibilité)
+    Sortie : une prédiction par client, dans l'ordre d'entrée
+    """
+    items = _parse_batch(await request.body(), request.headers.get("content-type", ""))
+
+    records = []
+    for i, item in enumerate(items):
+        try:
+            records.append(validate_client(item))
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail={"index": i, "errors": validation_errors(e)})
+    _validated(request)
+
+    # Le scoring est CPU-bound : on le sort de la boucle d'événements
+    BATCH_SIZE.observe(len(records), source="batch")
+    results = await run_in_threadpool(predict_batch, records, explain=explain)
+    return _json_response({"predictions": results})
+
+
+# Explication globale du modèle
+@app.get("/explain/global")
+async def explain_global(request: Request):
+    """
+    Importance globale des features : |SHAP| moyen, quantiles et courbes de
+    dépendance, précalculés à l'entraînement (aucun calcul SHAP ici).
+    Réponse conditionnelle : If-None-Match -> 304 si l'ETag n'a pas changé.
+    """
+    cached = global_explanation()
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Explication globale non disponible pour ce modèle")
+
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in (t.strip().removeprefix("W/") for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+# Rechargement à chaud du modèle
+@app.post("/admin/reload")
+async def admin_reload(x_admin_token: str = Header(default="")):
+    """
+    Recharge MODEL_PATH : le nouveau modèle est chargé et chauffé hors de la
+    boucle d'événements, puis substitué d'un coup à l'ancien (qui reste servi
+    en cas d'échec). Renvoie l'état du registre.
+    """
+    if not ADMIN_TOKEN or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Accès administrateur refusé")
+
+    try:
+        await run_in_threadpool(load_model)
+    except ReloadInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail={"error": f"{type(e).__name__}: {e}",
+                                                     "status": model_status()})
+    return model_status()
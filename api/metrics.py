@@ -0,0 +1,230 @@
+"""
+Métriques de l'API au format texte de Prometheus (GET /metrics).
+
+Compteurs, histogrammes et jauges minimalistes, sans dépendance : une
+observation coûte une recherche dichotomique et deux additions sous
+verrou (~1,5 µs), négligeable devant le scoring d'un client. Les jauges sont
+calculées au moment de l'export (état du modèle, file du micro-batcher).
+METRICS_ENABLED=0 désactive les mesures (/metrics reste disponible).
+
+Étapes chronométrées (credit_api_stage_duration_seconds, par appel : un
+client pour /predict hors micro-batch, un bloc sinon) :
+
+    validation      lecture, décodage JSON et validation du corps
+    featurization   vecteur de features canonique et clé du cache
+    inference       probabilité, décision et niveau de risque
+    explanation     facteurs SHAP
+    serialization   encodage JSON de la réponse
+"""
+import bisect
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bornes des histogrammes : latences (secondes) et tailles de lot (clients)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+# Métriques exportées par render(), par nom (une métrique recréée remplace l'ancienne)
+REGISTRY = {}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, description, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # valeurs des labels -> valeur
+        self._lock = threading.Lock()
+        registry[name] = self
+
+    def _key(self, labels):
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _labels(self, key, extra=()):
+        pairs = [*zip(self.labelnames, key), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in pairs) + "}"
+
+    def _items(self):
+        with self._lock:
+            return sorted((key, list(v) if isinstance(v, list) else v) for key, v in self._values.items())
+
+    def render(self):
+        """Lignes HELP, TYPE et échantillons"""
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}",
+                *self._samples()]
+
+    def _samples(self):
+        return [f"{self.name}{self._labels(key)} {_number(value)}" for key, value in self._items()]
+
+
+class Counter(_Metric):
+    """Compteur croissant, par combinaison de labels"""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Histogramme à bornes fixes (seaux cumulés à l'export), somme et nombre d'observations"""
+    kind = "histogram"
+
+    def __init__(self, name, description, labelnames=(), buckets=LATENCY_BUCKETS, registry=REGISTRY):
+        super().__init__(name, description, labelnames, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        if METRICS_ENABLED:
+            self._observe(self._key(labels), value)
+
+    def labels(self, **labels):
+        """Histogramme lié à des valeurs de labels (évite de les recalculer à chaque observation)"""
+        return _BoundHistogram(self, self._key(labels))
+
+    def _observe(self, key, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[i] += 1
+            counts[-1] += value
+
+    def count(self, **labels):
+        """(nombre d'observations, somme)"""
+        counts = self._values.get(self._key(labels))
+        return (sum(counts[:-1]), counts[-1]) if counts else (0, 0.0)
+
+    def _samples(self):
+        lines = []
+        for key, counts in self._items():
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts[:-1]):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{self._labels(key, [('le', _number(float(bound)))])} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_number(counts[-1])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+class _BoundHistogram:
+    __slots__ = ("_metric", "_key")
+
+    def __init__(self, metric, key):
+        self._metric = metric
+        self._key = key
+
+    def observe(self, value):
+        if METRICS_ENABLED:
+            self._metric._observe(self._key, value)
+
+
+class Gauge(_Metric):
+    """Valeur lue à l'export : fn() renvoie un nombre ou {valeurs des labels: nombre}"""
+    kind = "gauge"
+
+    def __init__(self, name, description, fn, labelnames=(), kind="gauge", registry=REGISTRY):
+        super().__init__(name, description, labelnames, registry)
+        self.fn = fn
+        self.kind = kind
+
+    def _items(self):
+        values = self.fn()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return sorted(values.items())
+
+
+# ======================
+# Métriques de l'API
+# ======================
+REQUESTS = Counter("credit_api_requests_total", "Requêtes HTTP par route, méthode et code de statut",
+                   ("endpoint", "method", "status"))
+REQUEST_SECONDS = Histogram("credit_api_request_duration_seconds", "Durée des requêtes HTTP par route",
+                            ("endpoint",))
+STAGE_SECONDS = Histogram("credit_api_stage_duration_seconds",
+                          "Durée des étapes du scoring (validation, featurization, inference, explanation, serialization)",
+                          ("stage",))
+SHAP_FAILURES = Counter("credit_api_shap_failures_total",
+                        "Explications SHAP en échec (prédiction renvoyée sans facteurs), par type d'erreur",
+                        ("error",))
+BATCH_SIZE = Histogram("credit_api_batch_size", "Clients par appel de scoring vectorisé (micro-batch ou /predict/batch)",
+                       ("source",), buckets=BATCH_SIZE_BUCKETS)
+
+
+_STAGES = {}
+
+
+def lap(stage, start):
+    """Enregistre la durée de l'étape commencée à start ; renvoie l'instant de fin"""
+    now = time.perf_counter()
+    histogram = _STAGES.get(stage)
+    if histogram is None:
+        histogram = _STAGES[stage] = STAGE_SECONDS.labels(stage=stage)
+    histogram.observe(now - start)
+    return now
+
+
+def render(registry=REGISTRY):
+    """Toutes les métriques au format texte de Prometheus"""
+    return "\n".join(line for metric in list(registry.values()) for line in metric.render()) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : compte les requêtes et mesure leur durée par route
+    (modèle de chemin, "other" hors routes connues). Marque aussi le début
+    de la requête (request.state.request_start) pour l'étape de validation.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        scope.setdefault("state", {})["request_start"] = start
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "other")
+            REQUESTS.inc(endpoint=endpoint, method=scope["method"], status=status)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
@@ -0,0 +1,273 @@
+"""
+Registre du modèle servi par l'API, rechargeable à chaud.
+
+Tout ce qui dépend du modèle (forme compilée, moteur TreeSHAP, manifeste,
+seuil de décision, explication globale, cache des prédictions) est
+regroupé dans un LoadedModel. Un rechargement construit et chauffe le
+nouveau LoadedModel hors du chemin des requêtes, puis le publie par une
+seule affectation de référence (registry.current) : une requête en cours
+garde l'instance lue à son début, les suivantes voient la nouvelle, sans
+verrou ni attente côté scoring. Un rechargement en échec laisse l'ancien
+modèle en service.
+
+Déclencheurs : surveillance du fichier du modèle et de son explication
+globale (MODEL_WATCH_INTERVAL secondes, thread watcher) ou POST /admin/reload.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+from api.cache import PredictionCache
+from api.features import FeatureBuilder
+from src.bundle import MANIFEST, is_bundle, load_bundle
+from src.compiled import compile_pipeline
+from src.threshold import DEFAULT_DECISION
+from src.treeshap import TreeShapEngine
+
+# Statistiques SHAP globales écrites par src/shap_job.py dans le bundle
+GLOBAL_EXPLANATION_FILE = os.path.join("explain", "global.json")
+
+WARMUP_TOP_K = 5
+
+
+class ModelNotReadyError(RuntimeError):
+    """Le modèle n'est pas (encore) chargé"""
+
+
+class ReloadInProgressError(RuntimeError):
+    """Un rechargement du modèle est déjà en cours"""
+
+
+# ======================
+# Lecture d'un artefact
+# ======================
+def read_model(path):
+    """
+    (CompiledModel, TreeShapEngine, manifeste) depuis un bundle, mappé en
+    mémoire et validé, ou depuis un ancien pickle (compilé à la volée,
+    manifeste None ; seul ce cas importe joblib et sklearn).
+    """
+    if is_bundle(path):
+        return load_bundle(path)
+
+    import joblib
+    new_compiled = compile_pipeline(joblib.load(path))
+    return new_compiled, TreeShapEngine.from_compiled(new_compiled), None
+
+
+def read_global_explanation(path, manifest=None):
+    """
+    (corps JSON, ETag) de explain/global.json du bundle, ou None s'il est
+    absent ou calculé pour un autre modèle (empreinte différente).
+    """
+    file = os.path.join(path, GLOBAL_EXPLANATION_FILE)
+    if not os.path.isfile(file):
+        return None
+
+    with open(file, "rb") as f:
+        body = f.read()
+    if manifest and json.loads(body).get("bundle_sha256") != manifest["sha256"]:
+        return None
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _stat(file):
+    try:
+        stat = os.stat(file)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def artifact_signature(path):
+    """
+    Signature (inode, date, taille) du manifeste d'un bundle et de son
+    explication globale, ou du pickle : change quand un nouvel artefact est
+    écrit (save_bundle remplace le répertoire d'un bloc) et quand
+    explain/global.json apparaît ensuite (pipeline : save_bundle puis
+    explain_global). None si le chemin n'existe pas.
+    """
+    if not os.path.isdir(path):
+        return _stat(path)
+    manifest = _stat(os.path.join(path, MANIFEST))
+    if manifest is None:
+        return None
+    return manifest, _stat(os.path.join(path, GLOBAL_EXPLANATION_FILE))
+
+
+# ======================
+# Modèle chargé
+# ======================
+class LoadedModel:
+    """Un modèle prêt à servir et tout ce qui en dépend (jamais modifié après publication)"""
+
+    def __init__(self, compiled, engine, manifest=None, path=None, shared_block=None):
+        self.compiled = compiled
+        self.engine = engine
+        self.features = FeatureBuilder(compiled.feature_names)
+        self.manifest = manifest
+        self.path = path
+        # Seuil de refus et bornes des niveaux de risque, lus dans la section
+        # "decision" du manifeste (src/threshold.py)
+        self.decision = (manifest or {}).get("decision") or DEFAULT_DECISION
+        self.global_explanation = read_global_explanation(path, manifest) if path else None
+        self.version = manifest["sha256"] if manifest else f"pickle-{time.time_ns()}"
+        self.cache = PredictionCache()
+        self.loaded_at = time.time()
+        # En dernier : le bloc partagé doit survivre aux vues NumPy du modèle
+        self.shared_block = shared_block
+
+    @classmethod
+    def load(cls, path, shm_name=None):
+        """Charge (bundle, pickle ou mémoire partagée) puis chauffe le modèle"""
+        if shm_name:
+            from api.shared_model import attach, shared_manifest
+            compiled, engine, block = attach(shm_name)
+            model = cls(compiled, engine, shared_manifest(block), path, block)
+        else:
+            compiled, engine, manifest = read_model(path)
+            model = cls(compiled, engine, manifest, path)
+        model.warm_up()
+        return model
+
+    def warm_up(self):
+        """Premier passage dans les chemins de scoring (1 ligne et lot) et d'explication"""
+        X = np.zeros((2, self.compiled.n_features))
+        self.compiled.predict_proba_one(X[0])
+        self.compiled.predict_proba(X)
+        self.engine.top_k(self.compiled.transform(X), WARMUP_TOP_K)
+
+
+# ======================
+# Registre
+# ======================
+class ModelRegistry:
+    """Modèle courant, chargement initial en arrière-plan et rechargements à chaud"""
+
+    def __init__(self, path, shm_name=None, load_timeout=60.0, watch_interval=0.0):
+        self.path = path
+        self.shm_name = shm_name
+        self.load_timeout = load_timeout
+        self.watch_interval = watch_interval
+
+        # Lu sans verrou par les requêtes ; remplacé par une seule affectation
+        self.current = None
+
+        self._reload_lock = threading.Lock()  # un chargement à la fois
+        self._state_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._signature = None
+        self._watcher = None
+        self._state = {"status": "idle", "error": None, "load_seconds": None, "model_sha256": None,
+                       "version": None, "loaded_at": None, "reloads": 0, "reloading": False,
+                       "last_reload_error": None}
+
+    def load(self, path=None, shm_name=None):
+        """
+        Charge et chauffe un modèle (self.path, le chemin surveillé, par
+        défaut), puis le publie.
+        Au premier chargement, une erreur passe l'état à "error" ; ensuite,
+        l'ancien modèle reste servi et l'erreur est gardée dans last_reload_error.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            raise ReloadInProgressError("Rechargement du modèle déjà en cours")
+        try:
+            return self._load(path or self.path, shm_name)
+        finally:
+            self._reload_lock.release()
+
+    def _load(self, path, shm_name):
+        start = time.perf_counter()
+        signature = artifact_signature(path)
+        with self._state_lock:
+            self._state["reloading"] = self.current is not None
+
+        try:
+            model = LoadedModel.load(path, shm_name)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            with self._state_lock:
+                self._state["reloading"] = False
+                if self.current is None:
+                    self._state.update(status="error", error=error)
+                else:
+                    self._state["last_reload_error"] = error
+            if path == self.path:
+                self._signature = signature  # pas de nouvel essai sur le même fichier
+            self._ready.set()
+            raise
+
+        previous, self.current = self.current, model
+        if path == self.path:
+            self._signature = signature
+
+        with self._state_lock:
+            self._state.update(
+                status="ready", error=None, load_seconds=time.perf_counter() - start,
+                model_sha256=model.manifest["sha256"] if model.manifest else None,
+                version=model.version, loaded_at=model.loaded_at, reloading=False,
+                last_reload_error=None, reloads=self._state["reloads"] + (previous is not None),
+            )
+        self._ready.set()
+        return model
+
+    def _load_in_background(self):
+        try:
+            self.load(shm_name=self.shm_name)
+        except Exception as e:
+            print("Chargement du modèle impossible:", e)
+
+    def start(self):
+        """Lance le chargement initial (et la surveillance) s'ils n'ont pas déjà commencé"""
+        with self._state_lock:
+            if self._state["status"] != "idle":
+                return
+            self._state["status"] = "loading"
+
+        threading.Thread(target=self._load_in_background, name="model-loader", daemon=True).start()
+        if self.watch_interval > 0:
+            self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        """Recharge le modèle quand son fichier change sur disque"""
+        self._ready.wait()
+        while not self._stopped.wait(self.watch_interval):
+            signature = artifact_signature(self.path)
+            if signature is None or signature == self._signature:
+                continue
+            print(f"Nouveau modèle détecté dans {self.path}, rechargement")
+            try:
+                self.load()
+            except ReloadInProgressError:
+                pass
+            except Exception as e:
+                print("Rechargement du modèle impossible:", e)
+
+    def stop(self):
+        """Arrête la surveillance du fichier du modèle"""
+        self._stopped.set()
+
+    def status(self):
+        """État : idle, loading, ready ou error, version servie et rechargements"""
+        with self._state_lock:
+            return dict(self._state)
+
+    def require(self):
+        """Modèle courant (en attendant le chargement initial au besoin)"""
+        self.start()
+        if not self._ready.wait(self.load_timeout) or self.current is None:
+            raise ModelNotReadyError(self.status()["error"] or "Modèle en cours de chargement")
+        return self.current
+
+    def require_nowait(self):
+        """Modèle courant, sans attendre (appel depuis la boucle d'événements)"""
+        model = self.current
+        if model is None:
+            self.start()
+            raise ModelNotReadyError(self.status()["error"] or "Modèle en cours de chargement")
+        return model
@@ -30,3 +30,20 @@ class ClientData(BaseModel):
     
     # Profession
     OCCUPATION_TYPE_Laborers: int
+
+
+# Réponses (documentation OpenAPI : les endpoints renvoient le JSON déjà encodé)
+class Facteur(BaseModel):
+    feature: str
+    impact: float
+
+
+class Prediction(BaseModel):
+    probabilite_defaut: float
+    decision: str
+    niveau_risque: str
+    facteurs_principaux: list[Facteur]
+
+
+class PredictionBatch(BaseModel):
+    predictions: list[Prediction]
@@ -0,0 +1,94 @@
+"""
+Décodage, validation et encodage JSON des requêtes de scoring.
+
+Un client s'envoie sous deux formes, dans le corps de /predict et
+/counterfactual ou comme élément de /predict/batch :
+
+    {"EXT_SOURCE_1": 0.5, ...}    objet à champs nommés (ClientData)
+    [0.5, 0.6, ...]               tableau compact : valeurs dans l'ordre de CLIENT_FIELDS
+
+Les deux formes sont décodées et validées par pydantic-core en une passe
+(model_validate_json, ou TypeAdapter d'un tuple typé pour le tableau),
+sans passer par la résolution des paramètres de FastAPI. Les corps de
+/predict/batch sont décodés par le même analyseur (pydantic_core.from_json) :
+les deux endpoints acceptent les mêmes valeurs (NaN, Infinity compris). Les
+réponses sont encodées par orjson s'il est installé (sinon json, même
+sortie compacte).
+"""
+import json
+
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import from_json
+from starlette.responses import JSONResponse
+from api.schema import ClientData
+
+try:
+    import orjson
+except ImportError:  # encodage par json, plus lent
+    orjson = None
+
+
+# Ordre des valeurs du format tableau
+CLIENT_FIELDS = tuple(ClientData.model_fields)
+
+_CLIENT_ARRAY = TypeAdapter(tuple[tuple(f.annotation for f in ClientData.model_fields.values())])
+
+# Corps de requête documenté dans OpenAPI (les endpoints lisent le corps brut)
+CLIENT_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"oneOf": [
+            ClientData.model_json_schema(),
+            {**_CLIENT_ARRAY.json_schema(), "title": "ClientDataArray",
+             "description": "Valeurs dans l'ordre : " + ", ".join(CLIENT_FIELDS)},
+        ]}}},
+    }
+}
+
+
+def dumps(content):
+    """Encode en JSON compact (octets UTF-8)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(body):
+    """Décode du JSON comme /predict (pydantic-core : NaN et Infinity acceptés) ; ValueError si invalide"""
+    return from_json(body)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encodée par orjson (repli sur json)"""
+
+    def render(self, content):
+        return dumps(content)
+
+
+def validation_errors(e, prefix=()):
+    """
+    Erreurs de validation sans la valeur reçue ("input") : un NaN ou un
+    Infinity accepté en entrée ne s'encode pas dans la réponse 422
+    """
+    return [{**err, "loc": (*prefix, *err["loc"])} for err in e.errors(include_url=False, include_input=False)]
+
+
+def parse_client(body):
+    """
+    Corps brut (objet ou tableau JSON) -> dict des champs de ClientData.
+    Lève RequestValidationError (422, même format que FastAPI) si invalide.
+    """
+    try:
+        if body.lstrip()[:1] == b"[":
+            return dict(zip(CLIENT_FIELDS, _CLIENT_ARRAY.validate_json(body)))
+        return ClientData.model_validate_json(body).model_dump()
+    except ValidationError as e:
+        raise RequestValidationError(validation_errors(e, prefix=("body",)), body=body)
+
+
+def validate_client(item):
+    """Client déjà décodé (dict ou liste) -> dict des champs ; lève ValidationError"""
+    if isinstance(item, (list, tuple)):
+        return dict(zip(CLIENT_FIELDS, _CLIENT_ARRAY.validate_python(item)))
+    return ClientData.model_validate(item).model_dump()
@@ -0,0 +1,44 @@
+"""
+Service multi-process de l'API.
+
+Le process maître charge le modèle (bundle ou pickle) une seule fois, publie ses
+tableaux en mémoire partagée (api/shared_model.py) puis lance les workers
+uvicorn. Chaque worker s'attache au bloc (MODEL_SHM_NAME) au lieu de
+désérialiser son propre pickle et de reconstruire son moteur SHAP.
+
+Usage : python -m api.serve --workers 4 --port 8000
+"""
+import argparse
+import os
+
+import uvicorn
+
+from api.shared_model import publish
+from api.utils import MODEL_PATH, read_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API Credit Scoring multi-process")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2")))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    compiled, engine, manifest = read_model(args.model)
+    shm = publish(compiled, engine, name=f"credit_scoring_{os.getpid()}", manifest=manifest)
+    print(f"Modèle publié en mémoire partagée : {shm.name} ({shm.size / 1024:.0f} Ko)")
+
+    # Les workers héritent de l'environnement du maître (le chemin sert aux
+    # fichiers annexes du bundle, comme l'explication globale)
+    os.environ["MODEL_SHM_NAME"] = shm.name
+    os.environ["MODEL_PATH"] = args.model
+    try:
+        uvicorn.run("api.main:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Poids du modèle en mémoire partagée pour le service multi-process.
+
+Le process maître écrit une seule fois les tableaux du modèle compilé
+(imputer, scaler, arbres) et du moteur TreeSHAP dans un bloc
+multiprocessing.shared_memory. Chaque worker s'y attache et reconstruit
+ses objets sur des vues NumPy du bloc, sans copie ni unpickling.
+
+Format du bloc : 8 octets (taille de l'en-tête, little endian), en-tête
+JSON (métadonnées et position de chaque tableau), puis les tableaux
+alignés sur 64 octets.
+"""
+import json
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+from src.compiled import CompiledModel
+from src.treeshap import TreeShapEngine
+
+ALIGNMENT = 64
+_HEADER = struct.Struct("<Q")
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def publish(compiled, engine, name=None, manifest=None):
+    """
+    Écrit le modèle et le moteur SHAP dans un nouveau bloc de mémoire partagée,
+    avec le manifeste du bundle (seuil de décision, empreinte) s'il est fourni.
+    Renvoie le SharedMemory : l'appelant le garde ouvert et le libère
+    (close + unlink) à l'arrêt du service.
+    """
+    model_arrays, model_meta = compiled.to_arrays()
+    shap_arrays, shap_meta = engine.to_arrays()
+    arrays = {
+        **{f"model.{k}": np.ascontiguousarray(v) for k, v in model_arrays.items()},
+        **{f"shap.{k}": np.ascontiguousarray(v) for k, v in shap_arrays.items()},
+    }
+
+    # Positions relatives au début de la zone de données
+    layout, offset = {}, 0
+    for key, arr in arrays.items():
+        offset = _align(offset)
+        layout[key] = {"offset": offset, "dtype": arr.dtype.str, "shape": arr.shape}
+        offset += arr.nbytes
+
+    header = json.dumps({"model": model_meta, "shap": shap_meta, "arrays": layout,
+                         "manifest": manifest}).encode()
+    data_start = _align(_HEADER.size + len(header))
+
+    shm = shared_memory.SharedMemory(name=name, create=True, size=data_start + max(offset, 1))
+    _HEADER.pack_into(shm.buf, 0, len(header))
+    shm.buf[_HEADER.size:_HEADER.size + len(header)] = header
+
+    for key, arr in arrays.items():
+        start = data_start + layout[key]["offset"]
+        shm.buf[start:start + arr.nbytes] = arr.tobytes()
+
+    return shm
+
+
+def _open_untracked(name):
+    """
+    Ouvre un bloc existant sans l'inscrire auprès du resource_tracker :
+    le bloc appartient au maître, l'arrêt d'un worker ne doit pas le supprimer.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+    except TypeError:
+        pass
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _read_header(shm):
+    (header_size,) = _HEADER.unpack_from(shm.buf, 0)
+    header = json.loads(bytes(shm.buf[_HEADER.size:_HEADER.size + header_size]))
+    return header, _align(_HEADER.size + header_size)
+
+
+def shared_manifest(shm):
+    """Manifeste publié avec le modèle (None pour un ancien pickle)"""
+    return _read_header(shm)[0].get("manifest")
+
+
+def attach(name):
+    """
+    S'attache au bloc `name` et reconstruit (compiled, engine, shm)
+    sur des vues en lecture seule, sans copie des tableaux.
+    """
+    shm = _open_untracked(name)
+
+    header, data_start = _read_header(shm)
+
+    groups = {"model": {}, "shap": {}}
+    for key, spec in header["arrays"].items():
+        group, field = key.split(".", 1)
+        arr = np.ndarray(tuple(spec["shape"]), dtype=np.dtype(spec["dtype"]),
+                         buffer=shm.buf, offset=data_start + spec["offset"])
+        arr.flags.writeable = False
+        groups[group][field] = arr
+
+    compiled = CompiledModel.from_arrays(groups["model"], header["model"])
+    engine = TreeShapEngine.from_arrays(groups["shap"], header["shap"])
+    return compiled, engine, shm
@@ -1,41 +1,243 @@
-import joblib
-import pandas as pd
-import shap
+import os
+import time
 
-pipeline = joblib.load("models/credit_scoring_model.pkl")
+import numpy as np
+from api.metrics import SHAP_FAILURES, lap
+from api.registry import (  # noqa: F401  (réexportés pour main.py et serve.py)
+    DEFAULT_DECISION, ModelNotReadyError, ModelRegistry, ReloadInProgressError,
+    read_global_explanation, read_model
+)
+from src.counterfactual import search as search_counterfactual
+from src.threshold import RISK_LEVELS
 
-#  Récupérer le dernier élément du pipeline (le modèle ML)
-model = list(pipeline.named_steps.values())[-1]
+# Bundle du modèle (répertoire avec manifest.json) ou ancien pickle joblib
+MODEL_PATH = os.getenv("MODEL_PATH", "models/credit_scoring_model")
 
-feature_names = pipeline.feature_names_in_
+# Bloc de mémoire partagée publié par api/serve.py (service multi-process)
+MODEL_SHM_NAME = os.getenv("MODEL_SHM_NAME")
 
-explainer = shap.TreeExplainer(model)
+# Délai maximal d'attente du chargement du modèle par une requête (secondes)
+MODEL_LOAD_TIMEOUT = float(os.getenv("MODEL_LOAD_TIMEOUT", "60"))
 
-def predict_client(data_dict):
+# Période de surveillance de MODEL_PATH pour le rechargement à chaud (secondes, 0 = désactivée)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "30"))
 
-    df = pd.DataFrame([data_dict])
-    df = df.reindex(columns=feature_names, fill_value=0)
+# Nombre de clients scorés par appel vectorisé dans /predict/batch
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "1000"))
 
-    proba = pipeline.predict_proba(df)[0, 1]
-    decision = "REFUSÉ" if proba > 0.5 else "ACCORDÉ"
+TOP_K_FACTORS = 5
 
-    top_factors = []
+# Variation relative maximale de chaque montant dans la recherche contrefactuelle
+COUNTERFACTUAL_MAX_CHANGE = float(os.getenv("COUNTERFACTUAL_MAX_CHANGE", "0.5"))
+
+# Modèle servi (api/registry.py) : chaque requête lit registry.current une
+# fois et s'en sert jusqu'au bout, même si un rechargement le remplace
+registry = ModelRegistry(MODEL_PATH, MODEL_SHM_NAME, MODEL_LOAD_TIMEOUT, MODEL_WATCH_INTERVAL)
+
+
+# ======================
+# Chargement du modèle
+# ======================
+def load_model(path=None, shm_name=None):
+    """
+    Charge et chauffe le modèle (MODEL_PATH par défaut, ou le bloc de mémoire
+    partagée shm_name) puis le substitue au modèle courant. Renvoie le LoadedModel.
+    """
+    return registry.load(path, shm_name)
+
+
+def start_loading():
+    """Lance le chargement dans un thread s'il n'a pas déjà commencé"""
+    registry.start()
+
+
+def model_status():
+    """État du chargement : idle, loading, ready ou error"""
+    return registry.status()
+
+
+def _require_model():
+    """Modèle courant (attend son chargement au besoin)"""
+    return registry.require()
+
+
+def global_explanation():
+    """
+    (corps JSON, ETag) des statistiques SHAP globales du modèle chargé, ou None.
+    N'attend pas le chargement (appelé depuis la boucle d'événements).
+    """
+    return registry.require_nowait().global_explanation
+
+
+# ======================
+# Prédiction
+# ======================
+def _decision(model, proba):
+    return "REFUSÉ" if proba > model.decision["threshold"] else "ACCORDÉ"
+
+
+def _risk_levels(model, probas):
+    """Niveau de risque de chaque probabilité : Faible (<= borne basse), Moyen, Élevé (> seuil)"""
+    idx = np.searchsorted(model.decision["risk_bands"], probas, side="left")
+    return [RISK_LEVELS[i] for i in np.atleast_1d(idx)]
+
+
+def _top_factors(model, X, k=TOP_K_FACTORS):
+    """
+    Pour chaque ligne de X (features brutes), les k facteurs SHAP
+    de plus fort impact absolu (ordre décroissant).
+    """
+    idx, values = model.engine.top_k(model.compiled.transform(X), k)
+    names = model.compiled.feature_names
+
+    return [
+        [{"feature": names[j], "impact": float(v)} for j, v in zip(row_idx, row_values)]
+        for row_idx, row_values in zip(idx, values)
+    ]
+
+
+def _cache_entry(model, data_dict):
+    """(vecteur de features canonique, clé du cache) d'un client"""
+    x = model.cache.canonical(model.features.vector(data_dict))
+    return x, model.cache.key(x, model.version)
+
+
+def cached_prediction(data_dict):
+    """
+    Prédiction en cache pour ce client, ou None (absente, ou modèle pas
+    encore chargé). Ne bloque pas : appelable depuis la boucle d'événements.
+    """
+    model = registry.current
+    if model is None or not model.cache.enabled:
+        return None
+    return model.cache.get(_cache_entry(model, data_dict)[1])
 
-    try:
-        shap_values = explainer.shap_values(df)
 
-        contributions = pd.DataFrame({
-            "feature": df.columns,
-            "impact": shap_values[0]
-        }).sort_values(by="impact", key=abs, ascending=False)
+def predict_client(data_dict, lookup=True):
+    """Score un client ; lookup=False si le cache a déjà été consulté par l'appelant"""
+    model = _require_model()
 
-        top_factors = contributions.head(5).to_dict(orient="records")
+    start = time.perf_counter()
+    x, key = _cache_entry(model, data_dict)
+    if lookup:
+        cached = model.cache.get(key)
+        if cached is not None:
+            return cached
+    start = lap("featurization", start)
+
+    proba = model.compiled.predict_proba_one(x)
+    decision = _decision(model, proba)
+    niveau = _risk_levels(model, proba)[0]
+    start = lap("inference", start)
+
+    top_factors = []
+
+    try:
+        top_factors = _top_factors(model, x)[0]
 
     except Exception as e:
-        print("SHAP non disponible:", e)
+        SHAP_FAILURES.inc(error=type(e).__name__)
+    lap("explanation", start)
 
-    return {
+    result = {
         "probabilite_defaut": float(proba),
         "decision": decision,
+        "niveau_risque": niveau,
         "facteurs_principaux": top_factors
     }
+    model.cache.put(key, result)
+    return result
+
+
+def predict_batch(records, chunk_size=None, lookup=True, explain=True):
+    """
+    Score une liste de clients (dicts) par blocs de chunk_size lignes :
+    un seul predict_proba et un seul appel SHAP par bloc, pour les clients
+    absents du cache (lookup=False : cache non consulté, seulement alimenté).
+    explain=False : pas de SHAP (facteurs vides, résultats non mis en cache).
+    Les résultats sont renvoyés dans l'ordre d'entrée.
+    """
+    model = _require_model()
+
+    chunk_size = chunk_size or BATCH_CHUNK_SIZE
+    results = []
+
+    for start in range(0, len(records), chunk_size):
+        clock = time.perf_counter()
+        X_chunk = model.cache.canonical(model.features.matrix(records[start:start + chunk_size]))
+        keys = [model.cache.key(x, model.version) for x in X_chunk]
+        chunk_results = [model.cache.get(key) if lookup else None for key in keys]
+        misses = [i for i, r in enumerate(chunk_results) if r is None]
+
+        if misses:
+            X = X_chunk[misses]
+            clock = lap("featurization", clock)
+
+            probas = model.compiled.predict_proba(X)[:, 1]
+            levels = _risk_levels(model, probas)
+            clock = lap("inference", clock)
+
+            factors = [[] for _ in misses]
+            if explain:
+                try:
+                    factors = _top_factors(model, X)
+                except Exception as e:
+                    SHAP_FAILURES.inc(error=type(e).__name__)
+                lap("explanation", clock)
+
+            for i, proba, niveau, top in zip(misses, probas, levels, factors):
+                chunk_results[i] = {
+                    "probabilite_defaut": float(proba),
+                    "decision": _decision(model, proba),
+                    "niveau_risque": niveau,
+                    "facteurs_principaux": top
+                }
+                if explain:
+                    model.cache.put(keys[i], chunk_results[i])
+
+        results.extend(chunk_results)
+
+    return results
+
+
+def counterfactual(data_dict):
+    """
+    Plus petite modification des montants du client (src/counterfactual.py)
+    qui fait passer sa probabilité de défaut sous le seuil de décision.
+    "contrefactuel" vaut None si aucune modification dans la limite de
+    COUNTERFACTUAL_MAX_CHANGE ne suffit.
+    """
+    model = _require_model()
+    x = model.features.vector(data_dict).copy()
+    proba = model.compiled.predict_proba_one(x)
+    threshold = model.decision["threshold"]
+
+    result = {
+        "probabilite_defaut": float(proba),
+        "decision": _decision(model, proba),
+        "seuil": threshold,
+        "contrefactuel": {"probabilite_defaut": float(proba), "decision": "ACCORDÉ",
+                          "modifications": [], "cout": 0.0},
+        "candidats_evalues": 0
+    }
+    if proba <= threshold:
+        return result
+
+    solution, result["candidats_evalues"] = search_counterfactual(
+        model.compiled, x, threshold, max_change=COUNTERFACTUAL_MAX_CHANGE
+    )
+    if solution is None:
+        result["contrefactuel"] = None
+        return result
+
+    result["contrefactuel"] = {
+        "probabilite_defaut": solution["proba"],
+        "decision": _decision(model, solution["proba"]),
+        "modifications": [
+            {"feature": name, "valeur_actuelle": float(data_dict[name]), "nouvelle_valeur": value,
+             "variation": (value - data_dict[name]) / max(abs(data_dict[name]), 1.0)}
+            for name, value in solution["values"].items()
+        ],
+        "cout": solution["cost"]
+    }
+    return result
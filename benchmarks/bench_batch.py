@@ -0,0 +1,33 @@
+"""
+Benchmark : débit de /predict (un client par appel)
+contre predict_batch (un appel vectorisé par bloc).
+
+Usage : python benchmarks/bench_batch.py [n_clients]
+"""
+import sys
+
+from common import measure, report, synthetic_clients
+
+from api.utils import predict_batch, predict_client
+
+
+def main(n=2000):
+    clients = synthetic_clients(n)
+    print(f"=== Scoring de {n} clients ===")
+
+    single = report(
+        "predict_client (ligne par ligne)", n,
+        measure(lambda: [predict_client(c) for c in clients], repeat=1)
+    )
+
+    for chunk_size in (100, 1000, 5000):
+        batch = report(
+            f"predict_batch (chunk_size={chunk_size})", n,
+            measure(lambda: predict_batch(clients, chunk_size=chunk_size), repeat=3)
+        )
+
+    print(f"Accélération batch / ligne à ligne : x{batch / single:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,47 @@
+"""
+Benchmark : chargement du modèle depuis le pickle joblib (désérialisation,
+import de sklearn, compilation, tables SHAP) et depuis le bundle
+(manifest.json + .npy mappés en mémoire, empreintes vérifiées).
+
+Chaque mesure est faite dans un process neuf : imports compris.
+
+Usage : python benchmarks/bench_bundle.py [repeat]
+"""
+import subprocess
+import sys
+
+from common import ROOT
+
+SCRIPT = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from api.utils import read_model
+read_model({path!r})
+print(time.perf_counter() - start)
+"""
+
+MODES = {
+    "pickle (joblib + compilation)": "models/credit_scoring_model.pkl",
+    "bundle (mmap + sha256)": "models/credit_scoring_model",
+}
+
+
+def _cold_load(path):
+    out = subprocess.run([sys.executable, "-c", SCRIPT.format(root=ROOT, path=path)],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.split()[-1])
+
+
+def main(repeat=5):
+    best = {}
+    for label, path in MODES.items():
+        best[label] = min(_cold_load(path) for _ in range(repeat))
+        print(f"{label:<35} {best[label] * 1000:10.1f} ms")
+
+    pickle_time, bundle_time = best.values()
+    print(f"Accélération : x{pickle_time / bundle_time:.0f}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,56 @@
+"""
+Benchmark : chargement du dataset depuis le CSV et depuis le cache
+Feather de prepare.load_dataset (toutes les colonnes, puis projection).
+
+Usage : python benchmarks/bench_cache.py [n_lignes] [n_colonnes]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import common  # noqa: F401  (racine du projet et sys.path)
+from bench_prepare import _write_csv
+
+from prepare import load_dataset, read_dataset
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = fn()
+    return time.perf_counter() - start, df
+
+
+def main(n_rows=200_000, n_cols=200):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data_fe.csv")
+        cache_dir = os.path.join(tmp, "cache")
+        columns = _write_csv(path, n_rows, n_cols)
+        subset = columns[:n_cols // 10]
+        print(f"{n_rows} lignes x {n_cols + 1} colonnes, {os.path.getsize(path) / 1e6:.0f} Mo sur disque")
+
+        runs = {
+            "CSV (read_dataset)": lambda: read_dataset(path, columns=None),
+            "1er passage (CSV + hash + écriture)": lambda: load_dataset(path, None, cache_dir),
+            "cache, toutes les colonnes": lambda: load_dataset(path, None, cache_dir),
+            f"cache, {len(subset)} colonnes": lambda: load_dataset(path, subset, cache_dir),
+        }
+
+        timings = {}
+        for label, fn in runs.items():
+            timings[label], df = _timed(fn)
+            print(f"{label:<40} {timings[label]:8.2f}s   {df.shape[1]:4d} colonnes")
+
+        csv_time = timings["CSV (read_dataset)"]
+        print(f"Accélération (cache complet) : x{csv_time / timings['cache, toutes les colonnes']:.0f}")
+
+        cache_files = [f for f in os.listdir(cache_dir) if f.endswith(".feather")]
+        size = os.path.getsize(os.path.join(cache_dir, cache_files[0]))
+        print(f"Fichier cache : {size / 1e6:.0f} Mo")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
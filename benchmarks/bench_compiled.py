@@ -0,0 +1,38 @@
+"""
+Benchmark : latence d'un client avec le pipeline sklearn
+(DataFrame + reindex + predict_proba) et avec le modèle compilé.
+
+Usage : python benchmarks/bench_compiled.py
+"""
+import joblib
+import pandas as pd
+
+from common import measure, synthetic_clients
+
+from src.compiled import compile_pipeline
+
+
+def main(n=500):
+    pipeline = joblib.load("models/credit_scoring_model.pkl")
+    compiled = compile_pipeline(pipeline)
+    clients = synthetic_clients(n)
+
+    def sklearn_path():
+        for c in clients:
+            df = pd.DataFrame([c]).reindex(columns=pipeline.feature_names_in_, fill_value=0)
+            pipeline.predict_proba(df)
+
+    def compiled_path():
+        for c in clients:
+            compiled.predict_proba_one(c)
+
+    reference = min(measure(sklearn_path, repeat=3)) / n
+    fast = min(measure(compiled_path, repeat=3)) / n
+
+    print(f"{'pipeline sklearn':<25} {reference * 1e6:10.1f} µs/client")
+    print(f"{'modèle compilé':<25} {fast * 1e6:10.1f} µs/client")
+    print(f"Accélération : x{reference / fast:.0f}")
+
+
+if __name__ == "__main__":
+    main()
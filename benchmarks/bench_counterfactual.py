@@ -0,0 +1,76 @@
+"""
+Latence de la recherche contrefactuelle sur des clients refusés :
+recherche seule (src/counterfactual.py) puis /counterfactual de bout en
+bout (client ASGI local, requêtes séquentielles). Compare aussi au
+balayage exhaustif des mêmes candidats (sans tri par coût ni arrêt
+anticipé).
+
+Usage : python benchmarks/bench_counterfactual.py [n_clients]
+"""
+import asyncio
+import itertools
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from common import synthetic_clients
+
+from api import utils
+from api.main import app
+from counterfactual import ACTIONABLE_FEATURES, candidate_values, search
+
+
+def _exhaustive(compiled, x, threshold):
+    idx = [compiled.feature_names.index(f) for f in ACTIONABLE_FEATURES]
+    combos = np.array(list(itertools.product(
+        *(candidate_values(compiled, x[i], f) for f, i in zip(ACTIONABLE_FEATURES, idx))
+    )))
+    X = np.repeat(x[None, :], len(combos), axis=0)
+    X[:, idx] = combos
+    return compiled.predict_proba(X)[:, 1] <= threshold
+
+
+async def _latencies(payloads):
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for payload in payloads:
+            start = time.perf_counter()
+            (await http.post("/counterfactual", json=payload)).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+def _summary(label, latencies_ms):
+    print(f"{label:<28} p50 {np.percentile(latencies_ms, 50):7.2f} ms   "
+          f"p99 {np.percentile(latencies_ms, 99):7.2f} ms   max {latencies_ms.max():7.2f} ms")
+
+
+def main(n=5000):
+    model = utils.load_model()
+    compiled, threshold = model.compiled, model.decision["threshold"]
+
+    clients = synthetic_clients(n)
+    X = np.array([compiled.feature_vector(c) for c in clients])
+    declined = np.flatnonzero(compiled.predict_proba(X)[:, 1] > threshold)
+    print(f"{len(declined)} clients refusés sur {n}")
+
+    for label, fn in (("balayage exhaustif", lambda x: _exhaustive(compiled, x, threshold)),
+                      ("recherche (tri + arrêt)", lambda x: search(compiled, x, threshold))):
+        latencies, found = [], 0
+        for i in declined:
+            start = time.perf_counter()
+            result = fn(X[i])
+            latencies.append(time.perf_counter() - start)
+            found += bool(result.any()) if isinstance(result, np.ndarray) else result[0] is not None
+        _summary(f"{label} ({found} trouvés)", np.array(latencies) * 1000)
+
+    payloads = [clients[i] for i in declined]
+    asyncio.run(_latencies(payloads[:20]))  # chauffe
+    _summary("/counterfactual", asyncio.run(_latencies(payloads)))
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
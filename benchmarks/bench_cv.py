@@ -0,0 +1,40 @@
+"""
+Benchmark : validation croisée stratifiée en série (1 process) et en
+parallèle (un process par pli, dataset partagé en mémoire mappée).
+
+Usage : python benchmarks/bench_cv.py [n_lignes] [backend] [n_plis]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import common  # noqa: F401  (racine du projet et sys.path)
+from bench_train import _dataset
+from evaluate import cross_validate_model
+
+
+def main(n_rows=50_000, backend="hist", n_splits=5):
+    X_train, _, y_train, _ = _dataset(n_rows, 50)
+    n_cpu = os.cpu_count()
+    print(f"CV {n_splits} plis '{backend}', {len(X_train)} lignes, {n_cpu} cœur(s)")
+
+    timings = {}
+    for n_jobs in dict.fromkeys((1, min(n_cpu, n_splits))):
+        start = time.perf_counter()
+        with patch("evaluate.mlflow"), contextlib.redirect_stdout(io.StringIO()):
+            summary = cross_validate_model(X_train, y_train, backend, n_splits=n_splits, n_jobs=n_jobs)
+        timings[n_jobs] = time.perf_counter() - start
+
+        fold_times = ", ".join(f"{f['fit_seconds']:.1f}" for f in summary["folds"])
+        print(f"{n_jobs} process : {timings[n_jobs]:6.1f}s   AUC {summary['mean']['auc']:.4f} "
+              f"± {summary['std']['auc']:.4f}   entraînement par pli (s) : {fold_times}")
+
+    if len(timings) > 1:
+        print(f"Accélération : x{timings[1] / timings[min(n_cpu, n_splits)]:.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) if a.isdigit() else a for a in sys.argv[1:]))
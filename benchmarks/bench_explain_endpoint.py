@@ -0,0 +1,60 @@
+"""
+Latence de /explain/global (statistiques SHAP précalculées, servies depuis
+la mémoire) : réponse complète (200) et revalidation par ETag (304),
+via un client ASGI local (pas de réseau).
+
+Usage : python benchmarks/bench_explain_endpoint.py [n_requêtes]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+import common  # noqa: F401  (racine du projet et sys.path)
+from api import utils
+from api.main import app
+from bundle import save_bundle
+from shap_job import explain_global
+
+
+async def _latencies(n, headers):
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for _ in range(n):
+            start = time.perf_counter()
+            response = await http.get("/explain/global", headers=headers)
+            latencies.append(time.perf_counter() - start)
+        return response, np.array(latencies) * 1000
+
+
+def main(n=2000):
+    utils.load_model()
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle = os.path.join(tmp, "model")
+        compiled = utils.registry.current.compiled
+        save_bundle(compiled, bundle)
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(20_000, compiled.n_features))
+        with contextlib.redirect_stdout(io.StringIO()):
+            explain_global(X, rng.integers(0, 2, len(X)), bundle)
+        utils.load_model(bundle)
+
+    response, _ = asyncio.run(_latencies(1, {}))
+    etag = response.headers["etag"]
+    print(f"=== {n} requêtes /explain/global ({len(response.content) / 1024:.0f} Ko) ===")
+
+    for label, headers in (("200 (corps complet)", {}), ("304 (If-None-Match)", {"If-None-Match": etag})):
+        response, latencies = asyncio.run(_latencies(n, headers))
+        print(f"{label:<22} statut {response.status_code}   p50 {np.percentile(latencies, 50):6.3f} ms   "
+              f"p99 {np.percentile(latencies, 99):6.3f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,63 @@
+"""
+Construction du vecteur de features d'un client : DataFrame pandas
+réindexé sur feature_names (chemin historique), dict parcouru en Python
+(CompiledModel.feature_vector) et FeatureBuilder (table d'index, tampon
+préalloué par thread). Mesure la latence par client, la mémoire allouée
+par appel (pic tracemalloc) et la construction d'un lot.
+
+Usage : python benchmarks/bench_features.py [n_clients]
+"""
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from common import measure, report, synthetic_clients
+
+from api.features import FeatureBuilder
+from bundle import load_bundle
+
+
+def _allocated(fn, clients):
+    """Pic de mémoire allouée par un appel (octets, médiane sur les clients)"""
+    peaks = []
+    tracemalloc.start()
+    for c in clients:
+        fn(c)  # premier appel hors mesure (tampon du thread)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fn(c)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return np.median(peaks)
+
+
+def main(n=20_000):
+    compiled = load_bundle("models/credit_scoring_model")[0]
+    builder = FeatureBuilder(compiled.feature_names)
+    clients = synthetic_clients(n)
+    columns = compiled.feature_names
+
+    paths = {
+        "DataFrame + reindex": lambda c: pd.DataFrame([c]).reindex(columns=columns, fill_value=0).to_numpy()[0],
+        "dict -> feature_vector": compiled.feature_vector,
+        "FeatureBuilder.vector": builder.vector,
+    }
+
+    print(f"=== {n} clients, {compiled.n_features} features ===")
+    for label, fn in paths.items():
+        sample = clients[:200] if label.startswith("DataFrame") else clients
+        durations = measure(lambda: [fn(c) for c in sample])
+        report(label, len(sample), durations)
+        print(f"{'':<40} {min(durations) / len(sample) * 1e6:10.2f} µs / client"
+              f"   {_allocated(fn, clients[:200]):8.0f} octets alloués / appel")
+
+    print("=== lot de 1000 clients ===")
+    batch = clients[:1000]
+    report("np.vstack(feature_vector)", len(batch), measure(lambda: np.vstack([compiled.feature_vector(c) for c in batch])))
+    report("FeatureBuilder.matrix", len(batch), measure(lambda: builder.matrix(batch)))
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
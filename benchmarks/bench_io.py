@@ -0,0 +1,105 @@
+"""
+Couche d'entrée/sortie de /predict (api/serialization.py), de bout en
+bout avec un client ASGI local (requêtes séquentielles, cache et
+micro-batching désactivés) :
+
+    paramètre ClientData + JSONResponse     chemin historique (app de référence)
+    objet JSON (model_validate_json + orjson)
+    tableau compact (TypeAdapter + orjson)
+
+puis /predict/batch (objets / tableaux compacts), et le coût seul du
+décodage + validation d'un corps et de l'encodage d'une réponse.
+
+Usage : python benchmarks/bench_io.py [n_requêtes]
+"""
+import asyncio
+import json
+import sys
+import time
+import timeit
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from common import measure, report, synthetic_clients
+
+from api import main, metrics, utils
+from api.schema import ClientData
+from api.serialization import CLIENT_FIELDS, FastJSONResponse, parse_client
+
+# Chemin historique : validation par FastAPI, encodage par json
+legacy = FastAPI()
+
+
+@legacy.post("/predict")
+def legacy_predict(data: ClientData):
+    return JSONResponse(utils.predict_client(data.model_dump(), False))
+
+
+async def _latencies(app, payloads):
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for payload in payloads:
+            start = time.perf_counter()
+            (await http.post("/predict", json=payload)).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+async def _post(path, payload):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        (await http.post(path, json=payload)).raise_for_status()
+
+
+def main_(n=3000):
+    utils.load_model()
+    utils.registry.current.cache.enabled = False
+    main.batcher.enabled = False
+    metrics.METRICS_ENABLED = False  # l'app de référence n'a pas de middleware
+
+    clients = synthetic_clients(n)
+    arrays = [[c[f] for f in CLIENT_FIELDS] for c in clients]
+    runs = {
+        "ClientData + JSONResponse": (legacy, clients),
+        "objet JSON + orjson": (main.app, clients),
+        "tableau compact + orjson": (main.app, arrays),
+    }
+
+    print(f"=== {n} requêtes /predict séquentielles (meilleur de 3 passages alternés) ===")
+    for app, payloads in runs.values():
+        asyncio.run(_latencies(app, payloads[:200]))  # chauffe
+    best = {}
+    for _ in range(3):
+        for label, (app, payloads) in runs.items():
+            latencies = asyncio.run(_latencies(app, payloads))
+            if label not in best or latencies.sum() < best[label].sum():
+                best[label] = latencies
+    for label, latencies in best.items():
+        print(f"{label:<28} p50 {np.percentile(latencies, 50):6.3f} ms   p99 {np.percentile(latencies, 99):6.3f} ms"
+              f"   {n / latencies.sum() * 1000:8.0f} req/s")
+
+    print("=== par requête, hors scoring ===")
+    body, array = json.dumps(clients[0]).encode(), json.dumps(arrays[0]).encode()
+    result = utils.predict_client(clients[0])
+    steps = {
+        "json.loads + ClientData(**).model_dump()": lambda: ClientData(**json.loads(body)).model_dump(),
+        "parse_client (objet)": lambda: parse_client(body),
+        "parse_client (tableau)": lambda: parse_client(array),
+        "JSONResponse": lambda: JSONResponse(result),
+        "FastJSONResponse": lambda: FastJSONResponse(result),
+    }
+    for label, fn in steps.items():
+        seconds = min(timeit.repeat(fn, number=20_000, repeat=3)) / 20_000
+        print(f"{label:<42} {seconds * 1e6:7.2f} µs")
+
+    print("=== /predict/batch, 1000 clients ===")
+    for label, payload in (("objets", clients[:1000]), ("tableaux compacts", arrays[:1000])):
+        report(label, 1000, measure(lambda: asyncio.run(_post("/predict/batch", payload))))
+
+
+if __name__ == "__main__":
+    main_(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,51 @@
+"""
+Coût de l'instrumentation (api/metrics.py) : durée d'une observation
+d'histogramme, puis latence de /predict avec et sans métriques (client
+ASGI local, requêtes séquentielles, cache désactivé).
+
+Usage : python benchmarks/bench_metrics.py [n_requêtes]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from common import measure, synthetic_clients
+
+from api import metrics, utils
+from api.main import app
+
+
+async def _latencies(stream):
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for payload in stream:
+            start = time.perf_counter()
+            (await http.post("/predict", json=payload)).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+def main(n=2000):
+    n_obs = 100_000
+    best = min(measure(lambda: [metrics.lap("bench", 0.0) for _ in range(n_obs)]))
+    print(f"lap() : {best / n_obs * 1e9:.0f} ns par observation")
+
+    utils.load_model()
+    utils.registry.current.cache.enabled = False
+    stream = synthetic_clients(n)
+    asyncio.run(_latencies(stream[:100]))  # chauffe
+
+    print(f"=== {n} requêtes /predict séquentielles ===")
+    for enabled in (False, True, False, True):
+        metrics.METRICS_ENABLED = enabled
+        latencies = asyncio.run(_latencies(stream))
+        label = "avec métriques" if enabled else "sans métriques"
+        print(f"{label:<16} p50 {np.percentile(latencies, 50):6.3f} ms   p99 {np.percentile(latencies, 99):6.3f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,68 @@
+"""
+Test de charge : /predict avec et sans micro-batching,
+via un client ASGI local (pas de réseau). Le cache des prédictions est
+désactivé : sinon la seconde passe, qui renvoie les mêmes clients, ne
+serait faite que de hits et ne formerait aucun lot.
+
+Usage : python benchmarks/bench_microbatch.py [n_requêtes] [concurrence]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from common import synthetic_clients
+
+from api import utils
+from api.main import app, batcher
+
+
+async def _load_test(clients, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        async def one(payload):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await http.post("/predict", json=payload)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(c) for c in clients))
+        elapsed = time.perf_counter() - start
+
+    return elapsed, np.array(latencies) * 1000
+
+
+def main(n=2000, concurrency=64):
+    model = utils.load_model()
+    model.cache.enabled = False
+    clients = synthetic_clients(n)
+    print(f"=== {n} requêtes /predict, {concurrency} en parallèle ===")
+
+    for enabled in (False, True):
+        batcher.enabled = enabled
+        before = batcher.stats()
+        elapsed, latencies = asyncio.run(_load_test(clients, concurrency))
+        after = batcher.stats()
+        label = "avec micro-batching" if enabled else "sans micro-batching"
+        print(f"{label:<22} {n / elapsed:8.0f} req/s   "
+              f"p50 {np.percentile(latencies, 50):7.1f} ms   p99 {np.percentile(latencies, 99):7.1f} ms")
+
+    # Lots formés pendant la passe avec micro-batching (compteurs cumulés du process)
+    requests = after["requests"] - before["requests"]
+    batches = after["batches"] - before["batches"]
+    mean_size = requests / batches if batches else 0.0
+    print(f"Lots : {batches}, taille moyenne {mean_size:.1f} (max {after['max_batch_size_seen']})")
+    if concurrency > 1 and mean_size <= 1:
+        sys.exit("Aucun regroupement : la mesure avec micro-batching n'est pas significative")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,71 @@
+"""
+Latence de /predict avec et sans cache des prédictions, pour un flux de
+requêtes dont une part (taux de doublons) renvoie un payload déjà vu
+(rafraîchissements du dashboard, rejeux après timeout), les clients
+récents étant les plus souvent renvoyés. Client ASGI local, requêtes
+séquentielles.
+
+Usage : python benchmarks/bench_prediction_cache.py [n_requêtes] [taux_doublons_%]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from common import synthetic_clients
+
+from api import utils
+from api.main import app
+
+
+def request_stream(n, duplicate_rate, seed=0):
+    """
+    n payloads : nouveaux clients, ou doublons d'un client récent (loi géométrique).
+    Renvoie (payloads, masque des doublons).
+    """
+    rng = np.random.default_rng(seed)
+    fresh = iter(synthetic_clients(n, seed=seed))
+    seen, stream, duplicate = [], [], []
+    for _ in range(n):
+        duplicate.append(bool(seen) and rng.uniform() < duplicate_rate)
+        if duplicate[-1]:
+            payload = seen[-min(int(rng.geometric(0.05)), len(seen))]
+        else:
+            payload = next(fresh)
+            seen.append(payload)
+        stream.append(payload)
+    return stream, np.array(duplicate)
+
+
+async def _run(stream):
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for payload in stream:
+            start = time.perf_counter()
+            response = await http.post("/predict", json=payload)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return np.array(latencies) * 1000
+
+
+def main(n=3000, duplicate_pct=40):
+    stream, duplicate = request_stream(n, duplicate_pct / 100)
+    print(f"=== {n} requêtes /predict séquentielles, {duplicate_pct} % de doublons ===")
+
+    for enabled in (False, True):
+        # Nouveau modèle chargé : nouveau cache, vide
+        utils.load_model().cache.enabled = enabled
+        latencies = asyncio.run(_run(stream))
+        label = "avec cache" if enabled else "sans cache"
+        print(f"{label:<12} moyenne {latencies.mean():6.2f} ms   p50 {np.percentile(latencies, 50):6.2f} ms   "
+              f"p99 {np.percentile(latencies, 99):6.2f} ms   doublons p50 {np.percentile(latencies[duplicate], 50):6.2f} ms")
+
+    stats = utils.registry.current.cache.stats()
+    print(f"Cache : taux de hit {stats['hit_rate']:.1%}, {stats['size']} entrées, {stats['evictions']} évictions")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
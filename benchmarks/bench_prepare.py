@@ -0,0 +1,75 @@
+"""
+Benchmark : chargement d'un CSV large (type data_fe.csv) avec
+pd.read_csv par défaut et avec prepare.read_dataset (blocs typés,
+moteur pyarrow, sélection de colonnes).
+
+Chaque mesure est faite dans un process neuf : le pic de mémoire
+(VmHWM, Linux) est celui du chargement seul.
+
+Usage : python benchmarks/bench_prepare.py [n_lignes] [n_colonnes]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from common import ROOT
+
+# Pic mémoire lu dans VmHWM : ru_maxrss hérite du pic du process parent
+# (qui vient d'écrire le CSV) à travers fork/exec
+SCRIPT = """
+import sys, time
+sys.path.insert(0, {src!r})
+import pandas as pd
+from prepare import read_dataset
+start = time.perf_counter()
+df = {call}
+elapsed = time.perf_counter() - start
+peak = next(int(l.split()[1]) for l in open("/proc/self/status") if l.startswith("VmHWM"))
+print(elapsed, peak / 1024, df.memory_usage(deep=True).sum() / 1e6)
+"""
+
+
+def _write_csv(path, n_rows, n_cols, seed=0):
+    """CSV synthétique : 3/4 de colonnes décimales, 1/4 d'indicateurs 0/1, une cible"""
+    rng = np.random.default_rng(seed)
+    n_float = n_cols * 3 // 4
+    data = {f"NUM_{i}": rng.normal(size=n_rows) * 1e4 for i in range(n_float)}
+    data.update({f"FLAG_{i}": rng.integers(0, 2, n_rows) for i in range(n_cols - n_float)})
+    data["TARGET"] = rng.integers(0, 2, n_rows)
+    pd.DataFrame(data).to_csv(path, index=False)
+    return list(data)
+
+
+def _run(call):
+    code = SCRIPT.format(src=os.path.join(ROOT, "src"), call=call)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    return map(float, out.stdout.split()[-3:])
+
+
+def main(n_rows=200_000, n_cols=200):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data_fe.csv")
+        columns = _write_csv(path, n_rows, n_cols)
+        subset = columns[:n_cols // 10]
+        print(f"{n_rows} lignes x {n_cols + 1} colonnes, {os.path.getsize(path) / 1e6:.0f} Mo sur disque")
+
+        modes = {
+            "pd.read_csv (float64/int64)": f"pd.read_csv({path!r})",
+            "read_dataset (blocs, moteur c)": f"read_dataset({path!r})",
+            "read_dataset (pyarrow)": f"read_dataset({path!r}, engine='pyarrow')",
+            f"read_dataset ({len(subset)} colonnes)": f"read_dataset({path!r}, columns={subset!r})",
+        }
+
+        print(f"{'':<35} {'temps':>10} {'pic RSS':>12} {'DataFrame':>12}")
+        for label, call in modes.items():
+            elapsed, peak, frame = _run(call)
+            print(f"{label:<35} {elapsed:9.2f}s {peak:9.0f} Mo {frame:9.0f} Mo")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
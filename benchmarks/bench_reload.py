@@ -0,0 +1,67 @@
+"""
+Latence de /predict pendant des rechargements à chaud du modèle : un
+thread recharge MODEL_PATH en boucle (chargement, chauffe, substitution)
+pendant qu'un client ASGI local envoie des requêtes séquentielles.
+Compare avec le même flux sans rechargement et compte les erreurs.
+
+Usage : python benchmarks/bench_reload.py [n_requêtes]
+"""
+import asyncio
+import sys
+import threading
+import time
+
+import httpx
+import numpy as np
+
+from common import synthetic_clients
+
+from api import utils
+from api.main import app
+
+
+async def _run(stream):
+    latencies, errors = [], 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for payload in stream:
+            start = time.perf_counter()
+            response = await http.post("/predict", json=payload)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+    return np.array(latencies) * 1000, errors
+
+
+def _reload_loop(stop, durations):
+    while not stop.is_set():
+        start = time.perf_counter()
+        utils.load_model()
+        durations.append(time.perf_counter() - start)
+
+
+def main(n=3000):
+    utils.load_model()
+    print(f"=== {n} requêtes /predict séquentielles ===")
+
+    latencies, errors = asyncio.run(_run(synthetic_clients(n, seed=0)))
+    print(f"{'sans rechargement':<20} p50 {np.percentile(latencies, 50):6.2f} ms   "
+          f"p99 {np.percentile(latencies, 99):6.2f} ms   erreurs {errors}")
+
+    stop, durations = threading.Event(), []
+    reloader = threading.Thread(target=_reload_loop, args=(stop, durations))
+    reloads_before = utils.model_status()["reloads"]
+    reloader.start()
+    try:
+        latencies, errors = asyncio.run(_run(synthetic_clients(n, seed=1)))
+    finally:
+        stop.set()
+        reloader.join()
+
+    print(f"{'rechargements':<20} p50 {np.percentile(latencies, 50):6.2f} ms   "
+          f"p99 {np.percentile(latencies, 99):6.2f} ms   erreurs {errors}")
+    print(f"{utils.model_status()['reloads'] - reloads_before} rechargements, "
+          f"{np.median(durations) * 1000:.1f} ms chacun (médiane)")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,80 @@
+"""
+Benchmark : scoring d'un fichier avec src/score.py (lecture par blocs,
+résultats écrits au fil de l'eau) contre la version « tout en mémoire »
+(pd.read_csv du fichier entier puis predict_proba).
+
+Chaque mesure est faite dans un process neuf : le pic de mémoire
+(VmHWM, Linux) est celui du scoring seul (process principal ; les
+process du pool ne tiennent chacun qu'un bloc).
+
+Usage : python benchmarks/bench_score.py [n_lignes] [process]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from common import ROOT
+from bundle import load_bundle
+
+BUNDLE = os.path.join(ROOT, "models", "credit_scoring_model")
+
+SCRIPT = """
+import sys, time
+sys.path.insert(0, {src!r})
+import pandas as pd
+from bundle import load_bundle
+from score import score_file
+start = time.perf_counter()
+{call}
+elapsed = time.perf_counter() - start
+peak = next(int(l.split()[1]) for l in open("/proc/self/status") if l.startswith("VmHWM"))
+print(elapsed, peak / 1024)
+"""
+
+IN_MEMORY = """
+compiled = load_bundle({bundle!r})[0]
+df = pd.read_csv({path!r})
+proba = compiled.predict_proba(df[compiled.feature_names].to_numpy())[:, 1]
+pd.DataFrame({{"probabilite_defaut": proba}}).to_parquet({out!r})
+"""
+
+
+def _write_csv(path, n_rows, feature_names, block=50_000, seed=0):
+    """CSV synthétique aux colonnes du modèle, écrit par blocs"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_rows, block):
+        n = min(block, n_rows - start)
+        df = pd.DataFrame(rng.normal(size=(n, len(feature_names))).round(4), columns=feature_names)
+        df.to_csv(path, mode="a" if start else "w", header=not start, index=False)
+
+
+def _run(call):
+    code = SCRIPT.format(src=os.path.join(ROOT, "src"), call=call)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    return map(float, out.stdout.split()[-2:])
+
+
+def main(n_rows=500_000, n_jobs=None):
+    feature_names = load_bundle(BUNDLE, verify=False)[2]["feature_names"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path, out = os.path.join(tmp, "clients.csv"), os.path.join(tmp, "scores.parquet")
+        _write_csv(path, n_rows, feature_names)
+        print(f"{n_rows} lignes x {len(feature_names)} features, {os.path.getsize(path) / 1e6:.0f} Mo sur disque")
+
+        variants = [
+            ("tout en mémoire (pd.read_csv)", IN_MEMORY.format(bundle=BUNDLE, path=path, out=out)),
+            ("score_file", f"score_file({path!r}, {out!r}, {BUNDLE!r}, n_jobs={n_jobs})"),
+            ("score_file + 5 facteurs SHAP", f"score_file({path!r}, {out!r}, {BUNDLE!r}, n_jobs={n_jobs}, top_k=5)"),
+        ]
+        for label, call in variants:
+            seconds, peak = _run(call)
+            print(f"{label:<32} {seconds:7.2f} s   {n_rows / seconds:9.0f} lignes/s   pic mémoire {peak:7.0f} Mo")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,54 @@
+"""
+Benchmark : explications SHAP avec shap.TreeExplainer
+(appel de l'ancienne API : DataFrame + shap_values + tri pandas)
+et avec le moteur TreeSHAP à tables précalculées.
+
+Usage : python benchmarks/bench_shap.py
+"""
+import joblib
+import numpy as np
+import pandas as pd
+import shap
+
+from common import measure, report, synthetic_clients
+
+from src.compiled import compile_pipeline
+from src.treeshap import TreeShapEngine
+
+
+def main(n=500, n_batch=5000):
+    pipeline = joblib.load("models/credit_scoring_model.pkl")
+    explainer = shap.TreeExplainer(pipeline.named_steps["model"])
+    compiled = compile_pipeline(pipeline)
+    engine = TreeShapEngine.from_compiled(compiled)
+
+    clients = synthetic_clients(n)
+    vectors = [compiled.feature_vector(c) for c in clients]
+
+    def explainer_path():
+        for c in clients:
+            df = pd.DataFrame([c]).reindex(columns=pipeline.feature_names_in_, fill_value=0)
+            values = explainer.shap_values(df)
+            pd.DataFrame({"feature": df.columns, "impact": values[0]}).sort_values(
+                by="impact", key=abs, ascending=False
+            ).head(5)
+
+    def engine_path():
+        for x in vectors:
+            engine.top_k(compiled.transform(x), 5)
+
+    print(f"=== Top-5 SHAP, un client par appel ({n} clients) ===")
+    reference = report("TreeExplainer + tri pandas", n, measure(explainer_path, repeat=3))
+    fast = report("TreeShapEngine.top_k", n, measure(engine_path, repeat=3))
+    print(f"Accélération : x{fast / reference:.1f}")
+
+    X_t = compiled.transform(np.vstack([compiled.feature_vector(c) for c in synthetic_clients(n_batch)]))
+
+    print(f"\n=== Matrice SHAP complète ({n_batch} clients en un appel) ===")
+    reference = report("TreeExplainer.shap_values", n_batch, measure(lambda: explainer.shap_values(X_t), repeat=3))
+    fast = report("TreeShapEngine.shap_values", n_batch, measure(lambda: engine.shap_values(X_t), repeat=3))
+    print(f"Accélération : x{fast / reference:.1f}")
+
+
+if __name__ == "__main__":
+    main()
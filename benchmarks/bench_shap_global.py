@@ -0,0 +1,57 @@
+"""
+Benchmark : explication globale sur un large échantillon.
+
+- explain_model : shap.TreeExplainer sur le pipeline, en série (ancienne étape)
+- shap_job      : moteur TreeSHAP par blocs, 1 process puis un par cœur,
+                  matrice écrite en mémoire mappée dans le bundle
+
+Usage : python benchmarks/bench_shap_global.py [n_lignes]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import shap
+
+import common  # noqa: F401  (racine du projet et sys.path)
+from common import synthetic_clients
+from bundle import save_bundle
+from compiled import compile_pipeline
+from shap_job import explain_global
+
+
+def main(n_rows=50_000):
+    pipeline = joblib.load("models/credit_scoring_model.pkl")
+    X = pd.DataFrame(synthetic_clients(n_rows)).reindex(columns=pipeline.feature_names_in_)
+    y = np.random.default_rng(0).uniform(size=n_rows) < 0.08
+    n_cpu = os.cpu_count()
+    print(f"SHAP global sur {n_rows} lignes, {n_cpu} cœur(s)")
+
+    start = time.perf_counter()
+    shap.TreeExplainer(pipeline.named_steps["model"]).shap_values(pipeline[:-1].transform(X))
+    reference = time.perf_counter() - start
+    print(f"{'TreeExplainer (série)':<40} {reference:8.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_dir = os.path.join(tmp, "model")
+        save_bundle(compile_pipeline(pipeline), bundle_dir)
+
+        for n_jobs in dict.fromkeys((1, n_cpu)):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                explain_global(X, y, bundle_dir, sample_size=n_rows, n_jobs=n_jobs)
+            wall = time.perf_counter() - start
+            print(f"{f'shap_job ({n_jobs} process)':<40} {wall:8.2f}s   x{reference / wall:.1f}")
+
+        size = os.path.getsize(os.path.join(bundle_dir, "explain", "shap_values.npy"))
+        print(f"Matrice SHAP stockée : {size / 1e6:.1f} Mo")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,44 @@
+"""
+Benchmark : seuil de décision au coût minimal (src/threshold.py).
+
+Compare un balayage naïf (une passe complète sur les données par seuil
+d'une grille de 101 valeurs) au calcul vectorisé (un tri, puis sommes
+cumulées sur tous les seuils distincts).
+
+Usage : python benchmarks/bench_threshold.py [n_lignes]
+"""
+import sys
+
+import numpy as np
+
+import common  # noqa: F401  (racine du projet et sys.path)
+from common import measure
+from threshold import decision_policy
+
+
+def grid_search(y, proba, cost_fn=10.0, cost_fp=1.0, grid=np.linspace(0, 1, 101)):
+    """Version naïve : coût recalculé sur toutes les lignes pour chaque seuil"""
+    costs = []
+    for t in grid:
+        refused = proba > t
+        costs.append(cost_fn * np.sum(~refused & (y == 1)) + cost_fp * np.sum(refused & (y == 0)))
+    return grid[int(np.argmin(costs))]
+
+
+def main(n_rows=5_000_000):
+    rng = np.random.default_rng(42)
+    proba = rng.beta(1, 8, n_rows)
+    y = (rng.uniform(0, 1, n_rows) < proba).astype(np.int8)
+    print(f"{n_rows} probabilités, {len(np.unique(proba))} seuils distincts")
+
+    naive = min(measure(lambda: grid_search(y, proba), repeat=3))
+    print(f"{'grille de 101 seuils (naïf)':<40} {naive * 1000:10.1f} ms   seuil {grid_search(y, proba):.3f}")
+
+    fast = min(measure(lambda: decision_policy(y, proba), repeat=3))
+    policy = decision_policy(y, proba)
+    print(f"{'tous les seuils (tri + cumsum)':<40} {fast * 1000:10.1f} ms   seuil {policy['threshold']:.3f}, "
+          f"niveaux {[round(b, 3) for b in policy['risk_bands']]}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,48 @@
+"""
+Benchmark : temps d'entraînement et AUC des moteurs "gb"
+(GradientBoostingClassifier) et "hist" (HistGradientBoostingClassifier,
+arrêt anticipé) sur un jeu synthétique déséquilibré avec valeurs manquantes.
+
+Usage : python benchmarks/bench_train.py [n_lignes] [n_colonnes]
+"""
+import contextlib
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.datasets import make_classification
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+
+import common  # noqa: F401  (racine du projet et sys.path)
+from train import train_model
+
+
+def _dataset(n_rows, n_cols, seed=0):
+    X, y = make_classification(n_samples=n_rows, n_features=n_cols, n_informative=n_cols // 3,
+                               weights=[0.92], flip_y=0.02, random_state=seed)
+    X[np.random.default_rng(seed).random(X.shape) < 0.05] = np.nan
+    X = pd.DataFrame(X, columns=[f"F_{i}" for i in range(n_cols)])
+    return train_test_split(X, y, test_size=0.2, random_state=seed, stratify=y)
+
+
+def main(n_rows=50_000, n_cols=50):
+    X_train, X_test, y_train, y_test = _dataset(n_rows, n_cols)
+    print(f"{n_rows} lignes x {n_cols} colonnes (5 % de NaN, 8 % de positifs)")
+
+    for backend in ("gb", "hist"):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = train_model(X_train, y_train, backend=backend)
+        elapsed = time.perf_counter() - start
+
+        estimator = model.named_steps["model"]
+        n_iter = getattr(estimator, "n_iter_", None) or estimator.n_estimators_
+        auc = roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+        print(f"{backend:<6} {elapsed:8.1f}s   AUC {auc:.4f}   {n_iter:5d} itérations")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
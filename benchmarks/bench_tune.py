@@ -0,0 +1,54 @@
+"""
+Benchmark : recherche d'hyperparamètres (27 configurations) en
+- recherche exhaustive en série (chaque configuration sur tout le jeu)
+- successive halving en série (1 process)
+- successive halving en parallèle (un process par cœur)
+
+Usage : python benchmarks/bench_tune.py [n_lignes] [backend]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+import common  # noqa: F401  (racine du projet et sys.path)
+from bench_train import _dataset
+from tune import sample_candidates, successive_halving
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(n_rows=20_000, backend="hist"):
+    X_train, _, y_train, _ = _dataset(n_rows, 30)
+    candidates = sample_candidates(backend, n=27)
+    n_cpu = os.cpu_count()
+    print(f"{len(candidates)} configurations '{backend}', {len(X_train)} lignes, {n_cpu} cœur(s)")
+
+    runs = {
+        "exhaustive, série": lambda: successive_halving(X_train, y_train, backend, candidates,
+                                                        factor=len(candidates) + 1, n_jobs=1),
+        "successive halving, série": lambda: successive_halving(X_train, y_train, backend,
+                                                                candidates, n_jobs=1),
+        f"successive halving, {n_cpu} process": lambda: successive_halving(X_train, y_train, backend,
+                                                                           candidates, n_jobs=n_cpu),
+    }
+
+    timings = {}
+    for label, fn in runs.items():
+        timings[label], (best, trials, _) = _timed(fn)
+        best_auc = max(t["auc"] for t in trials if t["n_rows"] == max(u["n_rows"] for u in trials))
+        print(f"{label:<35} {timings[label]:8.1f}s   {len(trials):3d} essais   AUC val {best_auc:.4f}")
+
+    reference = timings["exhaustive, série"]
+    for label in list(runs)[1:]:
+        print(f"Accélération {label} : x{reference / timings[label]:.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) if a.isdigit() else a for a in sys.argv[1:]))
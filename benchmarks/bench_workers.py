@@ -0,0 +1,99 @@
+"""
+Benchmark : démarrage et mémoire des workers selon le mode de chargement.
+
+- pickle  : chaque worker désérialise le pickle et construit shap.TreeExplainer
+            (démarrage historique de l'API)
+- compile : chaque worker désérialise le pickle puis le compile (api/utils.py seul)
+- shared  : chaque worker s'attache au bloc publié par le maître (api/serve.py)
+
+Mémoire lue dans /proc/self/smaps_rollup (Linux) : RSS, PSS (pages partagées
+réparties entre process) et mémoire privée (USS).
+
+Usage : python benchmarks/bench_workers.py [n_workers]
+"""
+import multiprocessing as mp
+import sys
+import time
+
+from common import ROOT
+
+MODEL_PATH = "models/credit_scoring_model.pkl"
+
+
+def _memory_kb():
+    """RSS, PSS et mémoire privée du process courant (Ko)"""
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[1].isdigit():
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss, rss, rss
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return fields.get("Rss", 0), fields.get("Pss", 0), private
+
+
+def _worker(mode, shm_name, results):
+    import os
+    import sys
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    start = time.perf_counter()
+    if mode == "pickle":
+        import joblib
+        import shap
+        pipeline = joblib.load(MODEL_PATH)
+        shap.TreeExplainer(pipeline.named_steps["model"])
+    elif mode == "compile":
+        from api.utils import load_model
+        load_model(MODEL_PATH, shm_name=None)
+    else:
+        from api.utils import load_model
+        load_model(MODEL_PATH, shm_name=shm_name)
+    elapsed = time.perf_counter() - start
+
+    results.put((elapsed, *_memory_kb()))
+
+
+def _run(mode, n_workers, shm_name=None):
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, shm_name, results)) for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    n = len(rows)
+    startup, rss, pss, private = (sum(col) / n for col in zip(*rows))
+    print(f"{mode:<8} {startup * 1000:10.0f} ms {rss / 1024:10.1f} Mo {pss / 1024:10.1f} Mo {private / 1024:10.1f} Mo")
+
+
+def main(n_workers=4):
+    import joblib
+    from api.shared_model import publish
+    from src.compiled import compile_pipeline
+    from src.treeshap import TreeShapEngine
+
+    print(f"=== {n_workers} workers (moyennes par worker) ===")
+    print(f"{'mode':<8} {'démarrage':>13} {'RSS':>13} {'PSS':>13} {'privée':>13}")
+    _run("pickle", n_workers)
+    _run("compile", n_workers)
+
+    compiled = compile_pipeline(joblib.load(MODEL_PATH))
+    shm = publish(compiled, TreeShapEngine.from_compiled(compiled))
+    try:
+        _run("shared", n_workers, shm.name)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
@@ -0,0 +1,91 @@
+"""Outils communs aux benchmarks : données synthétiques et chronométrage"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Les benchmarks se lancent depuis la racine du projet (modèle, api, src)
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+
+def synthetic_clients(n, seed=42):
+    """Génère n clients au format ClientData (mêmes plages que tests/conftest.py)"""
+    rng = np.random.default_rng(seed)
+
+    columns = {
+        "EXT_SOURCE_1": rng.uniform(0, 1, n),
+        "EXT_SOURCE_2": rng.uniform(0, 1, n),
+        "EXT_SOURCE_3": rng.uniform(0, 1, n),
+        "AMT_GOODS_PRICE": rng.uniform(50000, 1000000, n),
+        "AMT_ANNUITY": rng.uniform(5000, 100000, n),
+        "AMT_CREDIT": rng.uniform(50000, 1000000, n),
+        "DAYS_BIRTH": rng.integers(-25000, -7000, n).astype(float),
+        "DAYS_EMPLOYED": rng.integers(-15000, 0, n).astype(float),
+        "DAYS_LAST_PHONE_CHANGE": rng.integers(-4000, 0, n).astype(float),
+        "NAME_FAMILY_STATUS_Married": rng.integers(0, 2, n),
+        "REGION_RATING_CLIENT": rng.integers(1, 4, n).astype(float),
+        "REGION_RATING_CLIENT_W_CITY": rng.integers(1, 4, n).astype(float),
+        "FLAG_DOCUMENT_3": rng.integers(0, 2, n),
+        "DAYS_ID_PUBLISH": rng.integers(-7000, 0, n).astype(float),
+        "OCCUPATION_TYPE_Laborers": rng.integers(0, 2, n),
+    }
+
+    return [
+        {name: values[i].item() for name, values in columns.items()}
+        for i in range(n)
+    ]
+
+
+def home_credit_frame(n, feature_names, seed=0):
+    """
+    DataFrame synthétique aux colonnes du modèle (application Home Credit
+    encodée) et cible TARGET (~10 % de défauts) : montants log-normaux,
+    jours négatifs, scores externes et indicateurs logement en partie
+    manquants, compteurs, indicateurs 0/1 pour les modalités encodées.
+    """
+    rng = np.random.default_rng(seed)
+
+    def column(name):
+        if name == "SK_ID_CURR":
+            return np.arange(100_000, 100_000 + n, dtype=float)
+        if name.startswith("AMT_"):
+            return np.round(rng.lognormal(12, 0.6, n), 1)
+        if name.startswith("DAYS_"):
+            return -rng.integers(0, 25_000, n).astype(float)
+        if name.startswith("EXT_SOURCE_"):
+            return np.where(rng.random(n) < 0.2, np.nan, rng.uniform(0, 1, n))
+        if name.endswith(("_AVG", "_MODE", "_MEDI")) or name == "OWN_CAR_AGE":
+            return np.where(rng.random(n) < 0.5, np.nan, rng.uniform(0, 1, n))
+        if name.startswith(("CNT_", "OBS_", "DEF_", "AMT_REQ_", "HOUR_", "REGION_RATING")):
+            return rng.poisson(1.5, n).astype(float)
+        if name == "REGION_POPULATION_RELATIVE":
+            return rng.uniform(0, 0.07, n)
+        return rng.integers(0, 2, n).astype(float)
+
+    df = pd.DataFrame({name: column(name) for name in feature_names})
+    score = np.nan_to_num(df.filter(like="EXT_SOURCE_").mean(axis=1).to_numpy(), nan=0.5)
+    df["TARGET"] = (rng.random(n) < 1 / (1 + np.exp(8 * score - 1.0))).astype(int)
+    return df
+
+
+def measure(fn, repeat=5):
+    """Exécute fn `repeat` fois et renvoie la liste des durées (secondes)"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def report(label, n_items, durations):
+    """Affiche le meilleur temps et le débit associé"""
+    best = min(durations)
+    print(f"{label:<40} {best * 1000:10.1f} ms   {n_items / best:12.0f} clients/s")
+    return n_items / best
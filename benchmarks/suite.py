@@ -0,0 +1,223 @@
+"""
+Suite de benchmarks des chemins critiques (API et pipeline), comparée à
+une référence JSON pour détecter les régressions de performance.
+
+Cas mesurés, sur des données synthétiques au format Home Credit :
+prédiction ligne à ligne et par lot (utils), facteurs SHAP, recherche
+contrefactuelle sur des clients refusés, /predict et
+/predict/batch de bout en bout (client ASGI local, cache désactivé),
+chargement du CSV (prepare.read_dataset) et entraînement (train_model).
+Pour chaque cas, le meilleur temps sur plusieurs répétitions est comparé à
+celui de la référence : au-delà de (1 + tolérance) fois la référence, le
+cas est en régression et le script sort avec le code 1.
+
+Les références dépendent de la machine : à régénérer (--save) sur la
+machine qui exécute la comparaison.
+
+Usage :
+    python benchmarks/suite.py                      # mesure et compare à benchmarks/baseline.json
+    python benchmarks/suite.py --save               # enregistre les mesures comme référence
+    python benchmarks/suite.py --only predict_one api_predict --tolerance 0.5
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+
+from common import ROOT, home_credit_frame, measure, synthetic_clients
+
+from api import utils
+from api.main import app
+from bundle import read_manifest
+
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+TOLERANCE = 0.30  # ralentissement toléré par rapport à la référence (30 %)
+
+N_CLIENTS = 200       # requêtes ligne à ligne par mesure
+N_BATCH = 1000        # clients par lot
+N_LOAD_ROWS = 50_000  # lignes du CSV chargé
+N_TRAIN_ROWS = 5_000
+
+# nom -> (préparation, éléments traités par appel, répétitions, appel de chauffe)
+CASES = {}
+
+
+def case(name, items, repeat=15, warmup=True):
+    """Enregistre un cas : la fonction décorée prépare les données et renvoie l'appel mesuré"""
+    def register(setup):
+        CASES[name] = (setup, items, repeat, warmup)
+        return setup
+    return register
+
+
+def _model():
+    utils.load_model()
+    model = utils.registry.current
+    model.cache.enabled = False
+    return model
+
+
+async def _post_all(path, payloads):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for payload in payloads:
+            (await http.post(path, json=payload)).raise_for_status()
+
+
+# ======================
+# Cas
+# ======================
+@case("predict_one", items=N_CLIENTS)
+def _predict_one(tmp):
+    _model()
+    clients = synthetic_clients(N_CLIENTS)
+    return lambda: [utils.predict_client(c, lookup=False) for c in clients]
+
+
+@case("predict_batch", items=N_BATCH)
+def _predict_batch(tmp):
+    _model()
+    clients = synthetic_clients(N_BATCH)
+    return lambda: utils.predict_batch(clients, lookup=False)
+
+
+@case("shap_top_k", items=N_BATCH)
+def _shap_top_k(tmp):
+    model = _model()
+    X = np.array([model.compiled.feature_vector(c) for c in synthetic_clients(N_BATCH)])
+    return lambda: model.engine.top_k(model.compiled.transform(X), utils.TOP_K_FACTORS)
+
+
+@case("counterfactual", items=N_CLIENTS)
+def _counterfactual(tmp):
+    from counterfactual import search
+
+    model = _model()
+    threshold = model.decision["threshold"]
+    X = np.array([model.compiled.feature_vector(c) for c in synthetic_clients(20 * N_CLIENTS)])
+    declined = X[model.compiled.predict_proba(X)[:, 1] > threshold][:N_CLIENTS]
+    return lambda: [search(model.compiled, x, threshold) for x in declined]
+
+
+@case("api_predict", items=N_CLIENTS, repeat=5)
+def _api_predict(tmp):
+    _model()
+    clients = synthetic_clients(N_CLIENTS)
+    return lambda: asyncio.run(_post_all("/predict", clients))
+
+
+@case("api_batch", items=N_BATCH)
+def _api_batch(tmp):
+    _model()
+    clients = synthetic_clients(N_BATCH)
+    return lambda: asyncio.run(_post_all("/predict/batch", [clients]))
+
+
+@case("load_data", items=N_LOAD_ROWS, repeat=3)
+def _load_data(tmp):
+    from prepare import read_dataset
+
+    path = os.path.join(tmp, "data_fe.csv")
+    feature_names = read_manifest(utils.MODEL_PATH)["feature_names"]
+    home_credit_frame(N_LOAD_ROWS, feature_names).to_csv(path, index=False)
+    return lambda: read_dataset(path, columns=None)
+
+
+@case("train", items=N_TRAIN_ROWS, repeat=2, warmup=False)
+def _train(tmp):
+    from train import train_model
+
+    df = home_credit_frame(N_TRAIN_ROWS, read_manifest(utils.MODEL_PATH)["feature_names"])
+    X, y = df.drop(columns="TARGET"), df["TARGET"]
+    return lambda: train_model(X, y)
+
+
+# ======================
+# Mesure et comparaison
+# ======================
+def machine():
+    """Description de la machine (les références n'ont de sens que sur la même)"""
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "cpu_count": os.cpu_count()}
+
+
+def run(names):
+    """Meilleur temps, temps médian et débit de chaque cas"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            setup, items, repeat, warmup = CASES[name]
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn = setup(tmp)
+                if warmup:
+                    fn()
+                durations = measure(fn, repeat)
+            results[name] = {"seconds": min(durations), "median_seconds": float(np.median(durations)),
+                             "items": items, "items_per_second": items / min(durations)}
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Affiche chaque cas face à sa référence ; renvoie les cas en régression"""
+    regressions = []
+    print(f"{'cas':<16} {'meilleur':>10} {'débit':>14} {'référence':>11} {'rapport':>8}")
+    for name, result in results.items():
+        line = f"{name:<16} {result['seconds'] * 1000:8.1f} ms {result['items_per_second']:10.0f} /s"
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"{line}   (pas de référence)")
+            continue
+
+        ratio = result["seconds"] / reference["seconds"]
+        status = "OK"
+        if ratio > 1 + tolerance:
+            status = "RÉGRESSION"
+            regressions.append(name)
+        print(f"{line} {reference['seconds'] * 1000:8.1f} ms {ratio:7.2f}x  {status}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques, comparés à une référence")
+    parser.add_argument("--only", nargs="*", choices=sorted(CASES), help="cas à exécuter (défaut : tous)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--save", action="store_true", help="enregistre les mesures comme référence")
+    args = parser.parse_args(argv)
+
+    results = run(args.only or list(CASES))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+        baseline = stored["cases"]
+        if stored.get("machine") != machine():
+            print(f"Attention : référence mesurée sur une autre machine ({stored.get('machine')})")
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                       "machine": machine(), "cases": {**baseline, **results}}, f, indent=2)
+        print(f"Référence enregistrée : {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"Régressions (> {args.tolerance:.0%}) : {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,18 @@
+import bisect
+import itertools
+import os
+import sys
+
+import altair as alt
+import numpy as np
+import pandas as pd
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+
+# Politique de décision par défaut partagée avec l'API (src/threshold.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.threshold import DEFAULT_DECISION, RISK_LEVELS  # noqa: E402
 
 # ======================
 # CONFIGURATION PAGE
@@ -56,7 +69,7 @@ h1, h2, h3, label {
 }
 
 /* ===== Bouton ===== */
-.stButton button {
+.stButton button, .stFormSubmitButton button {
     background: linear-gradient(90deg, #00ff87, #60efff);
     border-radius: 12px;
     height: 60px;
@@ -68,7 +81,7 @@ h1, h2, h3, label {
     transition: 0.3s;
 }
 
-.stButton button:hover {
+.stButton button:hover, .stFormSubmitButton button:hover {
     transform: scale(1.03);
     box-shadow: 0px 0px 20px #00ff87;
 }
@@ -83,37 +96,41 @@ st.title("💳 Credit Scoring - REG08")
 st.write("Simulation du risque de défaut d’un client")
 st.header("Informations client")
 
-# ======================
-# SCORES EXTERNES
-# ======================
-EXT_SOURCE_1 = st.slider("Score de solvabilité externe 1", 0.0, 1.0, 0.5)
-EXT_SOURCE_2 = st.slider("Score de solvabilité externe 2", 0.0, 1.0, 0.5)
-EXT_SOURCE_3 = st.slider("Score de solvabilité externe 3", 0.0, 1.0, 0.5)
+# Les widgets sont regroupés dans un formulaire : déplacer un curseur ne
+# relance pas le script, seul le bouton envoie les valeurs à l'API
+with st.form("client"):
+    # ======================
+    # SCORES EXTERNES
+    # ======================
+    EXT_SOURCE_1 = st.slider("Score de solvabilité externe 1", 0.0, 1.0, 0.5)
+    EXT_SOURCE_2 = st.slider("Score de solvabilité externe 2", 0.0, 1.0, 0.5)
+    EXT_SOURCE_3 = st.slider("Score de solvabilité externe 3", 0.0, 1.0, 0.5)
 
-# ======================
-# CREDIT
-# ======================
-col1, col2 = st.columns(2)
-with col1:
-    AMT_CREDIT = st.number_input("Montant du crédit", 10000, 2000000, 500000)
-with col2:
-    AMT_ANNUITY = st.number_input("Mensualité", 1000, 100000, 25000)
-AMT_GOODS_PRICE = st.number_input("Valeur du bien financé", 10000, 2000000, 450000)
+    # ======================
+    # CREDIT
+    # ======================
+    col1, col2 = st.columns(2)
+    with col1:
+        AMT_CREDIT = st.number_input("Montant du crédit", 10000, 2000000, 500000)
+    with col2:
+        AMT_ANNUITY = st.number_input("Mensualité", 1000, 100000, 25000)
+    AMT_GOODS_PRICE = st.number_input("Valeur du bien financé", 10000, 2000000, 450000)
 
-# ======================
-# PROFIL CLIENT
-# ======================
-age = st.slider("Âge du client", 18, 70, 35)
-anciennete = st.slider("Ancienneté professionnelle (années)", 0, 40, 5)
+    # ======================
+    # PROFIL CLIENT
+    # ======================
+    age = st.slider("Âge du client", 18, 70, 35)
+    anciennete = st.slider("Ancienneté professionnelle (années)", 0, 40, 5)
 
-col3, col4 = st.columns(2)
-with col3:
-    statut_familial = st.selectbox("Situation familiale", ["Célibataire", "Marié"])
-with col4:
-    profession = st.selectbox(
-        "Profession du client",
-        ["Cadre / Employé", "Indépendant", "Salarié manuel (ouvrier)", "Autre"]
-    )
+    col3, col4 = st.columns(2)
+    with col3:
+        statut_familial = st.selectbox("Situation familiale", ["Célibataire", "Marié"])
+    with col4:
+        profession = st.selectbox(
+            "Profession du client",
+            ["Cadre / Employé", "Indépendant", "Salarié manuel (ouvrier)", "Autre"]
+        )
+    analyser = st.form_submit_button("Analyser le risque")
 
 married_value = 1 if statut_familial == "Marié" else 0
 laborer_value = 1 if profession == "Salarié manuel (ouvrier)" else 0
@@ -137,75 +154,186 @@ TRADUCTION_FEATURES = {
 # ======================
 # NIVEAU DE RISQUE
 # ======================
+# Fourni par l'API (bornes calculées à l'entraînement) ; les bornes par
+# défaut ne servent que pour une API plus ancienne qui ne le renvoie pas
 def niveau_risque(proba: float) -> str:
-    if proba < 0.2:
-        return "Faible"
-    elif proba < 0.5:
-        return "Moyen"
-    else:
-        return "Élevé"
+    return RISK_LEVELS[bisect.bisect_left(DEFAULT_DECISION["risk_bands"], proba)]
 
 # ======================
-# URL API RENDER
+# SENSIBILITE
 # ======================
-API_URL = "https://credit-scoring-api-f5uu.onrender.com/predict"
+# Libellé -> (champ de l'API, min, max, facteur de conversion vers l'API)
+VARIABLES_SENSIBILITE = {
+    "Score de solvabilité externe 1": ("EXT_SOURCE_1", 0.0, 1.0, 1),
+    "Score de solvabilité externe 2": ("EXT_SOURCE_2", 0.0, 1.0, 1),
+    "Score de solvabilité externe 3": ("EXT_SOURCE_3", 0.0, 1.0, 1),
+    "Montant du crédit": ("AMT_CREDIT", 10000, 2000000, 1),
+    "Mensualité": ("AMT_ANNUITY", 1000, 100000, 1),
+    "Valeur du bien financé": ("AMT_GOODS_PRICE", 10000, 2000000, 1),
+    "Âge du client": ("DAYS_BIRTH", 18, 70, -365),
+    "Ancienneté professionnelle (années)": ("DAYS_EMPLOYED", 0, 40, -365),
+}
+
+# ======================
+# URL API
+# ======================
+# docker-compose fournit l'URL du service (API_URL=http://api:8000) ;
+# à défaut, l'API déployée sur Render
+API_URL = os.getenv("API_URL", "https://credit-scoring-api-f5uu.onrender.com").rstrip("/")
+API_TIMEOUT = (5, 15)  # connexion, lecture (secondes)
 
 
 # ======================
-# PREDICTION VIA API
+# CLIENT HTTP
+# ======================
+@st.cache_resource
+def session_api() -> requests.Session:
+    """Session partagée entre les relances du script : connexions gardées
+    ouvertes (keep-alive), sans nouvelle poignée de main TLS à chaque appel"""
+    session = requests.Session()
+    session.mount(API_URL, HTTPAdapter(pool_connections=1, pool_maxsize=10))
+    return session
+
+
+@st.cache_data(ttl=600, max_entries=1000, show_spinner=False)
+def predire(data: dict) -> dict:
+    """Réponse de /predict, mise en cache pour des valeurs identiques
+    (les erreurs ne sont pas mises en cache)"""
+    response = session_api().post(f"{API_URL}/predict", json=data, timeout=API_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=600, max_entries=100, show_spinner=False)
+def balayer(data: dict, axes: tuple) -> list:
+    """Probabilités de défaut de toutes les variantes du client sur la grille
+    des axes ((champ, valeurs), ...), scorées en un seul appel /predict/batch
+    sans SHAP"""
+    champs = [champ for champ, _ in axes]
+    grille = [dict(data, **dict(zip(champs, valeurs)))
+              for valeurs in itertools.product(*(valeurs for _, valeurs in axes))]
+    response = session_api().post(f"{API_URL}/predict/batch", params={"explain": "false"},
+                                  json=grille, timeout=API_TIMEOUT)
+    response.raise_for_status()
+    return [p["probabilite_defaut"] for p in response.json()["predictions"]]
+
+
+# ======================
+# CLIENT COURANT
 # ======================
-if st.button("Analyser le risque"):
-
-    data = {
-        "EXT_SOURCE_1": EXT_SOURCE_1,
-        "EXT_SOURCE_2": EXT_SOURCE_2,
-        "EXT_SOURCE_3": EXT_SOURCE_3,
-        "AMT_GOODS_PRICE": AMT_GOODS_PRICE,
-        "AMT_ANNUITY": AMT_ANNUITY,
-        "AMT_CREDIT": AMT_CREDIT,
-        "DAYS_BIRTH": -age*365,
-        "DAYS_EMPLOYED": -anciennete*365,
-        "DAYS_LAST_PHONE_CHANGE": -1000,
-        "NAME_FAMILY_STATUS_Married": married_value,
-        "REGION_RATING_CLIENT": 2,
-        "REGION_RATING_CLIENT_W_CITY": 2,
-        "FLAG_DOCUMENT_3": 1,
-        "DAYS_ID_PUBLISH": -3000,
-        "OCCUPATION_TYPE_Laborers": laborer_value
-    }
+data = {
+    "EXT_SOURCE_1": EXT_SOURCE_1,
+    "EXT_SOURCE_2": EXT_SOURCE_2,
+    "EXT_SOURCE_3": EXT_SOURCE_3,
+    "AMT_GOODS_PRICE": AMT_GOODS_PRICE,
+    "AMT_ANNUITY": AMT_ANNUITY,
+    "AMT_CREDIT": AMT_CREDIT,
+    "DAYS_BIRTH": -age*365,
+    "DAYS_EMPLOYED": -anciennete*365,
+    "DAYS_LAST_PHONE_CHANGE": -1000,
+    "NAME_FAMILY_STATUS_Married": married_value,
+    "REGION_RATING_CLIENT": 2,
+    "REGION_RATING_CLIENT_W_CITY": 2,
+    "FLAG_DOCUMENT_3": 1,
+    "DAYS_ID_PUBLISH": -3000,
+    "OCCUPATION_TYPE_Laborers": laborer_value
+}
 
+# ======================
+# PREDICTION VIA API
+# ======================
+if analyser:
     try:
-        response = requests.post(API_URL, json=data, timeout=15)
+        with st.spinner("Analyse en cours..."):
+            result = predire(data)
+    except requests.exceptions.HTTPError as e:
+        st.error("Erreur côté API")
+        st.write(e.response.text)
+    except requests.exceptions.RequestException as e:
+        st.error("Impossible de contacter l’API")
+        st.write(str(e))
+    else:
+        proba = result["probabilite_defaut"]
+        decision = result["decision"]
+        facteurs = result.get("facteurs_principaux", [])
+        niveau = result.get("niveau_risque") or niveau_risque(proba)
+
+        st.divider()
+        st.subheader("Décision de crédit")
+        st.progress(min(max(proba, 0.0), 1.0))
+        st.write(f"Risque estimé : **{proba:.1%}**")
+        st.write(f"Niveau de risque : **{niveau}**")
+        st.write("✅ Crédit accordé" if decision=="ACCORDÉ" else "❌ Crédit refusé")
 
-        if response.status_code != 200:
-            st.error("Erreur côté API")
-            st.write(response.text)
+        st.subheader("Pourquoi cette décision ?")
+        if facteurs:
+            for f in facteurs:
+                nom_tech = f["feature"]
+                nom_client = TRADUCTION_FEATURES.get(nom_tech, "Facteur du dossier")
+                impact = f["impact"]
+                if impact < 0:
+                    st.markdown(f'<p style="color:#00ff87; font-weight:bold;">✔ {nom_client} améliore la fiabilité</p>', unsafe_allow_html=True)
+                else:
+                    st.markdown(f'<p style="color:#ff4d4d; font-weight:bold;">⚠ {nom_client} augmente le niveau de risque</p>', unsafe_allow_html=True)
         else:
-            result = response.json()
-            proba = result["probabilite_defaut"]
-            decision = result["decision"]
-            facteurs = result.get("facteurs_principaux", [])
-
-            st.divider()
-            st.subheader("Décision de crédit")
-            st.progress(min(max(proba, 0.0), 1.0))
-            st.write(f"Risque estimé : **{proba:.1%}**")
-            st.write(f"Niveau de risque : **{niveau_risque(proba)}**")
-            st.write("✅ Crédit accordé" if decision=="ACCORDÉ" else "❌ Crédit refusé")
-
-            st.subheader("Pourquoi cette décision ?")
-            if facteurs:
-                for f in facteurs:
-                    nom_tech = f["feature"]
-                    nom_client = TRADUCTION_FEATURES.get(nom_tech, "Facteur du dossier")
-                    impact = f["impact"]
-                    if impact < 0:
-                        st.markdown(f'<p style="color:#00ff87; font-weight:bold;">✔ {nom_client} améliore la fiabilité</p>', unsafe_allow_html=True)
-                    else:
-                        st.markdown(f'<p style="color:#ff4d4d; font-weight:bold;">⚠ {nom_client} augmente le niveau de risque</p>', unsafe_allow_html=True)
-            else:
-                st.info("Aucune explication disponible.")
+            st.info("Aucune explication disponible.")
 
+
+# ======================
+# ANALYSE DE SENSIBILITE
+# ======================
+st.divider()
+st.subheader("Et si... ? Sensibilité du risque")
+with st.form("sensibilite"):
+    variables = st.multiselect(
+        "Variables à faire varier (une ou deux)",
+        list(VARIABLES_SENSIBILITE),
+        default=["Score de solvabilité externe 2"],
+        max_selections=2
+    )
+    n_points = st.slider("Points par variable", 5, 50, 25)
+    balayer_grille = st.form_submit_button("Calculer la sensibilité")
+
+if balayer_grille and not variables:
+    st.warning("Choisissez au moins une variable.")
+elif balayer_grille:
+    grilles = {v: np.linspace(*VARIABLES_SENSIBILITE[v][1:3], n_points) for v in variables}
+    axes = tuple(
+        (VARIABLES_SENSIBILITE[v][0], tuple(float(x) * VARIABLES_SENSIBILITE[v][3] for x in grille))
+        for v, grille in grilles.items()
+    )
+    try:
+        with st.spinner("Calcul de la grille..."):
+            probas = balayer(data, axes)
+    except requests.exceptions.HTTPError as e:
+        st.error("Erreur côté API")
+        st.write(e.response.text)
     except requests.exceptions.RequestException as e:
         st.error("Impossible de contacter l’API")
         st.write(str(e))
+    else:
+        points = pd.DataFrame(
+            list(itertools.product(*grilles.values())), columns=variables
+        ).assign(**{"Risque de défaut": probas})
+
+        if len(variables) == 1:
+            graphique = alt.Chart(points).mark_line().encode(
+                x=alt.X(variables[0], type="quantitative"),
+                y=alt.Y("Risque de défaut", type="quantitative", axis=alt.Axis(format="%"))
+            )
+        else:
+            # Une cellule par point de la grille, centrée sur sa valeur
+            x, y = variables
+            pas = {v: (grille[1] - grille[0]) / 2 for v, grille in grilles.items()}
+            points = points.assign(x1=points[x] - pas[x], x2=points[x] + pas[x],
+                                   y1=points[y] - pas[y], y2=points[y] + pas[y])
+            graphique = alt.Chart(points).mark_rect().encode(
+                x=alt.X("x1", type="quantitative", title=x), x2="x2",
+                y=alt.Y("y1", type="quantitative", title=y), y2="y2",
+                tooltip=[x, y, alt.Tooltip("Risque de défaut", format=".1%")],
+                color=alt.Color("Risque de défaut", type="quantitative",
+                                scale=alt.Scale(scheme="redyellowgreen", reverse=True),
+                                legend=alt.Legend(format="%"))
+            )
+        st.altair_chart(graphique)
+        st.caption(f"{len(probas)} variantes du client scorées en un seul appel à l'API.")
@@ -0,0 +1,225 @@
+"""
+Format d'artefact du modèle (remplace le pickle joblib).
+
+Un bundle est un répertoire :
+
+    manifest.json        version du format, features attendues, configuration
+                         d'entraînement, métriques, empreintes SHA-256
+    model/<champ>.npy    tableaux du CompiledModel (imputer, scaler, arbres)
+    shap/<champ>.npy     tables du moteur TreeSHAP
+
+Les tableaux sont des .npy bruts, chargés par np.load(mmap_mode="r") :
+pas de désérialisation d'objets Python, ni d'import de sklearn.
+Ce module ne dépend que de NumPy (importable côté API).
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+try:  # importé comme src.bundle (API) ou bundle (scripts de src/)
+    from src.compiled import CompiledModel
+    from src.treeshap import TreeShapEngine
+except ImportError:
+    from compiled import CompiledModel
+    from treeshap import TreeShapEngine
+
+FORMAT_NAME = "credit-scoring-bundle"
+FORMAT_VERSION = 2
+MANIFEST = "manifest.json"
+
+
+class BundleError(ValueError):
+    """Bundle absent, incomplet, corrompu ou d'une version non supportée"""
+
+
+def is_bundle(path):
+    """Le chemin est-il un répertoire de bundle ?"""
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ======================
+# Écriture
+# ======================
+def _swap(new, path):
+    """
+    Met le répertoire `new` à la place de `path` : l'ancien bundle est
+    renommé à côté (pas de suppression avant que le nouveau soit en place),
+    remis en place si le renommage du nouveau échoue, supprimé ensuite.
+    """
+    old = f"{new}.old"
+    if os.path.exists(path):
+        os.rename(path, old)
+    try:
+        os.replace(new, path)
+    except BaseException:
+        if os.path.exists(old):
+            os.rename(old, path)
+        raise
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def save_bundle(compiled, path, engine=None, config=None, metrics=None, extra=None):
+    """
+    Écrit le bundle de `compiled` (CompiledModel) dans le répertoire `path`.
+    L'écriture se fait dans un répertoire temporaire renommé à la fin, à la
+    place de l'ancien bundle supprimé seulement après : un lecteur ne voit
+    jamais un bundle à moitié écrit, et un échec laisse l'ancien en place.
+    Renvoie le manifeste.
+    """
+    engine = engine or TreeShapEngine.from_compiled(compiled)
+    model_arrays, model_meta = compiled.to_arrays()
+    shap_arrays, shap_meta = engine.to_arrays()
+    model_meta = {k: v for k, v in model_meta.items() if k != "feature_names"}
+
+    path = os.path.abspath(path)
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".bundle-", dir=parent)
+
+    try:
+        arrays = {}
+        for group, group_arrays in (("model", model_arrays), ("shap", shap_arrays)):
+            os.makedirs(os.path.join(tmp, group))
+            for field, arr in group_arrays.items():
+                rel = f"{group}/{field}.npy"
+                np.save(os.path.join(tmp, rel), np.ascontiguousarray(arr), allow_pickle=False)
+                arrays[f"{group}.{field}"] = {
+                    "file": rel,
+                    "dtype": np.dtype(arr.dtype).str,
+                    "shape": list(arr.shape),
+                    "sha256": _sha256(os.path.join(tmp, rel)),
+                }
+
+        # Empreinte globale : features + contenu de tous les tableaux
+        digest = hashlib.sha256(json.dumps(compiled.feature_names).encode())
+        for key in sorted(arrays):
+            digest.update(arrays[key]["sha256"].encode())
+
+        manifest = {
+            "format": FORMAT_NAME,
+            "format_version": FORMAT_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "sha256": digest.hexdigest(),
+            "feature_names": compiled.feature_names,
+            "config": config or {},
+            "metrics": metrics or {},
+            "model": model_meta,
+            "shap": shap_meta,
+            "arrays": arrays,
+            **(extra or {}),
+        }
+        with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+        os.chmod(tmp, 0o755)  # mkdtemp crée le répertoire en 0o700
+        _swap(tmp, path)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    return manifest
+
+
+# ======================
+# Lecture
+# ======================
+def read_manifest(path):
+    """Lit et valide l'en-tête du bundle (format, version, features)"""
+    try:
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise BundleError(f"Manifeste illisible dans {path}: {e}") from e
+
+    if manifest.get("format") != FORMAT_NAME:
+        raise BundleError(f"{path} n'est pas un bundle de modèle ({manifest.get('format')!r})")
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise BundleError(
+            f"Version de bundle {manifest.get('format_version')} non supportée (attendue {FORMAT_VERSION}) : "
+            "reconvertir le modèle (python src/bundle.py)"
+        )
+
+    names = manifest.get("feature_names") or []
+    if not names or len(set(names)) != len(names):
+        raise BundleError("Liste de features invalide dans le manifeste")
+
+    return manifest
+
+
+def load_bundle(path, mmap_mode="r", verify=True):
+    """
+    Charge un bundle : (CompiledModel, TreeShapEngine, manifeste).
+    Les tableaux sont mappés en mémoire (lecture seule) ; leurs type et
+    forme sont contrôlés et, si verify, leur empreinte SHA-256.
+    """
+    manifest = read_manifest(path)
+    n_features = len(manifest["feature_names"])
+
+    groups = {"model": {}, "shap": {}}
+    for key, spec in manifest["arrays"].items():
+        file = os.path.join(path, spec["file"])
+        if not os.path.isfile(file):
+            raise BundleError(f"Tableau manquant : {spec['file']}")
+        if verify and _sha256(file) != spec["sha256"]:
+            raise BundleError(f"Empreinte SHA-256 invalide : {spec['file']}")
+
+        arr = np.load(file, mmap_mode=mmap_mode, allow_pickle=False)
+        if arr.dtype.str != spec["dtype"] or list(arr.shape) != spec["shape"]:
+            raise BundleError(f"Type ou forme inattendu : {spec['file']}")
+
+        group, field = key.split(".", 1)
+        groups[group][field] = arr
+
+    for group, cls in (("model", CompiledModel), ("shap", TreeShapEngine)):
+        missing = set(cls.ARRAY_FIELDS) - set(groups[group])
+        if missing:
+            raise BundleError(f"Tableaux {group} manquants : {sorted(missing)}")
+
+    for field in ("fill", "mean", "scale"):
+        if groups["model"][field].shape != (n_features,):
+            raise BundleError(f"'{field}' ne correspond pas aux {n_features} features")
+
+    compiled = CompiledModel.from_arrays(
+        groups["model"], {**manifest["model"], "feature_names": manifest["feature_names"]}
+    )
+    engine = TreeShapEngine.from_arrays(groups["shap"], manifest["shap"])
+    return compiled, engine, manifest
+
+
+# ======================
+# Conversion d'un ancien pickle
+# ======================
+def convert_pickle(pickle_path, path):
+    """Convertit un pipeline sauvegardé par joblib en bundle"""
+    import joblib
+    import sklearn
+
+    pipeline = joblib.load(pickle_path)
+    compiled = CompiledModel.from_pipeline(pipeline)
+    return save_bundle(compiled, path, extra={
+        "estimator": type(pipeline.steps[-1][1]).__name__,
+        "sklearn_version": sklearn.__version__,
+        "converted_from": os.path.basename(pickle_path),
+    })
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.exit("Usage : python src/bundle.py <modele.pkl> <repertoire_bundle>")
+    manifest = convert_pickle(sys.argv[1], sys.argv[2])
+    print(f"Bundle écrit dans {sys.argv[2]} (sha256 {manifest['sha256'][:12]})")
@@ -0,0 +1,292 @@
+"""
+Forme "compilée" d'un pipeline entraîné par train.train_model.
+
+L'imputer et le scaler sont réduits à trois vecteurs (valeurs de
+remplacement, moyennes, écarts-types) et les arbres du gradient boosting
+(GradientBoostingClassifier ou HistGradientBoostingClassifier) à des
+tables de nœuds NumPy concaténées. Le scoring d'un client ne passe
+alors plus ni par pandas ni par la validation sklearn.
+
+Ce module ne dépend que de NumPy : il est importable côté API comme
+côté entraînement.
+"""
+import math
+
+import numpy as np
+
+
+class CompiledModel:
+    """Pipeline imputer → scaler → arbres sous forme de tableaux NumPy"""
+
+    # Tableaux dans l'ordre du constructeur (voir to_arrays / from_arrays)
+    ARRAY_FIELDS = ("fill", "mean", "scale", "feature", "threshold",
+                    "left", "right", "missing_left", "value", "cover", "roots")
+
+    def __init__(self, feature_names, fill, mean, scale,
+                 feature, threshold, left, right, missing_left, value, cover, roots,
+                 init_raw, max_depth, input_dtype="float32"):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+
+        # Prétraitement : x -> (x si non manquant sinon fill - mean) / scale
+        # (fill = NaN : pas d'imputation, les NaN vont aux arbres)
+        self.fill = fill
+        self.mean = mean
+        self.scale = scale
+
+        # Tables de nœuds de tous les arbres (indices globaux).
+        # Une feuille pointe vers elle-même, sa valeur inclut le learning rate.
+        # cover = poids des échantillons d'entraînement passés par le nœud (SHAP).
+        # missing_left : branche suivie par une valeur manquante.
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.cover = cover
+        self.roots = roots
+
+        self.init_raw = float(init_raw)
+        self.max_depth = int(max_depth)
+
+        # Type des entrées comparées aux seuils : float32 pour
+        # GradientBoostingClassifier, float64 pour HistGradientBoostingClassifier
+        self.input_dtype = np.dtype(input_dtype)
+
+        self._index = {name: i for i, name in enumerate(self.feature_names)}
+
+    # ======================
+    # Construction
+    # ======================
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """
+        Compile un Pipeline sklearn : SimpleImputer et StandardScaler optionnels,
+        puis GradientBoostingClassifier ou HistGradientBoostingClassifier
+        """
+        n = len(pipeline.feature_names_in_)
+        fill = np.full(n, np.nan)
+        mean = np.zeros(n)
+        scale = np.ones(n)
+
+        *preprocessing, (_, model) = pipeline.steps
+
+        for name, step in preprocessing:
+            kind = type(step).__name__
+            if kind == "SimpleImputer":
+                if np.isnan(step.statistics_).any():
+                    raise ValueError(f"Étape '{name}' : colonnes entièrement vides non supportées")
+                fill = step.statistics_.astype(np.float64)
+            elif kind == "StandardScaler":
+                if step.mean_ is not None:
+                    mean = step.mean_.astype(np.float64)
+                if step.scale_ is not None:
+                    scale = step.scale_.astype(np.float64)
+            else:
+                raise TypeError(f"Étape '{name}' ({kind}) non supportée par la compilation")
+
+        kind = type(model).__name__
+        if kind not in _COMPILERS:
+            raise TypeError(f"Modèle {kind} non supporté par la compilation")
+
+        return cls(pipeline.feature_names_in_, fill, mean, scale, *_COMPILERS[kind](model))
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        """Reconstruit le modèle à partir de to_arrays() (sans copie des tableaux)"""
+        return cls(meta["feature_names"], *(arrays[f] for f in cls.ARRAY_FIELDS),
+                   meta["init_raw"], meta["max_depth"], meta["input_dtype"])
+
+    def to_arrays(self):
+        """Tableaux NumPy et métadonnées JSON suffisant à reconstruire le modèle"""
+        arrays = {f: getattr(self, f) for f in self.ARRAY_FIELDS}
+        meta = {
+            "feature_names": self.feature_names,
+            "init_raw": self.init_raw,
+            "max_depth": self.max_depth,
+            "input_dtype": self.input_dtype.name,
+        }
+        return arrays, meta
+
+    # ======================
+    # Scoring
+    # ======================
+    def feature_vector(self, data_dict):
+        """Vecteur de features dans l'ordre du modèle (0 pour les features absentes)"""
+        x = np.zeros(self.n_features)
+        for name, val in data_dict.items():
+            i = self._index.get(name)
+            if i is not None:
+                x[i] = val
+        return x
+
+    def transform(self, X):
+        """Applique imputation et standardisation à une matrice (n, n_features)"""
+        X = np.asarray(X, dtype=np.float64)
+        X = np.where(np.isnan(X), self.fill, X)
+        return (X - self.mean) / self.scale
+
+    def raw_predict(self, X):
+        """Score brut (log-odds) pour une matrice déjà transformée"""
+        # Les arbres sklearn comparent des entrées float32 à des seuils float64
+        # (float64 pour HistGradientBoostingClassifier)
+        X = np.asarray(X, dtype=self.input_dtype)
+        has_missing = np.isnan(X).any()
+        rows = np.arange(X.shape[0])[:, None]
+
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = x <= self.threshold[node]
+            if has_missing:
+                go_left |= np.isnan(x) & self.missing_left[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return self.init_raw + self.value[node].sum(axis=1)
+
+    def predict_proba(self, X):
+        """Équivalent de pipeline.predict_proba pour une matrice brute (n, n_features)"""
+        X = np.atleast_2d(X)
+        proba = 1.0 / (1.0 + np.exp(-self.raw_predict(self.transform(X))))
+        return np.column_stack([1.0 - proba, proba])
+
+    def predict_proba_one(self, x):
+        """Probabilité de défaut d'un client (dict ou vecteur de features)"""
+        if isinstance(x, dict):
+            x = self.feature_vector(x)
+
+        # Chemin 1-D : évite les matrices (1, n) et l'indexation par ligne
+        x = self.transform(x).astype(self.input_dtype)
+        has_missing = np.isnan(x).any()
+        node = self.roots
+        for _ in range(self.max_depth):
+            xv = x[self.feature[node]]
+            go_left = xv <= self.threshold[node]
+            if has_missing:
+                go_left |= np.isnan(xv) & self.missing_left[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        raw = self.init_raw + self.value[node].sum()
+        return 1.0 / (1.0 + math.exp(-raw))
+
+    # ======================
+    # Structure des arbres
+    # ======================
+    def split_values(self, name):
+        """
+        Seuils de split distincts d'une feature, ramenés à l'échelle des
+        entrées brutes (triés) : le score est constant entre deux seuils consécutifs
+        """
+        i = self._index[name]
+        internal = (self.feature == i) & (self.left != np.arange(len(self.left)))
+        return np.unique(self.threshold[internal] * self.scale[i] + self.mean[i])
+
+
+def _compile_gradient_boosting(model):
+    """Aplatit les arbres d'un GradientBoostingClassifier binaire en tables de nœuds"""
+    if model.n_trees_per_iteration_ != 1:
+        raise TypeError("Seuls les GradientBoostingClassifier binaires sont supportés")
+
+    features, thresholds, lefts, rights, missing, values, covers, roots = [], [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for estimator in model.estimators_[:, 0]:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        ids = np.arange(tree.node_count)
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(is_leaf, ids, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, ids, tree.children_right) + offset)
+        missing.append(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count)))
+        values.append(np.where(is_leaf, tree.value[:, 0, 0] * model.learning_rate, 0.0))
+        covers.append(tree.weighted_n_node_samples)
+        roots.append(offset)
+
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    return (
+        np.concatenate(features).astype(np.intp),
+        np.concatenate(thresholds).astype(np.float64),
+        np.concatenate(lefts).astype(np.intp),
+        np.concatenate(rights).astype(np.intp),
+        np.concatenate(missing).astype(bool),
+        np.concatenate(values).astype(np.float64),
+        np.concatenate(covers).astype(np.float64),
+        np.asarray(roots, dtype=np.intp),
+        _init_raw_prediction(model),
+        max_depth,
+        "float32",
+    )
+
+
+def _compile_hist_gradient_boosting(model):
+    """
+    Aplatit les prédicteurs d'un HistGradientBoostingClassifier binaire.
+    Les seuils portent sur les valeurs brutes (num_threshold), les entrées
+    restent en float64 et les NaN suivent missing_go_to_left.
+    """
+    if model.n_trees_per_iteration_ != 1:
+        raise TypeError("Seuls les HistGradientBoostingClassifier binaires sont supportés")
+    if model.is_categorical_ is not None and np.any(model.is_categorical_):
+        raise TypeError("Features catégorielles natives non supportées par la compilation")
+
+    features, thresholds, lefts, rights, missing, values, covers, roots = [], [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for (predictor,) in model._predictors:
+        nodes = predictor.nodes
+        is_leaf = nodes["is_leaf"].astype(bool)
+        ids = np.arange(len(nodes))
+
+        features.append(np.where(is_leaf, 0, nodes["feature_idx"]))
+        thresholds.append(nodes["num_threshold"])
+        lefts.append(np.where(is_leaf, ids, nodes["left"]) + offset)
+        rights.append(np.where(is_leaf, ids, nodes["right"]) + offset)
+        missing.append(nodes["missing_go_to_left"])
+        values.append(np.where(is_leaf, nodes["value"], 0.0))
+        covers.append(nodes["count"])
+        roots.append(offset)
+
+        offset += len(nodes)
+        max_depth = max(max_depth, int(nodes["depth"].max()))
+
+    return (
+        np.concatenate(features).astype(np.intp),
+        np.concatenate(thresholds).astype(np.float64),
+        np.concatenate(lefts).astype(np.intp),
+        np.concatenate(rights).astype(np.intp),
+        np.concatenate(missing).astype(bool),
+        np.concatenate(values).astype(np.float64),
+        np.concatenate(covers).astype(np.float64),
+        np.asarray(roots, dtype=np.intp),
+        float(np.ravel(model._baseline_prediction)[0]),
+        max_depth,
+        "float64",
+    )
+
+
+def _init_raw_prediction(model):
+    """Score brut initial (log-odds de la probabilité a priori)"""
+    if isinstance(model.init_, str) and model.init_ == "zero":
+        return 0.0
+
+    eps = np.finfo(np.float32).eps
+    proba = np.clip(model.init_.class_prior_[1], eps, 1 - eps)
+    return np.log(proba / (1 - proba))
+
+
+_COMPILERS = {
+    "GradientBoostingClassifier": _compile_gradient_boosting,
+    "HistGradientBoostingClassifier": _compile_hist_gradient_boosting,
+}
+
+
+def compile_pipeline(pipeline):
+    """Raccourci : CompiledModel.from_pipeline(pipeline)"""
+    return CompiledModel.from_pipeline(pipeline)
@@ -7,3 +7,60 @@ TARGET = "TARGET"  # remplacer par la vraie colonne cible du CSV
 TEST_SIZE = 0.2
 RANDOM_STATE = 42
 N_ESTIMATORS = 100
+
+# Moteur d'entraînement (train.build_pipeline) :
+# "gb" : GradientBoostingClassifier ; "hist" : HistGradientBoostingClassifier
+MODEL_BACKEND = "gb"
+LEARNING_RATE = 0.1
+HIST_MAX_ITER = 1000        # plafond : l'arrêt anticipé fixe le nombre d'itérations
+HIST_MAX_LEAF_NODES = 31
+HIST_MAX_DEPTH = 6          # borne la taille des tables TreeSHAP de l'API (2^profondeur motifs par feuille)
+HIST_EARLY_STOPPING = True
+VALIDATION_FRACTION = 0.1   # part du train réservée à l'arrêt anticipé
+N_ITER_NO_CHANGE = 20
+HIST_IMPUTE = False         # NaN gérés nativement par le moteur "hist"
+
+# Évaluation : "holdout" (jeu de test seul) ou "cv" (validation croisée
+# stratifiée sur le train, plis entraînés en parallèle, puis jeu de test)
+EVAL_MODE = "holdout"
+CV_FOLDS = 5
+CV_N_JOBS = None            # process parallèles (None = nombre de cœurs)
+
+# Recherche d'hyperparamètres (tune.py) : successive halving en parallèle
+TUNE = False                # étape de recherche avant l'entraînement final
+TUNE_N_CANDIDATES = 27      # configurations tirées au premier tour
+TUNE_FACTOR = 3             # 1/TUNE_FACTOR des essais survivent à chaque tour
+TUNE_VALIDATION_SIZE = 0.2  # part du train utilisée pour noter les essais (AUC)
+TUNE_N_JOBS = None          # process parallèles (None = nombre de cœurs)
+
+# Seuil de décision (threshold.py) : minimise le coût des erreurs sur les
+# probabilités hors-pli (EVAL_MODE = "cv") ou d'un jeu de validation pris
+# sur le train (EVAL_MODE = "holdout"), jamais sur le jeu de test
+THRESHOLD_VALIDATION_SIZE = 0.2  # part du train réservée au seuil en "holdout"
+COST_FN = 10.0              # coût d'un défaut accordé (faux négatif)
+COST_FP = 1.0               # coût d'un bon client refusé (faux positif)
+LOW_RISK_DEFAULT_RATE = 0.03  # taux de défaut maximal observé du niveau "Faible"
+
+# Explication globale (shap_job.py) : valeurs SHAP d'un échantillon
+# stratifié, calculées par blocs en parallèle, stockées avec le bundle
+SHAP_SAMPLE_SIZE = 50_000
+SHAP_CHUNK_SIZE = 5_000     # lignes par tâche du pool
+SHAP_N_JOBS = None          # process parallèles (None = nombre de cœurs)
+SHAP_DEPENDENCE_BINS = 20   # intervalles des courbes de dépendance (explain/global.json)
+
+# Chargement des données (prepare.read_dataset)
+FEATURES = None         # colonnes à lire (hors cible) ; None = toutes
+CHUNK_SIZE = 50_000     # lignes par bloc (moteur "c")
+CSV_ENGINE = "c"        # "c" (par blocs) ou "pyarrow" (multi-thread, plus rapide mais plus gourmand en mémoire)
+
+# Cache colonnaire (Feather) du CSV typé, invalidé quand le CSV change
+DATA_CACHE = True
+DATA_CACHE_DIR = BASE_DIR / "data" / "cache"
+
+# Bundle du modèle (manifest.json + tableaux .npy) servi par l'API
+MODEL_BUNDLE_DIR = BASE_DIR / "models" / "credit_scoring_model"
+
+# Scoring d'un fichier (score.py) : lecture par blocs, process parallèles
+SCORE_CHUNK_SIZE = 20_000   # lignes par bloc (approximatif pour un CSV, découpé par octets)
+SCORE_N_JOBS = None         # process parallèles (None = nombre de cœurs)
+SCORE_TOP_K = 0             # facteurs SHAP par ligne (0 = pas d'explication)
@@ -0,0 +1,97 @@
+"""
+Recherche contrefactuelle : plus petite modification des montants d'un
+client qui fait passer sa probabilité de défaut sous le seuil de décision.
+
+Le score d'un ensemble d'arbres est constant entre deux seuils de split
+consécutifs d'une feature : seules les valeurs qui franchissent un seuil
+peuvent changer la prédiction. Les candidats d'une feature sont donc sa
+valeur actuelle et, pour chaque seuil à moins de max_change (variation
+relative) de cette valeur, l'entier le plus proche de l'autre côté du seuil.
+
+Toutes les combinaisons sont générées d'un coup, triées par coût (somme
+des variations relatives) puis scorées par lots dans cet ordre : le premier
+lot qui contient une combinaison acceptée donne la modification de coût
+minimal, sans scorer les combinaisons plus coûteuses.
+
+Ne dépend que de NumPy (comme compiled.py).
+"""
+import numpy as np
+
+# Montants sur lesquels le client peut agir
+ACTIONABLE_FEATURES = ("AMT_CREDIT", "AMT_ANNUITY", "AMT_GOODS_PRICE")
+
+MAX_CHANGE = 0.5           # variation relative maximale de chaque feature
+BATCH_SIZE = 1024          # combinaisons scorées par appel vectorisé
+MAX_CANDIDATES = 100_000   # au-delà, on ne garde que les valeurs les plus proches de l'actuelle
+
+
+def candidate_values(compiled, value, name, max_change=MAX_CHANGE):
+    """
+    Valeurs candidates d'une feature : la valeur actuelle (en premier) puis
+    le plus grand entier sous chaque seuil inférieur et le plus petit entier
+    au-dessus de chaque seuil supérieur, à moins de max_change de l'actuelle
+    """
+    splits = compiled.split_values(name)
+    below = np.ceil(splits[splits < value]) - 1   # x <= seuil : branche gauche
+    above = np.floor(splits[splits >= value]) + 1
+    values = np.unique(np.concatenate([below, above]))
+
+    margin = max_change * abs(value)
+    values = values[(np.abs(values - value) <= margin) & (values != value)]
+    return np.concatenate([[value], values])
+
+
+def _closest(values, k):
+    """Les k valeurs candidates les plus proches de l'actuelle (values[0] gardée en premier)"""
+    if len(values) <= k:
+        return values
+    order = np.argsort(np.abs(values[1:] - values[0]), kind="stable")[:k - 1]
+    return np.concatenate([values[:1], values[1:][np.sort(order)]])
+
+
+def search(compiled, x, threshold, features=ACTIONABLE_FEATURES, max_change=MAX_CHANGE,
+           batch_size=BATCH_SIZE, max_candidates=MAX_CANDIDATES):
+    """
+    Plus petite modification des features de x (vecteur brut) telle que la
+    probabilité de défaut soit <= threshold.
+
+    Renvoie (solution, nombre de combinaisons scorées) ; solution vaut None
+    si aucune combinaison ne convient, sinon un dict : "values" (nouvelle
+    valeur de chaque feature modifiée), "proba" et "cost" (somme des
+    variations relatives).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    features = [f for f in features if f in compiled.feature_names]
+    idx = [compiled.feature_names.index(f) for f in features]
+    base = x[idx]
+
+    grids = [candidate_values(compiled, v, f, max_change) for f, v in zip(features, base)]
+    # Aucune feature modifiable, ou aucune valeur autre que l'actuelle
+    if all(len(g) == 1 for g in grids):
+        return None, 0
+    per_feature = max(2, int(max_candidates ** (1 / max(len(grids), 1))))
+    if np.prod([len(g) for g in grids], dtype=np.float64) > max_candidates:
+        grids = [_closest(g, per_feature) for g in grids]
+
+    # Toutes les combinaisons ; la première (aucune modification) est écartée
+    combos = np.stack(np.meshgrid(*grids, indexing="ij"), axis=-1).reshape(-1, len(idx))[1:]
+    cost = (np.abs(combos - base) / np.maximum(np.abs(base), 1.0)).sum(axis=1)
+    order = np.argsort(cost, kind="stable")
+
+    evaluated = 0
+    for start in range(0, len(order), batch_size):
+        rows = order[start:start + batch_size]
+        X = np.repeat(x[None, :], len(rows), axis=0)
+        X[:, idx] = combos[rows]
+        proba = compiled.predict_proba(X)[:, 1]
+        evaluated += len(rows)
+
+        accepted = np.flatnonzero(proba <= threshold)
+        if len(accepted):
+            # Lignes triées par coût : la première acceptée est la moins coûteuse
+            best = accepted[0]
+            changed = combos[rows[best]] != base
+            values = {f: float(v) for f, v, c in zip(features, combos[rows[best]], changed) if c}
+            return {"values": values, "proba": float(proba[best]), "cost": float(cost[rows[best]])}, evaluated
+
+    return None, evaluated
@@ -1,11 +1,134 @@
-from sklearn.metrics import accuracy_score, roc_auc_score
+import contextlib
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import mlflow
+import numpy as np
+from sklearn.metrics import accuracy_score, roc_auc_score, precision_score, recall_score
+from sklearn.model_selection import StratifiedKFold
+from threadpoolctl import threadpool_limits
+from config import MODEL_BACKEND, RANDOM_STATE, CV_FOLDS, CV_N_JOBS
+from train import build_pipeline
+
+METRICS = ("auc", "accuracy", "precision", "recall")
+
+
+def _scores(y_true, y_pred, y_proba):
+    return {
+        "auc": float(roc_auc_score(y_true, y_proba)),
+        "accuracy": float(accuracy_score(y_true, y_pred)),
+        "precision": float(precision_score(y_true, y_pred, zero_division=0)),
+        "recall": float(recall_score(y_true, y_pred, zero_division=0)),
+    }
+
+
+def _mlflow_run(run_name):
+    """Run MLflow courant, ou run dédié (fermé ensuite) s'il n'y en a pas"""
+    if mlflow.active_run():
+        return contextlib.nullcontext()
+    return mlflow.start_run(run_name=run_name)
+
 
 def evaluate_model(model, X_test, y_test):
     y_pred = model.predict(X_test)
     y_proba = model.predict_proba(X_test)[:, 1]
 
-    accuracy = accuracy_score(y_test, y_pred)
-    auc = roc_auc_score(y_test, y_proba)
+    metrics = _scores(y_test, y_pred, y_proba)
+
+    print(f"Accuracy: {metrics['accuracy']}")
+    print(f"AUC: {metrics['auc']}")
+    print(f"Precision: {metrics['precision']}, Recall: {metrics['recall']}")
+
+    with _mlflow_run("evaluation"):
+        for name, value in metrics.items():
+            mlflow.log_metric(name, value)
+
+    return metrics
+
+
+# ======================
+# Validation croisée stratifiée en parallèle
+# ======================
+def _fit_fold(data_dir, fold, train_idx, test_idx, backend, params, n_threads):
+    """
+    Entraîne et note un pli dans un process du pool. X et y sont lus en
+    mémoire mappée depuis data_dir : le dataset n'est jamais picklé.
+    """
+    threadpool_limits(n_threads)
+    X = np.load(os.path.join(data_dir, "X.npy"), mmap_mode="r")
+    y = np.load(os.path.join(data_dir, "y.npy"), mmap_mode="r")
+
+    start = time.perf_counter()
+    pipeline = build_pipeline(backend, params)
+    pipeline.fit(X[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_proba = pipeline.predict_proba(X[test_idx])[:, 1]
+    predict_seconds = time.perf_counter() - start
+
+    scores = _scores(y[test_idx], (y_proba > 0.5).astype(int), y_proba)
+    return {"fold": fold, **scores, "fit_seconds": fit_seconds,
+            "predict_seconds": predict_seconds, "proba": y_proba}
+
+
+def cross_validate_model(X, y, backend=MODEL_BACKEND, params=None, n_splits=CV_FOLDS,
+                         n_jobs=CV_N_JOBS, seed=RANDOM_STATE):
+    """
+    Validation croisée stratifiée à n_splits plis, entraînés en parallèle.
+    Renvoie la moyenne et l'écart-type de chaque métrique, le détail par pli
+    (métriques et durées) et les probabilités hors-pli.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    folds = list(StratifiedKFold(n_splits, shuffle=True, random_state=seed).split(X, y))
+
+    n_workers = min(n_splits, n_jobs or os.cpu_count())
+    n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="cv-") as data_dir:
+        np.save(os.path.join(data_dir, "X.npy"), X)
+        np.save(os.path.join(data_dir, "y.npy"), y)
+
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [pool.submit(_fit_fold, data_dir, i, train_idx, test_idx, backend, params, n_threads)
+                       for i, (train_idx, test_idx) in enumerate(folds)]
+            results = [f.result() for f in futures]
+    wall_seconds = time.perf_counter() - start
+
+    oof_proba = np.empty(len(y))
+    for (_, test_idx), r in zip(folds, results):
+        oof_proba[test_idx] = r.pop("proba")
+
+    summary = {
+        "mean": {m: float(np.mean([r[m] for r in results])) for m in METRICS},
+        "std": {m: float(np.std([r[m] for r in results])) for m in METRICS},
+        "folds": results,
+        "oof_auc": float(roc_auc_score(y, oof_proba)),
+        "oof_proba": oof_proba,
+        "wall_seconds": wall_seconds,
+        "fit_seconds": float(sum(r["fit_seconds"] for r in results)),
+    }
+
+    for r in results:
+        print(f"Pli {r['fold']} : AUC {r['auc']:.4f}, accuracy {r['accuracy']:.4f}, "
+              f"precision {r['precision']:.4f}, recall {r['recall']:.4f}, "
+              f"entraînement {r['fit_seconds']:.1f}s, prédiction {r['predict_seconds']:.2f}s")
+    print(f"CV {n_splits} plis ({n_workers} process) : AUC {summary['mean']['auc']:.4f} "
+          f"± {summary['std']['auc']:.4f}, {wall_seconds:.1f}s "
+          f"(somme des entraînements {summary['fit_seconds']:.1f}s)")
+
+    with _mlflow_run("cross_validation"):
+        for m in METRICS:
+            mlflow.log_metric(f"cv_{m}_mean", summary["mean"][m])
+            mlflow.log_metric(f"cv_{m}_std", summary["std"][m])
+        for r in results:
+            for key in (*METRICS, "fit_seconds", "predict_seconds"):
+                mlflow.log_metric(f"cv_fold_{key}", r[key], step=r["fold"])
+        mlflow.log_metric("cv_oof_auc", summary["oof_auc"])
+        mlflow.log_metric("cv_wall_seconds", wall_seconds)
 
-    print(f"Accuracy: {accuracy}")
-    print(f"AUC: {auc}")
+    return summary
@@ -1,6 +1,12 @@
+import os
+
+import mlflow
+import numpy as np
 import shap
 import matplotlib.pyplot as plt
 import pandas as pd
+from config import MODEL_BUNDLE_DIR
+from shap_job import EXPLAIN_DIR, load_global
 
 def explain_model(pipeline, X_sample: pd.DataFrame):
     """
@@ -40,3 +46,45 @@ def explain_model(pipeline, X_sample: pd.DataFrame):
     # Sauvegarder le graphique
     plt.savefig("shap_beeswarm.png")
     plt.close()
+
+
+# ======================
+# Explication globale (à partir de la matrice SHAP de shap_job.py)
+# ======================
+def render_global(bundle_dir=MODEL_BUNDLE_DIR):
+    """
+    Graphiques beeswarm et importance moyenne, et tableau d'importance globale
+    (global_importance.csv), produits à partir des valeurs SHAP stockées
+    dans <bundle_dir>/explain/ sans recalcul. Renvoie les chemins écrits.
+    """
+    summary, features, values = load_global(bundle_dir)
+    names = summary["feature_names"]
+    out_dir = os.path.join(bundle_dir, EXPLAIN_DIR)
+
+    shap_values = shap.Explanation(
+        values=np.asarray(values),
+        base_values=np.full(len(values), summary["expected_value"]),
+        data=np.asarray(features),
+        feature_names=names
+    )
+
+    paths = []
+    for name, plot in (("shap_beeswarm.png", shap.plots.beeswarm), ("shap_importance.png", shap.plots.bar)):
+        plot(shap_values, max_display=20, show=False)
+        paths.append(os.path.join(out_dir, name))
+        plt.savefig(paths[-1], bbox_inches="tight")
+        plt.close()
+
+    magnitude = np.abs(values)
+    importance = pd.DataFrame({
+        "feature": names,
+        "mean_abs_shap": magnitude.mean(axis=0),
+        "mean_shap": np.asarray(values).mean(axis=0),
+    }).sort_values("mean_abs_shap", ascending=False)
+    paths.append(os.path.join(out_dir, "global_importance.csv"))
+    importance.to_csv(paths[-1], index=False)
+
+    if mlflow.active_run():
+        for path in paths:
+            mlflow.log_artifact(path, artifact_path=EXPLAIN_DIR)
+    return paths
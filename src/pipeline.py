@@ -1,10 +1,37 @@
 import mlflow
-import os
-import joblib
+import sklearn
+from sklearn.model_selection import train_test_split
+import config
+from bundle import save_bundle
+from compiled import compile_pipeline
 from prepare import load_data
 from train import train_model
-from evaluate import evaluate_model
-from explain import explain_model
+from tune import tune_model
+from evaluate import cross_validate_model, evaluate_model
+from explain import render_global
+from shap_job import explain_global
+from threshold import decision_policy
+
+def training_config(tuned_params=None):
+    """Paramètres d'entraînement enregistrés dans le manifeste du bundle"""
+    params = {
+        "target": config.TARGET,
+        "test_size": config.TEST_SIZE,
+        "random_state": config.RANDOM_STATE,
+        "backend": config.MODEL_BACKEND,
+        "learning_rate": config.LEARNING_RATE,
+    }
+    if tuned_params:
+        params["tuned_params"] = tuned_params
+    if config.MODEL_BACKEND == "hist":
+        params.update(max_iter=config.HIST_MAX_ITER, max_leaf_nodes=config.HIST_MAX_LEAF_NODES,
+                      max_depth=config.HIST_MAX_DEPTH, early_stopping=config.HIST_EARLY_STOPPING,
+                      validation_fraction=config.VALIDATION_FRACTION,
+                      n_iter_no_change=config.N_ITER_NO_CHANGE, impute=config.HIST_IMPUTE)
+    else:
+        params["n_estimators"] = config.N_ESTIMATORS
+    return params
+
 
 def run_pipeline():
     with mlflow.start_run(run_name="credit_pipeline"):
@@ -15,28 +42,68 @@ def run_pipeline():
         X_train, X_test, y_train, y_test = load_data()
         print(f"X_train shape: {X_train.shape}, X_test shape: {X_test.shape}")
 
+        # Sans validation croisée, le seuil de décision est choisi sur une
+        # part du train mise de côté : les métriques du jeu de test restent
+        # indépendantes du seuil
+        X_fit, y_fit = X_train, y_train
+        if config.EVAL_MODE != "cv":
+            X_fit, X_val, y_fit, y_val = train_test_split(
+                X_train, y_train, test_size=config.THRESHOLD_VALIDATION_SIZE,
+                random_state=config.RANDOM_STATE, stratify=y_train
+            )
+
         # ======================
-        # 2️ Entraîner le modèle
+        # 2️ Entraîner le modèle (après recherche d'hyperparamètres si TUNE)
         # ======================
-        model = train_model(X_train, y_train)
+        best_params = None
+        if config.TUNE:
+            model, best_params = tune_model(X_fit, y_fit)
+        else:
+            model = train_model(X_fit, y_fit)
         print("Pipeline entraîné :", model)
 
         # ======================
-        # 3️ Évaluer le modèle
+        # 3️ Évaluer le modèle (et validation croisée si EVAL_MODE = "cv")
         # ======================
-        evaluate_model(model, X_test, y_test)
+        metrics = evaluate_model(model, X_test, y_test)
+        if config.EVAL_MODE == "cv":
+            cv = cross_validate_model(X_train, y_train, params=best_params)
+            metrics.update({f"cv_{m}_{stat}": v for stat in ("mean", "std") for m, v in cv[stat].items()})
+
+        # Seuil de décision au coût minimal, sur des probabilités jamais vues
+        # à l'entraînement : hors-pli, sinon jeu de validation
+        if config.EVAL_MODE == "cv":
+            decision = decision_policy(y_train, cv["oof_proba"], source="oof")
+        else:
+            decision = decision_policy(y_val, model.predict_proba(X_val)[:, 1], source="validation")
+        mlflow.log_metrics({"decision_threshold": decision["threshold"],
+                            "decision_expected_cost": decision["expected_cost"]})
+        print(f"Seuil de décision : {decision['threshold']:.3f} (coût moyen {decision['expected_cost']:.4f}, "
+              f"niveaux de risque {decision['risk_bands']})")
 
         # ======================
-        # 4️ Expliquer le modèle avec SHAP sur 100 instances
+        # 4️ Sauvegarder le bundle du modèle pour l’API
         # ======================
-        explain_model(model, X_test[:100])
+        manifest = save_bundle(
+            compile_pipeline(model),
+            config.MODEL_BUNDLE_DIR,
+            config=training_config(best_params),
+            metrics=metrics,
+            extra={"estimator": type(model.steps[-1][1]).__name__,
+                   "sklearn_version": sklearn.__version__,
+                   "decision": decision},
+        )
+        mlflow.log_param("bundle_sha256", manifest["sha256"])
+        print(f"Modèle sauvegardé dans {config.MODEL_BUNDLE_DIR} (sha256 {manifest['sha256'][:12]})")
 
         # ======================
-        # 5️ Sauvegarder le modèle pour l’API
+        # 5️ Expliquer le modèle avec SHAP sur un échantillon stratifié du train
+        # (calcul en parallèle, matrice stockée avec le bundle, graphiques sans recalcul)
         # ======================
-        os.makedirs("models", exist_ok=True)
-        joblib.dump(model, "models/credit_scoring_model.pkl")
-        print("Modèle sauvegardé dans models/credit_scoring_model.pkl")
+        explanation = explain_global(X_train, y_train, config.MODEL_BUNDLE_DIR)
+        mlflow.log_metrics({"shap_rows": explanation["n_rows"],
+                            "shap_seconds": explanation["wall_seconds"]})
+        render_global(config.MODEL_BUNDLE_DIR)
 
 if __name__ == "__main__":
     run_pipeline()
@@ -1,13 +1,219 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 from sklearn.model_selection import train_test_split
-from config import DATA_PATH, TARGET, TEST_SIZE, RANDOM_STATE
+from config import (DATA_PATH, TARGET, TEST_SIZE, RANDOM_STATE, FEATURES, CHUNK_SIZE, CSV_ENGINE,
+                    DATA_CACHE, DATA_CACHE_DIR)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pas de cache sans pyarrow
+    feather = None
+
+# Lignes lues pour deviner les colonnes décimales (lues directement en float32)
+DTYPE_SAMPLE_ROWS = 1000
+
+# À incrémenter si les règles de typage de read_dataset changent :
+# fait partie de la clé du cache, les anciens fichiers sont alors ignorés
+DTYPE_RULES_VERSION = 1
+
+
+def _peak_memory_mb():
+    """Pic de mémoire résidente du process (Mo), si disponible (ru_maxrss en Ko sous Linux)"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _float32_columns(path, usecols):
+    """Colonnes décimales d'après un échantillon : le parseur les produit en float32"""
+    sample = pd.read_csv(path, usecols=usecols, nrows=DTYPE_SAMPLE_ROWS, engine="c")
+    return {col: "float32" for col in sample.columns if sample[col].dtype.kind == "f"}
+
+
+def _downcast(chunk):
+    """float -> float32, entiers -> plus petit type (int8 pour les indicateurs), texte -> category"""
+    for col in chunk.columns:
+        kind = chunk[col].dtype.kind
+        if kind == "f":
+            chunk[col] = chunk[col].astype(np.float32)
+        elif kind in "iub":
+            chunk[col] = pd.to_numeric(chunk[col], downcast="integer")
+        elif kind == "O" or isinstance(chunk[col].dtype, pd.StringDtype):
+            chunk[col] = chunk[col].astype("category")
+    return chunk
+
+
+def _concat(chunks):
+    """Concatène les blocs en conservant les catégories (union des modalités)"""
+    if len(chunks) == 1:
+        return chunks[0]
+
+    categorical = [c for c in chunks[0].columns if isinstance(chunks[0][c].dtype, pd.CategoricalDtype)]
+    merged = {c: union_categoricals([chunk[c] for chunk in chunks]) for c in categorical}
+
+    df = pd.concat([chunk.drop(columns=categorical) for chunk in chunks], ignore_index=True)
+    for c in categorical:
+        df[c] = merged[c]
+    return df[chunks[0].columns]
+
+
+def _project(available, columns):
+    """Colonnes à garder (ordre du fichier), cible comprise"""
+    available = list(available)
+    if columns is None:
+        return available
+
+    missing = [c for c in columns if c not in available]
+    if missing:
+        raise ValueError(f"Colonnes absentes du dataset : {missing}")
+    return [c for c in available if c in set(columns) | {TARGET}]
+
+
+def read_dataset(path=DATA_PATH, columns=FEATURES, chunksize=CHUNK_SIZE, engine=CSV_ENGINE):
+    """
+    Lit le CSV en ne gardant que `columns` (+ la cible), par blocs de
+    `chunksize` lignes, avec des types réduits (float32, int8, category).
+    engine="pyarrow" utilise le parseur multi-thread de pyarrow
+    (fichier lu d'un bloc, colonnes déjà filtrées).
+    """
+    start = time.perf_counter()
+
+    header = pd.read_csv(path, nrows=0).columns.tolist()
 
-def load_data():
-    df = pd.read_csv(DATA_PATH)
-    
     # Vérifie que la colonne cible existe
-    if TARGET not in df.columns:
-        raise ValueError(f"La colonne cible '{TARGET}' n'existe pas dans le dataset. Colonnes trouvées : {df.columns.tolist()}")
+    if TARGET not in header:
+        raise ValueError(f"La colonne cible '{TARGET}' n'existe pas dans le dataset. Colonnes trouvées : {header}")
+
+    usecols = _project(header, columns)
+
+    dtype = _float32_columns(path, usecols)
+
+    if engine == "pyarrow":
+        reader = pd.read_csv(path, usecols=usecols, dtype=dtype, engine="pyarrow")
+    else:
+        reader = pd.read_csv(path, usecols=usecols, dtype=dtype, engine=engine, chunksize=chunksize)
+
+    # Un DataFrame (pyarrow) est traité comme un bloc unique
+    chunks = [reader] if isinstance(reader, pd.DataFrame) else reader
+    df = _concat([_downcast(chunk[usecols]) for chunk in chunks])
+
+    peak = _peak_memory_mb()
+    print(f"Données chargées : {df.shape[0]} lignes x {df.shape[1]} colonnes en "
+          f"{time.perf_counter() - start:.2f}s, {df.memory_usage(deep=True).sum() / 1e6:.1f} Mo"
+          + (f", pic mémoire du process {peak:.0f} Mo" if peak else ""))
+    return df
+
+
+# ======================
+# Cache colonnaire (Feather)
+# ======================
+def _content_hash(path, cache_dir):
+    """
+    SHA-256 du contenu du CSV. Un fichier annexe garde (taille, mtime, hash) :
+    tant que le fichier n'a pas été modifié, le hash n'est pas recalculé.
+    """
+    stat = os.stat(path)
+    sidecar = os.path.join(cache_dir, f"{os.path.basename(path)}.stat.json")
+    signature = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    try:
+        with open(sidecar) as f:
+            known = json.load(f)
+        if {k: known.get(k) for k in signature} == signature:
+            return known["sha256"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 24), b""):
+            digest.update(block)
+
+    with open(sidecar, "w") as f:
+        json.dump({**signature, "sha256": digest.hexdigest()}, f)
+    return digest.hexdigest()
+
+
+def _columns_key(columns):
+    """Clé du jeu de colonnes d'un fichier de cache ("all" : toutes les colonnes)"""
+    if columns is None:
+        return "all"
+    return hashlib.sha256("\0".join(sorted(set(columns) | {TARGET})).encode()).hexdigest()[:8]
+
+
+def _schema_columns(cache_path):
+    with pa.memory_map(cache_path) as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def _covering_cache(cache_dir, prefix, columns):
+    """Fichier de cache de ce CSV contenant `columns` (+ la cible), ou None"""
+    for name in sorted(os.listdir(cache_dir)):
+        if name.startswith(prefix) and name.endswith(".feather"):
+            candidate = os.path.join(cache_dir, name)
+            names = set(_schema_columns(candidate))
+            if TARGET in names and (columns is None and name.endswith("-all.feather")
+                                    or columns is not None and names.issuperset(columns)):
+                return candidate
+    return None
+
+
+def load_dataset(path=DATA_PATH, columns=FEATURES, cache_dir=DATA_CACHE_DIR):
+    """
+    read_dataset avec un cache Feather (Arrow, non compressé) des colonnes
+    typées. Clé : hash du contenu du CSV, version des règles de typage et
+    jeu de colonnes ; un CSV modifié produit une nouvelle clé et ses anciens
+    fichiers sont supprimés. Au premier chargement, seules les colonnes
+    demandées (+ la cible) sont lues du CSV ; ensuite, tout fichier de
+    cache du même CSV qui les contient est mappé en mémoire et seules ces
+    colonnes sont chargées.
+    """
+    if not DATA_CACHE or feather is None or not os.path.isfile(path):
+        return read_dataset(path, columns=columns)
+
+    start = time.perf_counter()
+    os.makedirs(cache_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    prefix = f"{stem}-v{DTYPE_RULES_VERSION}-{_content_hash(path, cache_dir)[:16]}-"
+    cache_path = _covering_cache(cache_dir, prefix, columns)
+
+    if cache_path is None:
+        df = read_dataset(path, columns=columns)
+
+        # Fichiers d'un ancien contenu du CSV ou d'anciennes règles de typage
+        for name in os.listdir(cache_dir):
+            if name.startswith(f"{stem}-") and name.endswith(".feather") and not name.startswith(prefix):
+                os.remove(os.path.join(cache_dir, name))
+
+        cache_path = os.path.join(cache_dir, f"{prefix}{_columns_key(columns)}.feather")
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        feather.write_feather(df, tmp, compression="uncompressed")
+        os.replace(tmp, cache_path)
+        print(f"Cache écrit : {cache_path}")
+        return df
+
+    table = feather.read_table(cache_path, columns=_project(_schema_columns(cache_path), columns), memory_map=True)
+    df = table.to_pandas(split_blocks=True)
+
+    print(f"Données chargées depuis le cache : {df.shape[0]} lignes x {df.shape[1]} colonnes "
+          f"en {time.perf_counter() - start:.2f}s")
+    return df
+
+
+def load_data():
+    df = load_dataset()
 
     X = df.drop(TARGET, axis=1)
     y = df[TARGET]
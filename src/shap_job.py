@@ -0,0 +1,222 @@
+"""
+Explication globale du modèle : valeurs SHAP sur un large échantillon.
+
+Étape séparée de l'entraînement, lancée après l'écriture du bundle (ou
+seule : python src/shap_job.py). Un échantillon stratifié de
+SHAP_SAMPLE_SIZE lignes est expliqué par blocs de SHAP_CHUNK_SIZE dans un
+pool de process. Chaque process charge le bundle (tableaux mappés en
+mémoire) et écrit ses lignes directement dans la matrice SHAP, un .npy
+mappé en mémoire : ni le modèle, ni les données, ni les résultats ne sont
+picklés.
+
+Résultat, à côté du modèle (répertoire explain/ du bundle) :
+
+    explain.json        échantillon, durée, valeur de base, empreinte du bundle
+    features.npy        valeurs brutes des features de l'échantillon (float64)
+    shap_values.npy     valeurs SHAP (log-odds) de ces lignes (float32)
+    global.json         statistiques agrégées par feature (global_summary),
+                        servies telles quelles par l'API (/explain/global)
+
+Les graphiques et tableaux (explain.render_global) sont produits à partir
+de ces fichiers, sans recalcul.
+"""
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+from bundle import load_bundle
+from config import (MODEL_BUNDLE_DIR, RANDOM_STATE, SHAP_SAMPLE_SIZE, SHAP_CHUNK_SIZE,
+                    SHAP_N_JOBS, SHAP_DEPENDENCE_BINS)
+
+EXPLAIN_DIR = "explain"
+SUMMARY = "explain.json"
+GLOBAL_STATS = "global.json"
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Modèle et fichiers des process du pool (renseignés par _init_worker)
+_worker = {}
+
+
+def stratified_sample(y, size, seed=RANDOM_STATE):
+    """Indices (triés) d'un échantillon de `size` lignes respectant la proportion des classes"""
+    y = np.asarray(y)
+    if size >= len(y):
+        return np.arange(len(y))
+    idx, _ = train_test_split(np.arange(len(y)), train_size=size, random_state=seed, stratify=y)
+    return np.sort(idx)
+
+
+def _init_worker(bundle_dir, work_dir):
+    compiled, engine, _ = load_bundle(bundle_dir, verify=False)
+    _worker.update(
+        compiled=compiled, engine=engine,
+        features=np.load(os.path.join(work_dir, "features.npy"), mmap_mode="r"),
+        shap=np.load(os.path.join(work_dir, "shap_values.npy"), mmap_mode="r+"),
+    )
+
+
+def _explain_chunk(start, stop):
+    """Valeurs SHAP des lignes [start, stop), écrites dans la matrice partagée"""
+    begin = time.perf_counter()
+    X = _worker["compiled"].transform(_worker["features"][start:stop])
+    _worker["shap"][start:stop] = _worker["engine"].shap_values(X)
+    _worker["shap"].flush()
+    return time.perf_counter() - begin
+
+
+def explain_global(X, y, bundle_dir=MODEL_BUNDLE_DIR, sample_size=SHAP_SAMPLE_SIZE,
+                   chunk_size=SHAP_CHUNK_SIZE, n_jobs=SHAP_N_JOBS, seed=RANDOM_STATE):
+    """
+    Calcule les valeurs SHAP d'un échantillon stratifié de (X, y) avec le
+    modèle du bundle et les écrit dans <bundle_dir>/explain/ (remplacé
+    d'un bloc à la fin). Renvoie le contenu de explain.json.
+    """
+    start = time.perf_counter()
+    bundle_dir = os.path.abspath(bundle_dir)
+    compiled, engine, manifest = load_bundle(bundle_dir)
+
+    idx = stratified_sample(y, sample_size, seed)
+    features = np.asarray(X[compiled.feature_names] if hasattr(X, "columns") else X,
+                          dtype=np.float64)[idx]
+
+    target = os.path.join(bundle_dir, EXPLAIN_DIR)
+    work_dir = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+
+    try:
+        np.save(os.path.join(work_dir, "features.npy"), features)
+        shap_values = np.lib.format.open_memmap(os.path.join(work_dir, "shap_values.npy"), mode="w+",
+                                                dtype=np.float32, shape=features.shape)
+        del shap_values  # en-tête écrit ; les process remplissent les lignes
+
+        chunks = [(s, min(s + chunk_size, len(idx))) for s in range(0, len(idx), chunk_size)]
+        n_workers = min(len(chunks), n_jobs or os.cpu_count())
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(bundle_dir, work_dir)) as pool:
+            chunk_seconds = list(pool.map(_explain_chunk, *zip(*chunks)))
+
+        summary = {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "bundle_sha256": manifest["sha256"],
+            "feature_names": compiled.feature_names,
+            "expected_value": engine.expected_value,
+            "n_rows": len(idx),
+            "n_source_rows": len(y),
+            "class_counts": {str(c): int(n) for c, n in zip(*np.unique(np.asarray(y)[idx], return_counts=True))},
+            "seed": seed,
+            "n_workers": n_workers,
+            "wall_seconds": time.perf_counter() - start,
+            "chunk_seconds": float(sum(chunk_seconds)),
+        }
+        with open(os.path.join(work_dir, SUMMARY), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        stats = global_summary(summary, features,
+                               np.load(os.path.join(work_dir, "shap_values.npy"), mmap_mode="r"))
+        with open(os.path.join(work_dir, GLOBAL_STATS), "w", encoding="utf-8") as f:
+            json.dump(stats, f, ensure_ascii=False)
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(work_dir, target)
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+
+    print(f"SHAP global : {len(idx)} lignes en {summary['wall_seconds']:.1f}s "
+          f"({len(chunks)} blocs, {n_workers} process, somme des blocs {summary['chunk_seconds']:.1f}s)")
+    return summary
+
+
+# ======================
+# Statistiques agrégées
+# ======================
+def _dependence(x, phi, n_bins):
+    """
+    Courbe de dépendance : SHAP moyen par valeur de la feature (feature
+    discrète, au plus n_bins valeurs) ou par intervalle [edges[i], edges[i + 1])
+    aux quantiles. Les valeurs manquantes forment un groupe à part.
+    """
+    missing = np.isnan(x)
+    present, phi_present = x[~missing], phi[~missing]
+
+    curve = {"kind": "bins", "edges": [], "mean_shap": [], "count": []}
+    if len(present):
+        values = np.unique(present)
+        if len(values) <= n_bins:
+            curve = {"kind": "values", "values": [float(v) for v in values]}
+            bins = np.searchsorted(values, present)
+            n = len(values)
+        else:
+            edges = np.unique(np.quantile(present, np.linspace(0, 1, n_bins + 1)))
+            curve = {"kind": "bins", "edges": [float(e) for e in edges]}
+            bins = np.clip(np.searchsorted(edges, present, side="right") - 1, 0, len(edges) - 2)
+            n = len(edges) - 1
+
+        count = np.bincount(bins, minlength=n)
+        total = np.bincount(bins, weights=phi_present, minlength=n)
+        curve["mean_shap"] = [float(t / c) if c else None for t, c in zip(total, count)]
+        curve["count"] = [int(c) for c in count]
+
+    curve["missing"] = {"count": int(missing.sum()),
+                        "mean_shap": float(phi[missing].mean()) if missing.any() else None}
+    return curve
+
+
+def global_summary(summary, features, values, n_bins=SHAP_DEPENDENCE_BINS):
+    """
+    Statistiques globales par feature, triées par |SHAP| moyen décroissant :
+    |SHAP| moyen, SHAP moyen, quantiles des valeurs SHAP et courbe de dépendance.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    features = np.asarray(features, dtype=np.float64)
+
+    mean_abs = np.abs(values).mean(axis=0)
+    mean = values.mean(axis=0)
+    quantiles = np.quantile(values, QUANTILES, axis=0)
+
+    stats = [
+        {
+            "feature": name,
+            "mean_abs_shap": float(mean_abs[j]),
+            "mean_shap": float(mean[j]),
+            "shap_quantiles": {f"p{round(q * 100):02d}": float(quantiles[i, j]) for i, q in enumerate(QUANTILES)},
+            "dependence": _dependence(features[:, j], values[:, j], n_bins),
+        }
+        for j, name in enumerate(summary["feature_names"])
+    ]
+    stats.sort(key=lambda s: -s["mean_abs_shap"])
+
+    return {
+        "bundle_sha256": summary["bundle_sha256"],
+        "created_at": summary["created_at"],
+        "n_rows": summary["n_rows"],
+        "expected_value": summary["expected_value"],
+        "features": stats,
+    }
+
+
+def load_global(bundle_dir=MODEL_BUNDLE_DIR):
+    """(résumé, features, valeurs SHAP) d'une explication globale, mappés en mémoire"""
+    path = os.path.join(bundle_dir, EXPLAIN_DIR)
+    with open(os.path.join(path, SUMMARY), encoding="utf-8") as f:
+        summary = json.load(f)
+    features = np.load(os.path.join(path, "features.npy"), mmap_mode="r")
+    shap_values = np.load(os.path.join(path, "shap_values.npy"), mmap_mode="r")
+    return summary, features, shap_values
+
+
+if __name__ == "__main__":
+    from explain import render_global
+    from prepare import load_data
+
+    X_train, _, y_train, _ = load_data()
+    explain_global(X_train, y_train)
+    for path in render_global():
+        print(f"Écrit : {path}")
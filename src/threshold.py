@@ -0,0 +1,104 @@
+"""
+Seuil de décision et niveaux de risque à partir des coûts métier.
+
+Un défaut accordé (faux négatif) coûte COST_FN, un bon client refusé
+(faux positif) COST_FP. Les probabilités (hors-pli de la validation
+croisée, ou du jeu de test) sont triées une seule fois par ordre
+décroissant : refuser les k premiers clients donne, par sommes cumulées,
+les faux positifs et faux négatifs de tous les seuils en une passe
+vectorisée. Le seuil retenu minimise le coût total.
+
+Le résultat (decision_policy) est enregistré dans le manifeste du bundle,
+section "decision" ; l'API et le scoring par lots (src/score.py) y lisent
+leur seuil et leurs niveaux de risque.
+"""
+import numpy as np
+
+try:  # importé comme src.threshold (API, dashboard) ou threshold (scripts de src/)
+    from src.config import COST_FN, COST_FP, LOW_RISK_DEFAULT_RATE
+except ImportError:
+    from config import COST_FN, COST_FP, LOW_RISK_DEFAULT_RATE
+
+# Politique d'un bundle sans section "decision" (ou d'un ancien pickle)
+DEFAULT_DECISION = {"threshold": 0.5, "risk_bands": [0.2, 0.5]}
+
+# Libellés des niveaux de risque, dans l'ordre des intervalles de risk_bands
+RISK_LEVELS = ("Faible", "Moyen", "Élevé")
+
+
+def _sorted_counts(y_true, proba):
+    """
+    Trie les probabilités (ordre décroissant) et renvoie (seuils, k, tp, n_pos) :
+    refuser les clients de probabilité > seuils[i] refuse les k[i] premiers,
+    dont tp[i] défauts. Un point par seuil distinct, de 0 à n refus.
+    """
+    proba = np.asarray(proba, dtype=np.float64).ravel() + 0.0  # -0.0 -> 0.0
+    y_true = np.asarray(y_true).ravel()
+    if proba.shape != y_true.shape or not len(proba):
+        raise ValueError("y_true et proba doivent être non vides et de même taille")
+    if not (proba.min() >= 0 and proba.max() <= 1):
+        raise ValueError("Les probabilités doivent être comprises entre 0 et 1 (sans NaN)")
+
+    # Un float positif garde son ordre vu comme entier : la cible est rangée
+    # dans le bit de poids faible et un seul np.sort (sans argsort) suffit
+    keys = (proba.view(np.uint64) << np.uint64(1)) | (y_true != 0).astype(np.uint64)
+    keys = np.sort(keys)[::-1]
+    scores = (keys >> np.uint64(1)).view(np.float64)
+    tp = np.concatenate(([0], np.cumsum(keys & np.uint64(1))))
+
+    # Ne garder que les k où le score change (les ex aequo sont refusés ensemble)
+    k = np.concatenate(([0], np.flatnonzero(scores[1:] < scores[:-1]) + 1, [len(scores)]))
+    thresholds = np.append(scores, np.nextafter(scores[-1], -np.inf))[k]
+    return thresholds, k, tp[k], int(tp[-1])
+
+
+def cost_curve(y_true, proba, cost_fn=COST_FN, cost_fp=COST_FP):
+    """
+    Coût total pour chaque seuil distinct (décision : refus si proba > seuil).
+    Renvoie un dict de tableaux : threshold, cost, fn, fp.
+    """
+    thresholds, k, tp, n_pos = _sorted_counts(y_true, proba)
+    fn = n_pos - tp
+    fp = k - tp
+    return {"threshold": thresholds, "cost": cost_fn * fn + cost_fp * fp, "fn": fn, "fp": fp}
+
+
+def _low_risk_bound(thresholds, k, tp, n_pos, n_rows, threshold, low_default_rate):
+    """
+    Plus grand seuil s (<= threshold) tel que les clients de probabilité <= s
+    aient un taux de défaut observé <= low_default_rate (0 si aucun).
+    """
+    accepted = n_rows - k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = (n_pos - tp) / accepted
+    ok = (accepted > 0) & (rate <= low_default_rate) & (thresholds <= threshold)
+    return float(max(thresholds[np.argmax(ok)], 0.0)) if ok.any() else 0.0
+
+
+def decision_policy(y_true, proba, cost_fn=COST_FN, cost_fp=COST_FP,
+                    low_default_rate=LOW_RISK_DEFAULT_RATE, source=None):
+    """
+    Seuil de coût minimal et niveaux de risque, en un seul tri.
+    risk_bands = [borne "Faible", borne "Élevé"] : proba <= borne basse -> Faible,
+    proba > seuil de décision -> Élevé (crédit refusé), Moyen entre les deux.
+    """
+    thresholds, k, tp, n_pos = _sorted_counts(y_true, proba)
+    n_rows = len(np.ravel(proba))
+    cost = cost_fn * (n_pos - tp) + cost_fp * (k - tp)
+
+    best = int(np.argmin(cost))
+    threshold = float(min(max(thresholds[best], 0.0), 1.0))
+    low = _low_risk_bound(thresholds, k, tp, n_pos, n_rows, threshold, low_default_rate)
+
+    return {
+        "threshold": threshold,
+        "risk_bands": [low, threshold],
+        "cost_fn": cost_fn,
+        "cost_fp": cost_fp,
+        "low_risk_default_rate": low_default_rate,
+        "expected_cost": float(cost[best] / n_rows),
+        "false_negatives": int(n_pos - tp[best]),
+        "false_positives": int(k[best] - tp[best]),
+        "n_rows": n_rows,
+        "source": source,
+    }
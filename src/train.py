@@ -1,18 +1,78 @@
+import time
+
+import mlflow
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import GradientBoostingClassifier
-from config import N_ESTIMATORS, RANDOM_STATE
-
-def train_model(X_train, y_train):
-    pipeline = Pipeline([
-        ("imputer", SimpleImputer()),
-        ("scaler", StandardScaler()),
-        ("model", GradientBoostingClassifier(
-            n_estimators=N_ESTIMATORS,
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
+from config import (N_ESTIMATORS, RANDOM_STATE, MODEL_BACKEND, LEARNING_RATE, HIST_MAX_ITER,
+                    HIST_MAX_LEAF_NODES, HIST_MAX_DEPTH, HIST_EARLY_STOPPING, VALIDATION_FRACTION,
+                    N_ITER_NO_CHANGE, HIST_IMPUTE)
+
+BACKENDS = ("gb", "hist")
+
+
+def build_pipeline(backend=MODEL_BACKEND, params=None):
+    """
+    Pipeline non entraîné du moteur choisi :
+    - "gb"   : imputer + scaler + GradientBoostingClassifier (mono-thread)
+    - "hist" : HistGradientBoostingClassifier (multi-thread, NaN gérés
+               nativement, arrêt anticipé sur un jeu de validation interne)
+    `params` remplace des hyperparamètres du modèle (ex. issus de tune.py).
+    """
+    pipeline = _default_pipeline(backend)
+    if params:
+        pipeline.set_params(**{f"model__{k}": v for k, v in params.items()})
+    return pipeline
+
+
+def _default_pipeline(backend):
+    if backend == "gb":
+        return Pipeline([
+            ("imputer", SimpleImputer()),
+            ("scaler", StandardScaler()),
+            ("model", GradientBoostingClassifier(
+                n_estimators=N_ESTIMATORS,
+                learning_rate=LEARNING_RATE,
+                random_state=RANDOM_STATE
+            ))
+        ])
+
+    if backend == "hist":
+        # Les arbres n'ont besoin ni de standardisation ni d'imputation
+        steps = [("imputer", SimpleImputer())] if HIST_IMPUTE else []
+        steps.append(("model", HistGradientBoostingClassifier(
+            max_iter=HIST_MAX_ITER,
+            max_leaf_nodes=HIST_MAX_LEAF_NODES,
+            max_depth=HIST_MAX_DEPTH,
+            learning_rate=LEARNING_RATE,
+            early_stopping=HIST_EARLY_STOPPING,
+            validation_fraction=VALIDATION_FRACTION,
+            n_iter_no_change=N_ITER_NO_CHANGE,
             random_state=RANDOM_STATE
-        ))
-    ])
+        )))
+        return Pipeline(steps)
+
+    raise ValueError(f"Moteur d'entraînement inconnu : '{backend}' (attendu : {', '.join(BACKENDS)})")
+
+
+def train_model(X_train, y_train, backend=MODEL_BACKEND, params=None):
+    pipeline = build_pipeline(backend, params)
 
+    start = time.perf_counter()
     pipeline.fit(X_train, y_train)
+    train_seconds = time.perf_counter() - start
+
+    model = pipeline.named_steps["model"]
+    n_iter = getattr(model, "n_iter_", None) or getattr(model, "n_estimators_", None)
+    print(f"Entraînement ({backend}) : {train_seconds:.2f}s, {n_iter} itérations")
+
+    # Compromis temps / AUC : comparé dans MLflow avec les métriques d'évaluation
+    if mlflow.active_run():
+        mlflow.log_param("backend", backend)
+        mlflow.log_params({f"model__{k}": v for k, v in model.get_params().items()
+                           if isinstance(v, (int, float, str, bool)) or v is None})
+        mlflow.log_metric("train_seconds", train_seconds)
+        mlflow.log_metric("n_iter", n_iter)
+
     return pipeline
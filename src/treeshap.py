@@ -0,0 +1,238 @@
+"""
+TreeSHAP exact (variante "path dependent", comme shap.TreeExplainer)
+à partir de tables précalculées par feuille.
+
+Pour une feuille, la contribution SHAP ne dépend de x qu'à travers un
+motif de bits : pour chaque feature distincte du chemin racine → feuille,
+x suit-il ou non toutes les branches de ce chemin. Les arbres étant peu
+profonds, on précalcule au chargement du modèle la contribution de chaque
+feuille pour chacun des 2^D motifs possibles. Expliquer une ligne revient
+alors à calculer des motifs, lire une table et sommer par feature.
+
+Le moteur travaille sur les features transformées (après imputation et
+standardisation), comme TreeExplainer appliqué au modèle final.
+"""
+from math import factorial
+
+import numpy as np
+
+# Au-delà, la table (2^D motifs par feuille) devient trop volumineuse
+# (et les motifs ne tiennent plus sur 16 bits)
+MAX_PATH_FEATURES = 12
+
+# Taille visée (lignes x emplacements) des blocs de calcul
+CHUNK_ELEMENTS = 1 << 16
+
+
+class TreeShapEngine:
+    """Valeurs SHAP exactes et top-k vectorisés pour un CompiledModel"""
+
+    # Tableaux dans l'ordre du constructeur (voir to_arrays / from_arrays)
+    ARRAY_FIELDS = ("edge_feature", "edge_threshold", "edge_left", "edge_missing_left",
+                    "edge_slot", "slot_feature", "tables")
+
+    def __init__(self, n_features, expected_value, edge_feature, edge_threshold,
+                 edge_left, edge_missing_left, edge_slot, slot_feature, tables,
+                 input_dtype="float32"):
+        self.n_features = int(n_features)
+        self.expected_value = float(expected_value)
+        self.input_dtype = np.dtype(input_dtype)
+
+        # Arêtes des chemins racine → feuille, complétées jusqu'à E arêtes
+        # (les arêtes de complément ont edge_slot = -1 et sont toujours suivies)
+        self.edge_feature = edge_feature
+        self.edge_threshold = edge_threshold
+        self.edge_left = edge_left
+        self.edge_missing_left = edge_missing_left
+        self.edge_slot = edge_slot
+
+        # Feature de chaque emplacement (n_features = emplacement vide)
+        # et contributions précalculées : tables[feuille, motif, emplacement]
+        self.slot_feature = slot_feature
+        self.tables = tables
+
+        n_patterns, n_slots = tables.shape[1:]
+        self._full_mask = n_patterns - 1
+
+        # Tables d'arêtes transposées (E, L) : une tranche contiguë par rang d'arête
+        self._edge_feature_t = np.ascontiguousarray(edge_feature.T)
+        self._edge_threshold_t = np.ascontiguousarray(edge_threshold.T)
+        self._edge_left_t = np.ascontiguousarray(edge_left.T)
+        self._edge_missing_left_t = np.ascontiguousarray(edge_missing_left.T)
+        self._edge_bit_t = np.ascontiguousarray(
+            np.where(edge_slot >= 0, np.left_shift(1, np.maximum(edge_slot, 0)), 0).T
+        ).astype(np.uint16)
+
+        # Emplacements occupés, triés par feature : la lecture des tables
+        # produit directement des colonnes groupées, sommées par reduceat
+        leaf, slot = np.nonzero(slot_feature < self.n_features)
+        order = np.argsort(slot_feature[leaf, slot], kind="stable")
+        leaf, slot = leaf[order], slot[order]
+
+        self._n_slots = n_slots
+        self._flat_tables = tables.ravel()
+        self._col_leaf = leaf
+        self._col_base = leaf * n_patterns * n_slots + slot
+        self._features, self._starts = np.unique(slot_feature[leaf, slot], return_index=True)
+
+        # Lignes traitées par bloc : les tableaux intermédiaires restent en cache
+        self._chunk_rows = max(1, CHUNK_ELEMENTS // max(1, len(leaf)))
+
+    # ======================
+    # Construction
+    # ======================
+    @classmethod
+    def from_compiled(cls, compiled):
+        """Précalcule les tables de chemins de tous les arbres d'un CompiledModel"""
+        leaves = []
+        for root in compiled.roots:
+            leaves.extend(_leaf_paths(compiled, int(root)))
+
+        n_leaves = len(leaves)
+        max_edges = max(1, max(len(edges) for _, edges in leaves))
+        max_slots = max(1, max(len({compiled.feature[n] for n, _ in edges}) for _, edges in leaves))
+        if max_slots > MAX_PATH_FEATURES:
+            raise ValueError(f"Chemins trop longs pour TreeSHAP tabulé ({max_slots} features distinctes)")
+
+        edge_node = np.zeros((n_leaves, max_edges), dtype=np.intp)
+        edge_left = np.zeros((n_leaves, max_edges), dtype=bool)
+        edge_slot = np.full((n_leaves, max_edges), -1, dtype=np.intp)
+        slot_feature = np.full((n_leaves, max_slots), compiled.n_features, dtype=np.intp)
+        zero_fraction = np.ones((n_leaves, max_slots))
+        leaf_value = np.empty(n_leaves)
+
+        for l, (leaf, edges) in enumerate(leaves):
+            leaf_value[l] = compiled.value[leaf]
+            slots = {}
+            for e, (node, went_left) in enumerate(edges):
+                f = compiled.feature[node]
+                slot = slots.setdefault(f, len(slots))
+                child = compiled.left[node] if went_left else compiled.right[node]
+
+                edge_node[l, e] = node
+                edge_left[l, e] = went_left
+                edge_slot[l, e] = slot
+                slot_feature[l, slot] = f
+                zero_fraction[l, slot] *= compiled.cover[child] / compiled.cover[node]
+
+        # Valeur attendue : toutes les features "absentes" (x suit les covers)
+        expected_value = compiled.init_raw + np.sum(leaf_value * zero_fraction.prod(axis=1))
+
+        return cls(
+            compiled.n_features,
+            expected_value,
+            compiled.feature[edge_node],
+            compiled.threshold[edge_node],
+            edge_left,
+            compiled.missing_left[edge_node],
+            edge_slot,
+            slot_feature,
+            _shapley_tables(leaf_value, zero_fraction),
+            compiled.input_dtype,
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        """Reconstruit le moteur à partir de to_arrays() (tables non copiées)"""
+        return cls(meta["n_features"], meta["expected_value"],
+                   *(arrays[f] for f in cls.ARRAY_FIELDS), meta["input_dtype"])
+
+    def to_arrays(self):
+        """Tableaux NumPy et métadonnées JSON suffisant à reconstruire le moteur"""
+        arrays = {f: getattr(self, f) for f in self.ARRAY_FIELDS}
+        meta = {"n_features": self.n_features, "expected_value": self.expected_value,
+                "input_dtype": self.input_dtype.name}
+        return arrays, meta
+
+    # ======================
+    # Explications
+    # ======================
+    def shap_values(self, X):
+        """Valeurs SHAP (log-odds) pour une matrice transformée (n, n_features)"""
+        X = np.atleast_2d(np.asarray(X, dtype=self.input_dtype))
+        phi = np.zeros((len(X), self.n_features))
+
+        for start in range(0, len(X), self._chunk_rows):
+            stop = start + self._chunk_rows
+            self._shap_chunk(X[start:stop], phi[start:stop])
+        return phi
+
+    def top_k(self, X, k=5):
+        """
+        Les k contributions de plus fort impact absolu par ligne,
+        sans trier l'ensemble des features.
+        Renvoie (indices, valeurs), chacun de forme (n, k).
+        """
+        values = self.shap_values(X)
+        k = min(k, self.n_features)
+
+        magnitude = np.abs(values)
+        idx = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(magnitude, idx, axis=1), axis=1, kind="stable")
+        idx = np.take_along_axis(idx, order, axis=1)
+
+        return idx, np.take_along_axis(values, idx, axis=1)
+
+    def _shap_chunk(self, X, out):
+        # Arête non suivie par x ? (entrées float32 ou float64 selon le modèle, comme sklearn)
+        x = X[:, self._edge_feature_t]
+        went_left = x <= self._edge_threshold_t
+        if np.isnan(X).any():
+            went_left |= np.isnan(x) & self._edge_missing_left_t
+        missed = went_left != self._edge_left_t
+
+        # Motif : bit à 1 si x suit toutes les arêtes de l'emplacement
+        failed = np.zeros((len(X), missed.shape[2]), dtype=np.uint16)
+        for e in range(missed.shape[1]):
+            failed |= missed[:, e] * self._edge_bit_t[e]
+        offset = (self._full_mask & ~failed).astype(np.intp) * self._n_slots
+
+        # Lecture des contributions (colonnes groupées par feature) puis somme
+        values = self._flat_tables[self._col_base + offset[:, self._col_leaf]]
+        out[:, self._features] = np.add.reduceat(values, self._starts, axis=1)
+
+
+def _leaf_paths(compiled, root):
+    """Liste des (feuille, [(nœud, branche gauche ?), ...]) d'un arbre"""
+    paths = []
+    stack = [(root, [])]
+    while stack:
+        node, edges = stack.pop()
+        left, right = compiled.left[node], compiled.right[node]
+        if left == node:
+            paths.append((node, edges))
+            continue
+        stack.append((right, edges + [(node, False)]))
+        stack.append((left, edges + [(node, True)]))
+    return paths
+
+
+def _shapley_tables(leaf_value, zero_fraction):
+    """
+    Contributions de Shapley de chaque feuille pour les 2^D motifs.
+
+    Pour une feuille de valeur v, le jeu est v * Π_{j∈S} s_j * Π_{j∉S} r_j
+    (s_j : x suit le chemin pour la feature j, r_j : fraction de cover).
+    φ_i = v (s_i - r_i) Σ_m w(m, D) c_m, où c_m est le coefficient de t^m
+    de Π_{j≠i} (r_j + s_j t). Les emplacements vides (r = s = 1) sont des
+    joueurs nuls : ils ne modifient pas les valeurs des autres features.
+    """
+    n_leaves, D = zero_fraction.shape
+    patterns = np.arange(2 ** D)
+    s = ((patterns[:, None] >> np.arange(D)) & 1).astype(np.float64)   # (P, D)
+    r = zero_fraction[:, None, :]                                         # (L, 1, D)
+    weights = np.array([factorial(m) * factorial(D - m - 1) / factorial(D) for m in range(D)])
+
+    tables = np.empty((n_leaves, len(patterns), D))
+    for i in range(D):
+        coef = np.zeros((n_leaves, len(patterns), D))
+        coef[..., 0] = 1.0
+        for j in range(D):
+            if j == i:
+                continue
+            shifted = np.zeros_like(coef)
+            shifted[..., 1:] = coef[..., :-1]
+            coef = r[..., j, None] * coef + s[None, :, j, None] * shifted
+        tables[..., i] = leaf_value[:, None] * (s[None, :, i] - r[..., i]) * (coef @ weights)
+
+    return tables
@@ -0,0 +1,177 @@
+"""
+Recherche d'hyperparamètres par successive halving, en parallèle.
+
+Au premier tour, TUNE_N_CANDIDATES configurations tirées au hasard sont
+entraînées sur une petite part du train ; seul le meilleur tiers
+(1/TUNE_FACTOR, AUC sur un jeu de validation) passe au tour suivant,
+avec TUNE_FACTOR fois plus de lignes, jusqu'à ce qu'il n'en reste qu'une
+(le dernier tour sur tout le jeu n'a lieu que s'il reste plusieurs
+configurations à départager). Les mauvais essais sont ainsi abandonnés tôt. Les essais d'un tour tournent dans un pool de process ;
+les données ne sont envoyées qu'une fois à chaque process (initializer).
+
+Chaque essai est logué comme run MLflow imbriqué dans le run courant.
+"""
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import mlflow
+import numpy as np
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from threadpoolctl import threadpool_limits
+from config import (MODEL_BACKEND, RANDOM_STATE, HIST_MAX_DEPTH, TUNE_N_CANDIDATES,
+                    TUNE_FACTOR, TUNE_VALIDATION_SIZE, TUNE_N_JOBS)
+from train import build_pipeline, train_model
+
+# Données des process du pool (renseignées par _init_worker)
+_data = {}
+
+
+def _log_uniform(rng, low, high):
+    return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+
+
+def sample_candidates(backend=MODEL_BACKEND, n=TUNE_N_CANDIDATES, seed=RANDOM_STATE):
+    """Tire n configurations dans l'espace de recherche du moteur"""
+    rng = np.random.default_rng(seed)
+    candidates = []
+    for _ in range(n):
+        if backend == "gb":
+            params = {
+                "learning_rate": _log_uniform(rng, 0.02, 0.3),
+                "n_estimators": int(rng.integers(50, 301)),
+                "max_depth": int(rng.integers(2, 6)),
+                "subsample": float(rng.uniform(0.6, 1.0)),
+            }
+        elif backend == "hist":
+            params = {
+                "learning_rate": _log_uniform(rng, 0.02, 0.3),
+                "max_leaf_nodes": int(rng.integers(15, 64)),
+                "max_depth": int(rng.integers(3, HIST_MAX_DEPTH + 1)),
+                "min_samples_leaf": int(rng.integers(10, 201)),
+                "l2_regularization": _log_uniform(rng, 1e-3, 10.0),
+            }
+        else:
+            raise ValueError(f"Moteur d'entraînement inconnu : '{backend}'")
+        candidates.append(params)
+    return candidates
+
+
+def _stratified_order(y, seed):
+    """Permutation dont chaque préfixe respecte la proportion des classes"""
+    rng = np.random.default_rng(seed)
+    perm = rng.permutation(len(y))
+    y_perm = np.asarray(y)[perm]
+
+    position = np.empty(len(y))
+    for c in np.unique(y_perm):
+        mask = y_perm == c
+        position[mask] = (np.arange(mask.sum()) + 0.5) / mask.sum()
+    return perm[np.argsort(position, kind="stable")]
+
+
+def _init_worker(X_fit, y_fit, X_val, y_val):
+    # Un thread OpenMP / BLAS par process : le parallélisme vient du pool
+    threadpool_limits(1)
+    _data.update(X_fit=X_fit, y_fit=y_fit, X_val=X_val, y_val=y_val)
+
+
+def _run_trial(trial_id, backend, params, n_rows):
+    """Entraîne une configuration sur les n_rows premières lignes et la note"""
+    start = time.perf_counter()
+    try:
+        pipeline = build_pipeline(backend, params)
+        pipeline.fit(_data["X_fit"][:n_rows], _data["y_fit"][:n_rows])
+        auc = roc_auc_score(_data["y_val"], pipeline.predict_proba(_data["X_val"])[:, 1])
+        error = None
+    except Exception as e:  # essai en échec : éliminé au tour suivant
+        auc, error = float("nan"), f"{type(e).__name__}: {e}"
+
+    return {"trial": trial_id, "params": params, "n_rows": n_rows, "auc": auc,
+            "seconds": time.perf_counter() - start, "error": error}
+
+
+def successive_halving(X, y, backend=MODEL_BACKEND, candidates=None,
+                       factor=TUNE_FACTOR, n_jobs=TUNE_N_JOBS, seed=RANDOM_STATE):
+    """
+    Successive halving sur (X, y) : un jeu de validation stratifié est mis de
+    côté, les tours utilisent des préfixes stratifiés du reste.
+    Renvoie (meilleurs paramètres, liste des essais, durée totale en s).
+    """
+    candidates = candidates if candidates is not None else sample_candidates(backend, seed=seed)
+    X, y = np.asarray(X), np.asarray(y)
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X, y, test_size=TUNE_VALIDATION_SIZE, random_state=seed, stratify=y
+    )
+    order = _stratified_order(y_fit, seed)
+    X_fit, y_fit = X_fit[order], y_fit[order]
+
+    n_rounds = 1
+    while factor ** n_rounds <= len(candidates):
+        n_rounds += 1
+    min_rows = max(1, len(X_fit) // factor ** (n_rounds - 1))
+
+    trials = []
+    survivors = list(enumerate(candidates))
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count(), initializer=_init_worker,
+                             initargs=(X_fit, y_fit, X_val, y_val)) as pool:
+        # Arrêt dès qu'il ne reste qu'une configuration : tune_model la
+        # réentraîne de toute façon sur tout le train
+        rnd = 0
+        while len(survivors) > 1:
+            n_rows = len(X_fit) if rnd == n_rounds - 1 else min_rows * factor ** rnd
+            futures = [pool.submit(_run_trial, i, backend, params, n_rows) for i, params in survivors]
+            results = [f.result() for f in futures]
+            for r in results:
+                r["round"] = rnd
+            trials.extend(results)
+
+            # Les NaN (essais en échec) sont classés en dernier
+            results.sort(key=lambda r: -r["auc"] if r["auc"] == r["auc"] else math.inf)
+            keep = max(1, len(results) // factor)
+            survivors = [(r["trial"], r["params"]) for r in results[:keep]]
+            print(f"Tour {rnd} : {len(results)} essais sur {n_rows} lignes, "
+                  f"meilleure AUC {results[0]['auc']:.4f}")
+            rnd += 1
+
+    return survivors[0][1], trials, time.perf_counter() - start
+
+
+def _log_trials(trials, backend):
+    """Un run MLflow imbriqué par essai (dans le run courant)"""
+    for t in trials:
+        with mlflow.start_run(run_name=f"trial-{t['trial']}-round-{t['round']}", nested=True):
+            mlflow.log_param("backend", backend)
+            mlflow.log_params(t["params"])
+            mlflow.log_params({"round": t["round"], "n_rows": t["n_rows"]})
+            mlflow.log_metric("trial_seconds", t["seconds"])
+            if t["error"] is None:
+                mlflow.log_metric("val_auc", t["auc"])
+            else:
+                mlflow.set_tag("error", t["error"])
+
+
+def tune_model(X_train, y_train, backend=MODEL_BACKEND, candidates=None, n_jobs=TUNE_N_JOBS):
+    """
+    Recherche les hyperparamètres puis réentraîne la meilleure configuration
+    sur tout le train (train_model). Renvoie (pipeline, meilleurs paramètres).
+    """
+    best, trials, wall = successive_halving(X_train, y_train, backend, candidates, n_jobs=n_jobs)
+
+    # Accélération : somme des durées d'essais (recherche en série) / durée réelle
+    serial = sum(t["seconds"] for t in trials)
+    print(f"Recherche : {len(trials)} essais en {wall:.1f}s "
+          f"(série estimée {serial:.1f}s, accélération x{serial / wall:.1f})")
+    print("Meilleurs paramètres :", best)
+
+    if mlflow.active_run():
+        _log_trials(trials, backend)
+        mlflow.log_params({f"best__{k}": v for k, v in best.items()})
+        mlflow.log_metrics({"tune_seconds": wall, "tune_serial_seconds": serial,
+                            "tune_speedup": serial / wall, "tune_trials": len(trials)})
+
+    return train_model(X_train, y_train, backend=backend, params=best), best
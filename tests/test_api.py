@@ -3,6 +3,8 @@ import pytest
 from fastapi.testclient import TestClient
 import sys
 import os
+import subprocess
+import json
 from unittest.mock import patch, MagicMock
 import joblib
 import pandas as pd
@@ -143,3 +145,497 @@ class TestAPISchema:
         with pytest.raises(ValidationError):
             ClientData(age=-5, income=50000, loan_amount=25000,
                       credit_history=10, employment_years=8)
+
+
+class TestBatchEndpoint:
+    """Tests du endpoint de prédiction par lot"""
+
+    def test_batch_json_array(self, client_data_valid):
+        """Un tableau JSON renvoie une prédiction par client"""
+        payload = [client_data_valid, dict(client_data_valid, EXT_SOURCE_1=0.1)]
+
+        response = client.post("/predict/batch", json=payload)
+
+        assert response.status_code == 200
+        predictions = response.json()["predictions"]
+        assert len(predictions) == 2
+        for pred in predictions:
+            assert 0 <= pred["probabilite_defaut"] <= 1
+            assert pred["decision"] in ["ACCORDÉ", "REFUSÉ"]
+            assert len(pred["facteurs_principaux"]) == 5
+
+    def test_batch_ndjson_matches_single_predict(self, client_data_valid):
+        """Le format NDJSON donne les mêmes résultats que /predict, dans l'ordre"""
+        import json
+
+        clients = [dict(client_data_valid, EXT_SOURCE_2=v) for v in (0.05, 0.5, 0.95)]
+        body = "\n".join(json.dumps(c) for c in clients)
+
+        response = client.post(
+            "/predict/batch",
+            content=body,
+            headers={"content-type": "application/x-ndjson"}
+        )
+
+        assert response.status_code == 200
+        predictions = response.json()["predictions"]
+        for c, pred in zip(clients, predictions):
+            single = client.post("/predict", json=c).json()
+            assert pred["probabilite_defaut"] == pytest.approx(single["probabilite_defaut"])
+            assert pred["decision"] == single["decision"]
+
+    def test_batch_without_explanation(self, client_data_valid):
+        """explain=false : mêmes probabilités, sans facteurs SHAP ni mise en cache"""
+        payload = [dict(client_data_valid, AMT_CREDIT=v) for v in (111111.0, 222222.0)]
+
+        lean = client.post("/predict/batch", params={"explain": "false"}, json=payload).json()["predictions"]
+        full = client.post("/predict/batch", json=payload).json()["predictions"]
+
+        assert [p["facteurs_principaux"] for p in lean] == [[], []]
+        assert all(len(p["facteurs_principaux"]) == 5 for p in full)
+        assert [p["probabilite_defaut"] for p in lean] == [p["probabilite_defaut"] for p in full]
+
+    def test_batch_invalid_item(self, client_data_valid, client_data_invalid):
+        """Un client invalide est signalé avec son index"""
+        response = client.post("/predict/batch", json=[client_data_valid, client_data_invalid])
+
+        assert response.status_code == 422
+        assert response.json()["detail"]["index"] == 1
+
+    def test_batch_requires_array(self, client_data_valid):
+        """Un objet seul n'est pas accepté"""
+        response = client.post("/predict/batch", json=client_data_valid)
+
+        assert response.status_code == 422
+
+    def test_predict_batch_chunking(self, client_data_valid):
+        """Le découpage en blocs ne change pas les résultats"""
+        from api.utils import predict_batch
+
+        clients = [dict(client_data_valid, AMT_CREDIT=100000.0 * i) for i in range(1, 8)]
+
+        assert predict_batch(clients, chunk_size=3) == predict_batch(clients, chunk_size=100)
+
+
+class TestDecisionPolicy:
+    """Seuil de décision et niveaux de risque lus dans le manifeste du bundle"""
+
+    def test_default_policy(self, client_data_valid):
+        """Sans section "decision", seuil 0.5 et niveau de risque cohérent"""
+        pred = client.post("/predict", json=client_data_valid).json()
+
+        assert pred["decision"] == ("REFUSÉ" if pred["probabilite_defaut"] > 0.5 else "ACCORDÉ")
+        assert pred["niveau_risque"] in ["Faible", "Moyen", "Élevé"]
+
+    def test_threshold_from_bundle(self, client_data_valid, tmp_path):
+        """Le seuil et les bornes du manifeste pilotent décision et niveau de risque"""
+        from src.bundle import save_bundle
+        import api.utils as utils
+
+        proba = client.post("/predict", json=client_data_valid).json()["probabilite_defaut"]
+        bundle = str(tmp_path / "bundle")
+        save_bundle(utils.registry.current.compiled, bundle, extra={
+            "decision": {"threshold": proba / 2, "risk_bands": [proba / 4, proba / 2]}
+        })
+
+        try:
+            utils.load_model(bundle)
+            single = client.post("/predict", json=client_data_valid).json()
+            batch = client.post("/predict/batch", json=[client_data_valid]).json()["predictions"][0]
+        finally:
+            utils.load_model()
+
+        for pred in (single, batch):
+            assert pred["decision"] == "REFUSÉ"
+            assert pred["niveau_risque"] == "Élevé"
+        assert utils.registry.current.decision == utils.DEFAULT_DECISION
+
+
+class TestCompactInput:
+    """Tests du format tableau compact et de l'encodage des réponses"""
+
+    def test_predict_array_matches_object(self, client_data_valid):
+        """Un tableau dans l'ordre de /predict/fields donne la même prédiction que l'objet"""
+        fields = client.get("/predict/fields").json()["fields"]
+        payload = dict(client_data_valid, AMT_CREDIT=345678.0)
+
+        as_object = client.post("/predict", json=payload)
+        as_array = client.post("/predict", json=[payload[f] for f in fields])
+
+        assert as_array.status_code == 200
+        assert as_array.json() == as_object.json()
+        assert as_array.headers["content-type"] == "application/json"
+
+    def test_predict_array_wrong_length(self, client_data_valid):
+        """Tableau incomplet : 422, erreurs localisées dans le corps"""
+        response = client.post("/predict", json=list(client_data_valid.values())[:3])
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][0] == "body"
+
+    def test_batch_mixed_formats(self, client_data_valid):
+        """/predict/batch accepte objets et tableaux compacts dans le même lot"""
+        fields = client.get("/predict/fields").json()["fields"]
+
+        response = client.post("/predict/batch", json=[client_data_valid, [client_data_valid[f] for f in fields]])
+
+        first, second = response.json()["predictions"]
+        assert first == second
+
+    @pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+    def test_non_finite_values_same_on_both_endpoints(self, client_data_valid, value):
+        """NaN / Infinity : /predict et /predict/batch (JSON et NDJSON) répondent pareil"""
+        body = json.dumps(dict(client_data_valid, EXT_SOURCE_1=value)).encode()
+        headers = {"Content-Type": "application/json"}
+
+        single = client.post("/predict", content=body, headers=headers)
+        batch = client.post("/predict/batch", content=b"[" + body + b"]", headers=headers)
+        ndjson = client.post("/predict/batch", content=body + b"\n",
+                             headers={"Content-Type": "application/x-ndjson"})
+
+        assert single.status_code == batch.status_code == ndjson.status_code == 200
+        assert batch.json()["predictions"][0] == single.json()
+        assert ndjson.json()["predictions"][0] == single.json()
+
+    @pytest.mark.parametrize("path, body", [
+        ("/predict", b'{"EXT_SOURCE_1": NaN}'),
+        ("/predict", b'[Infinity, 0.5]'),
+        ("/counterfactual", b'{"EXT_SOURCE_1": -Infinity}'),
+        ("/predict/batch", b'[{"EXT_SOURCE_1": NaN}]'),
+    ])
+    def test_invalid_payload_with_non_finite_values(self, path, body):
+        """Client invalide contenant NaN / Infinity : 422 (valeur reçue non renvoyée), pas 500"""
+        response = client.post(path, content=body, headers={"Content-Type": "application/json"})
+
+        assert response.status_code == 422
+        detail = response.json()["detail"]
+        errors = detail["errors"] if path == "/predict/batch" else detail
+        assert errors and all("input" not in err for err in errors)
+
+
+class TestCounterfactual:
+    """Tests du endpoint /counterfactual"""
+
+    def test_declined_client(self, client_data_valid):
+        """Client refusé : montants modifiés qui font accorder le crédit, vérifiés par /predict"""
+        declined = dict(client_data_valid, EXT_SOURCE_1=0.1, EXT_SOURCE_2=0.3, EXT_SOURCE_3=0.3,
+                        AMT_GOODS_PRICE=450000.0, AMT_CREDIT=500000.0, DAYS_BIRTH=-9000.0,
+                        DAYS_EMPLOYED=-500.0, NAME_FAMILY_STATUS_Married=0, OCCUPATION_TYPE_Laborers=1)
+
+        response = client.post("/counterfactual", json=declined)
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["decision"] == "REFUSÉ" and result["candidats_evalues"] > 0
+        counterfactual = result["contrefactuel"]
+        assert counterfactual["decision"] == "ACCORDÉ"
+        assert counterfactual["probabilite_defaut"] <= result["seuil"]
+
+        changes = {m["feature"]: m["nouvelle_valeur"] for m in counterfactual["modifications"]}
+        assert changes and set(changes) <= {"AMT_CREDIT", "AMT_ANNUITY", "AMT_GOODS_PRICE"}
+        for m in counterfactual["modifications"]:
+            assert m["valeur_actuelle"] == declined[m["feature"]]
+            assert m["variation"] == pytest.approx((m["nouvelle_valeur"] - m["valeur_actuelle"]) / m["valeur_actuelle"])
+        pred = client.post("/predict", json=dict(declined, **changes)).json()
+        assert pred["probabilite_defaut"] == pytest.approx(counterfactual["probabilite_defaut"])
+
+    def test_accepted_client(self, client_data_valid):
+        """Client déjà accepté : aucune modification, aucun candidat évalué"""
+        accepted = dict(client_data_valid, EXT_SOURCE_1=0.9, EXT_SOURCE_2=0.9, EXT_SOURCE_3=0.9)
+
+        result = client.post("/counterfactual", json=accepted).json()
+
+        assert result["decision"] == "ACCORDÉ"
+        assert result["contrefactuel"]["modifications"] == []
+        assert result["candidats_evalues"] == 0
+
+    def test_no_counterfactual(self, client_data_valid):
+        """Aucune modification dans la limite autorisée : contrefactuel nul"""
+        declined = dict(client_data_valid, EXT_SOURCE_1=0.1, EXT_SOURCE_2=0.1, EXT_SOURCE_3=0.1,
+                        DAYS_EMPLOYED=-500.0, NAME_FAMILY_STATUS_Married=0, OCCUPATION_TYPE_Laborers=1)
+
+        with patch("api.utils.COUNTERFACTUAL_MAX_CHANGE", 0.05):
+            result = client.post("/counterfactual", json=declined).json()
+
+        assert result["decision"] == "REFUSÉ"
+        assert result["contrefactuel"] is None
+
+    def test_no_actionable_feature(self, client_data_valid):
+        """Modèle sans aucun des montants modifiables : contrefactuel nul, pas d'erreur 500"""
+        from functools import partial
+        from src.counterfactual import search
+
+        declined = dict(client_data_valid, EXT_SOURCE_1=0.1, EXT_SOURCE_2=0.1, EXT_SOURCE_3=0.1)
+        with patch("api.utils.search_counterfactual", partial(search, features=("INCONNUE",))):
+            response = client.post("/counterfactual", json=declined)
+
+        assert response.status_code == 200
+        assert response.json()["contrefactuel"] is None
+        assert response.json()["candidats_evalues"] == 0
+
+
+class TestGlobalExplanation:
+    """Tests du endpoint /explain/global (statistiques précalculées)"""
+
+    @pytest.fixture(scope="class")
+    def explained_bundle(self, tmp_path_factory):
+        """Bundle du modèle servi avec son explication globale"""
+        from src.bundle import save_bundle
+        from shap_job import explain_global
+        import api.utils as utils
+
+        client.post("/predict/batch", json=[])  # modèle chargé
+        bundle = str(tmp_path_factory.mktemp("explained") / "bundle")
+        compiled = utils.registry.current.compiled
+        save_bundle(compiled, bundle)
+
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(600, compiled.n_features))
+        explain_global(X, rng.integers(0, 2, 600), bundle, sample_size=400, n_jobs=1)
+        return bundle
+
+    def test_served_with_etag(self, explained_bundle):
+        """Statistiques servies depuis la mémoire, revalidées par ETag (304)"""
+        import api.utils as utils
+
+        try:
+            utils.load_model(explained_bundle)
+            with patch("treeshap.TreeShapEngine.shap_values", side_effect=AssertionError("calcul SHAP")):
+                response = client.get("/explain/global")
+                etag = response.headers["etag"]
+                revalidated = client.get("/explain/global", headers={"If-None-Match": etag})
+                changed = client.get("/explain/global", headers={"If-None-Match": '"autre"'})
+        finally:
+            utils.load_model()
+
+        assert response.status_code == 200
+        features = response.json()["features"]
+        assert len(features) == utils.registry.current.compiled.n_features
+        assert [f["mean_abs_shap"] for f in features] == sorted((f["mean_abs_shap"] for f in features), reverse=True)
+        assert revalidated.status_code == 304 and revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+        assert changed.status_code == 200
+
+    def test_missing_explanation(self):
+        """Bundle sans explication globale : 404"""
+        client.post("/predict/batch", json=[])
+
+        assert client.get("/explain/global").status_code == 404
+
+    def test_stale_explanation_is_ignored(self, explained_bundle):
+        """Une explication calculée pour un autre modèle n'est pas servie"""
+        from api.utils import read_global_explanation
+
+        assert read_global_explanation(explained_bundle, {"sha256": "autre"}) is None
+        assert read_global_explanation(explained_bundle) is not None
+
+
+class TestPredictionCache:
+    """Tests du cache des prédictions"""
+
+    def test_repeated_payload_is_served_from_cache(self, client_data_valid):
+        """Un payload équivalent (ordre des champs, entier / flottant) est un hit"""
+        import api.utils as utils
+
+        payload = dict(client_data_valid, AMT_CREDIT=777777.0)
+        first = client.post("/predict", json=payload).json()
+        before = client.get("/predict/cache/stats").json()
+        batched = client.get("/predict/stats").json()["requests"]
+
+        reordered = dict(reversed(list(dict(payload, AMT_CREDIT=777777).items())))
+        with patch.object(utils.registry.current.compiled, "predict_proba_one",
+                          side_effect=AssertionError("recalcul")):
+            second = client.post("/predict", json=reordered).json()
+
+        stats = client.get("/predict/cache/stats").json()
+        assert second == first
+        assert stats["hits"] == before["hits"] + 1
+        assert client.get("/predict/stats").json()["requests"] == batched
+
+    def test_batch_scores_only_misses(self, client_data_valid):
+        """/predict/batch ne score que les clients absents du cache, dans l'ordre"""
+        from api.utils import predict_batch
+
+        clients = [dict(client_data_valid, AMT_ANNUITY=1000.0 * i) for i in range(1, 6)]
+        expected = predict_batch(clients[:3])
+        before = client.get("/predict/cache/stats").json()
+
+        results = predict_batch(clients)
+
+        stats = client.get("/predict/cache/stats").json()
+        assert results[:3] == expected
+        assert stats["hits"] == before["hits"] + 3
+        assert stats["misses"] == before["misses"] + 2
+
+    def test_invalidated_on_model_reload(self, client_data_valid):
+        """Un modèle rechargé arrive avec un cache vide"""
+        import api.utils as utils
+
+        client.post("/predict", json=client_data_valid)
+        assert client.get("/predict/cache/stats").json()["size"] > 0
+
+        utils.load_model()
+
+        stats = client.get("/predict/cache/stats").json()
+        assert stats["size"] == 0 and stats["hits"] == 0
+        assert utils.cached_prediction(client_data_valid) is None
+
+
+class TestAdminReload:
+    """Tests du rechargement à chaud via /admin/reload"""
+
+    def test_requires_token(self):
+        """Sans jeton configuré ou avec un mauvais jeton : 403"""
+        assert client.post("/admin/reload").status_code == 403
+        with patch("main.ADMIN_TOKEN", "secret"):
+            response = client.post("/admin/reload", headers={"X-Admin-Token": "autre"})
+
+        assert response.status_code == 403
+
+    def test_reload(self, client_data_valid):
+        """Le modèle est remplacé, les prédictions restent identiques"""
+        import api.utils as utils
+
+        payload = dict(client_data_valid, AMT_CREDIT=555555.0)
+        before = client.post("/predict", json=payload).json()
+        model, reloads = utils.registry.current, utils.model_status()["reloads"]
+
+        with patch("main.ADMIN_TOKEN", "secret"):
+            response = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == 200
+        assert response.json()["reloads"] == reloads + 1
+        assert utils.registry.current is not model
+        assert client.post("/predict", json=payload).json() == before
+
+    def test_reload_in_progress(self):
+        """Un rechargement déjà en cours : 409"""
+        import api.utils as utils
+
+        with patch("main.ADMIN_TOKEN", "secret"), utils.registry._reload_lock:
+            response = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == 409
+
+
+class TestMetricsEndpoint:
+    """Tests du endpoint /metrics"""
+
+    def test_stage_timings(self, client_data_valid):
+        """Une prédiction alimente requêtes, étapes du scoring et taille des lots"""
+        from api.metrics import BATCH_SIZE, REQUESTS, STAGE_SECONDS
+
+        stages = ("validation", "featurization", "inference", "explanation", "serialization")
+        before = {stage: STAGE_SECONDS.count(stage=stage)[0] for stage in stages}
+        requests = REQUESTS.value(endpoint="/predict", method="POST", status="200")
+        batches = BATCH_SIZE.count(source="batch")[0]
+
+        client.post("/predict", json=dict(client_data_valid, AMT_CREDIT=123457.0))
+        client.post("/predict/batch", json=[dict(client_data_valid, AMT_CREDIT=123458.0)])
+
+        assert all(STAGE_SECONDS.count(stage=stage)[0] >= before[stage] + 2 for stage in stages)
+        assert REQUESTS.value(endpoint="/predict", method="POST", status="200") == requests + 1
+        assert BATCH_SIZE.count(source="batch")[0] == batches + 1
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'credit_api_stage_duration_seconds_bucket{stage="inference",le="+Inf"}' in response.text
+        assert 'credit_api_model_info{version="' in response.text
+
+    def test_shap_failure_is_counted(self, client_data_valid):
+        """Une explication en échec est comptée ; la prédiction est renvoyée sans facteurs"""
+        from api.metrics import SHAP_FAILURES
+
+        before = SHAP_FAILURES.value(error="RuntimeError")
+        with patch("api.utils._top_factors", side_effect=RuntimeError("SHAP")):
+            response = client.post("/predict", json=dict(client_data_valid, AMT_CREDIT=123459.0))
+
+        assert response.status_code == 200
+        assert response.json()["facteurs_principaux"] == []
+        assert SHAP_FAILURES.value(error="RuntimeError") == before + 1
+        assert 'credit_api_shap_failures_total{error="RuntimeError"}' in client.get("/metrics").text
+
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from api.main import app
+from fastapi.testclient import TestClient
+imported = time.perf_counter() - start
+heavy = [m for m in ("sklearn", "shap", "pandas", "joblib") if m in sys.modules]
+with TestClient(app) as c:
+    live = c.get("/health/live").status_code
+    live_at = time.perf_counter() - start
+    while c.get("/health/ready").status_code != 200:
+        time.sleep(0.01)
+    ready_at = time.perf_counter() - start
+    status = c.get("/health/ready").json()
+heavy_after = [m for m in ("sklearn", "shap", "pandas", "joblib") if m in sys.modules]
+print(json.dumps({"imported": imported, "heavy": heavy, "live": live, "live_at": live_at,
+                  "ready_at": ready_at, "status": status, "heavy_after": heavy_after}))
+"""
+
+
+class TestStartup:
+    """Tests du démarrage à froid et des sondes de santé"""
+
+    def test_cold_start(self):
+        """Les sondes répondent avant la fin du chargement du modèle"""
+        out = subprocess.run(
+            [sys.executable, "-c", COLD_START_SCRIPT],
+            cwd=ROOT, capture_output=True, text=True, check=True, timeout=120
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"Import {result['imported']:.3f}s, vivant {result['live_at']:.3f}s, "
+              f"prêt {result['ready_at']:.3f}s")
+
+        # Aucun import lourd avant le chargement en arrière-plan
+        assert result["heavy"] == []
+        assert result["live"] == 200
+        assert result["live_at"] < 5
+        assert result["live_at"] <= result["ready_at"]
+        assert result["status"]["status"] == "ready"
+        assert result["status"]["load_seconds"] > 0
+
+        # Modèle lu depuis le bundle : sklearn et joblib ne sont jamais importés
+        assert result["status"]["model_sha256"]
+        assert result["heavy_after"] == []
+
+    def test_health_endpoints(self):
+        """Vivacité toujours OK, disponibilité OK une fois le modèle chargé"""
+        client.post("/predict/batch", json=[])
+
+        assert client.get("/health/live").json() == {"status": "alive"}
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+    def test_predict_while_model_unavailable(self, client_data_valid):
+        """Un modèle indisponible renvoie 503 au lieu de bloquer"""
+        from api.utils import ModelNotReadyError
+
+        with patch("api.utils._require_model", side_effect=ModelNotReadyError("chargement")):
+            response = client.post("/predict", json=client_data_valid)
+
+        assert response.status_code == 503
+
+
+class TestMicroBatching:
+    """Tests du micro-batching de /predict"""
+
+    def test_predict_goes_through_batcher(self, client_data_valid):
+        """Les appels à /predict (absents du cache) sont comptés par le micro-batcher"""
+        before = client.get("/predict/stats").json()["requests"]
+
+        import api.utils as utils
+
+        with patch.object(utils.registry.current.cache, "enabled", False):
+            response = client.post("/predict", json=client_data_valid)
+
+        assert response.status_code == 200
+        stats = client.get("/predict/stats").json()
+        assert stats["requests"] == before + 1
+        assert stats["enabled"] is True
@@ -0,0 +1,94 @@
+"""Tests pour le micro-batching asynchrone de /predict"""
+import asyncio
+import pytest
+from api.batcher import MicroBatcher, QueueFullError
+
+
+class RecordingScorer:
+    """Fonction de scoring factice qui mémorise la taille des lots"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, records):
+        self.calls.append(len(records))
+        return [{"id": r["id"], "lot": len(self.calls)} for r in records]
+
+
+def _submit_all(batcher, n):
+    async def run():
+        return await asyncio.gather(*(batcher.submit({"id": i}) for i in range(n)))
+    return asyncio.run(run())
+
+
+class TestMicroBatcher:
+    """Tests du regroupement des requêtes concurrentes"""
+
+    def test_concurrent_calls_share_one_batch(self):
+        """Le premier appel part seul ; ceux arrivés pendant son scoring partagent un lot"""
+        scorer = RecordingScorer()
+        batcher = MicroBatcher(scorer, max_batch_size=64, max_wait_ms=20)
+
+        results = _submit_all(batcher, 10)
+
+        assert scorer.calls == [1, 9]
+        assert [r["id"] for r in results] == list(range(10))
+
+    def test_lone_request_does_not_wait(self):
+        """Sans lot en cours, une requête est scorée sans attendre la fenêtre"""
+        scorer = RecordingScorer()
+        batcher = MicroBatcher(scorer, max_batch_size=64, max_wait_ms=10_000)
+
+        async def run():
+            return await asyncio.wait_for(batcher.submit({"id": 0}), timeout=2)
+
+        assert asyncio.run(run())["id"] == 0
+        assert scorer.calls == [1]
+
+    def test_batches_are_capped(self):
+        """Un lot ne dépasse jamais max_batch_size"""
+        scorer = RecordingScorer()
+        batcher = MicroBatcher(scorer, max_batch_size=4, max_wait_ms=20)
+
+        results = _submit_all(batcher, 10)
+
+        assert scorer.calls == [1, 4, 4, 1]
+        assert [r["id"] for r in results] == list(range(10))
+
+    def test_errors_reach_every_caller(self):
+        """Une erreur de scoring est propagée à toutes les requêtes du lot"""
+        def failing(records):
+            raise ValueError("modèle cassé")
+
+        batcher = MicroBatcher(failing, max_wait_ms=1)
+
+        async def run():
+            return await asyncio.gather(*(batcher.submit({}) for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_queue_limit(self):
+        """Au-delà de max_queue requêtes en attente, la requête est rejetée"""
+        batcher = MicroBatcher(RecordingScorer(), max_batch_size=100, max_wait_ms=20, max_queue=2)
+
+        async def run():
+            return await asyncio.gather(*(batcher.submit({"id": i}) for i in range(4)), return_exceptions=True)
+
+        # La première requête part tout de suite, les deux suivantes remplissent la file
+        results = asyncio.run(run())
+        assert isinstance(results[3], QueueFullError)
+        assert batcher.stats()["rejected"] == 1
+
+    def test_stats(self):
+        """Les compteurs reflètent les lots traités"""
+        batcher = MicroBatcher(RecordingScorer(), max_batch_size=4, max_wait_ms=20)
+
+        _submit_all(batcher, 9)
+        stats = batcher.stats()
+
+        assert stats["requests"] == 9
+        assert stats["batches"] == 3
+        assert stats["mean_batch_size"] == pytest.approx(3)
+        assert stats["max_queue_depth"] == 4
+        assert stats["queue_depth"] == 0
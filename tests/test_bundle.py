@@ -0,0 +1,130 @@
+"""Tests pour le format de bundle du modèle (manifest + tableaux .npy)"""
+import json
+import os
+import pytest
+import numpy as np
+import joblib
+from unittest.mock import patch
+from bundle import BundleError, FORMAT_VERSION, is_bundle, load_bundle, save_bundle
+from compiled import compile_pipeline
+from treeshap import TreeShapEngine
+
+MODEL_PATH = "models/credit_scoring_model.pkl"
+BUNDLE_PATH = "models/credit_scoring_model"
+
+
+@pytest.fixture(scope="module")
+def saved_pipeline():
+    """Pipeline entraîné livré avec le projet"""
+    return joblib.load(MODEL_PATH)
+
+
+@pytest.fixture
+def bundle_dir(saved_pipeline, tmp_path):
+    """Bundle écrit dans un répertoire temporaire"""
+    path = tmp_path / "bundle"
+    save_bundle(compile_pipeline(saved_pipeline), path,
+                config={"random_state": 42}, metrics={"auc": 0.75})
+    return path
+
+
+class TestBundle:
+    """Écriture, relecture et validation des bundles"""
+
+    def test_roundtrip_matches_pipeline(self, saved_pipeline, bundle_dir):
+        """Le modèle relu donne les mêmes probabilités et valeurs SHAP"""
+        compiled = compile_pipeline(saved_pipeline)
+        engine = TreeShapEngine.from_compiled(compiled)
+        loaded, loaded_engine, manifest = load_bundle(bundle_dir)
+
+        X = np.random.default_rng(0).normal(size=(50, compiled.n_features))
+
+        np.testing.assert_array_equal(loaded.predict_proba(X), compiled.predict_proba(X))
+        np.testing.assert_array_equal(loaded_engine.shap_values(loaded.transform(X)),
+                                      engine.shap_values(compiled.transform(X)))
+        assert loaded.feature_names == list(saved_pipeline.feature_names_in_)
+
+    def test_manifest_content(self, bundle_dir):
+        """Le manifeste décrit version, features, configuration, métriques et empreintes"""
+        with open(bundle_dir / "manifest.json") as f:
+            manifest = json.load(f)
+
+        assert is_bundle(bundle_dir)
+        assert manifest["format_version"] == FORMAT_VERSION
+        assert manifest["config"] == {"random_state": 42}
+        assert manifest["metrics"] == {"auc": 0.75}
+        assert len(manifest["sha256"]) == 64
+        assert all(len(spec["sha256"]) == 64 for spec in manifest["arrays"].values())
+
+    def test_arrays_are_memory_mapped(self, bundle_dir):
+        """Les tableaux sont mappés en lecture seule, pas copiés"""
+        compiled, engine, _ = load_bundle(bundle_dir)
+
+        for arr in (compiled.threshold, compiled.mean, engine.tables):
+            assert isinstance(arr, np.memmap)
+            assert not arr.flags.writeable
+
+    def test_hash_is_deterministic(self, saved_pipeline, tmp_path):
+        """Même modèle, même empreinte globale"""
+        compiled = compile_pipeline(saved_pipeline)
+        first = save_bundle(compiled, tmp_path / "a")
+        second = save_bundle(compiled, tmp_path / "b")
+
+        assert first["sha256"] == second["sha256"]
+
+    def test_overwrite_replaces_bundle(self, saved_pipeline, bundle_dir):
+        """Réécrire un bundle le remplace sans laisser de répertoire temporaire"""
+        save_bundle(compile_pipeline(saved_pipeline), bundle_dir, metrics={"auc": 0.8})
+
+        assert load_bundle(bundle_dir)[2]["metrics"] == {"auc": 0.8}
+        assert os.listdir(bundle_dir.parent) == ["bundle"]
+
+    def test_failed_swap_keeps_old_bundle(self, saved_pipeline, bundle_dir):
+        """Un échec au moment du remplacement laisse l'ancien bundle en place"""
+        with patch("bundle.os.replace", side_effect=OSError("disque plein")):
+            with pytest.raises(OSError, match="disque plein"):
+                save_bundle(compile_pipeline(saved_pipeline), bundle_dir, metrics={"auc": 0.8})
+
+        assert load_bundle(bundle_dir)[2]["metrics"] == {"auc": 0.75}
+        assert os.listdir(bundle_dir.parent) == ["bundle"]
+
+    def test_corrupted_array_rejected(self, bundle_dir):
+        """Un tableau modifié après écriture est détecté"""
+        with open(bundle_dir / "model" / "threshold.npy", "r+b") as f:
+            f.seek(-8, os.SEEK_END)
+            f.write(b"\x00" * 8)
+
+        with pytest.raises(BundleError, match="SHA-256"):
+            load_bundle(bundle_dir)
+
+    def test_missing_array_rejected(self, bundle_dir):
+        """Un tableau absent est signalé"""
+        os.remove(bundle_dir / "shap" / "tables.npy")
+
+        with pytest.raises(BundleError, match="manquant"):
+            load_bundle(bundle_dir)
+
+    def test_newer_version_rejected(self, bundle_dir):
+        """Une version de format plus récente n'est pas chargée"""
+        path = bundle_dir / "manifest.json"
+        manifest = json.loads(path.read_text())
+        manifest["format_version"] = FORMAT_VERSION + 1
+        path.write_text(json.dumps(manifest))
+
+        with pytest.raises(BundleError, match="non supportée"):
+            load_bundle(bundle_dir)
+
+    def test_not_a_bundle(self, tmp_path):
+        """Un répertoire sans manifeste n'est pas un bundle"""
+        assert not is_bundle(tmp_path)
+        with pytest.raises(BundleError):
+            load_bundle(tmp_path)
+
+    def test_shipped_bundle_matches_pickle(self, saved_pipeline):
+        """Le bundle livré correspond au pickle livré"""
+        compiled, _, manifest = load_bundle(BUNDLE_PATH)
+        X = np.random.default_rng(1).normal(size=(20, compiled.n_features))
+
+        assert manifest["feature_names"] == list(saved_pipeline.feature_names_in_)
+        np.testing.assert_allclose(compiled.predict_proba(X)[:, 1],
+                                   saved_pipeline.predict_proba(X)[:, 1], atol=1e-12)
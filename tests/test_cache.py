@@ -0,0 +1,77 @@
+"""Tests pour le cache LRU / TTL des prédictions"""
+from unittest.mock import patch
+import numpy as np
+from api.cache import PredictionCache
+
+
+def _key(cache, values, version="v1"):
+    return cache.key(cache.canonical(values), version)
+
+
+class TestPredictionCache:
+    """Tests des clés, de l'éviction LRU, de l'expiration et des compteurs"""
+
+    def test_canonical_key(self):
+        """-0.0 et 0.0, entier et flottant donnent la même clé ; la version du modèle en fait partie"""
+        cache = PredictionCache(max_size=10)
+
+        assert _key(cache, [0.0, 1, 2.5]) == _key(cache, [-0.0, 1.0, 2.5])
+        assert _key(cache, [0.0, 1, 2.5]) != _key(cache, [0.0, 1, 2.6])
+        assert _key(cache, [0.0, 1, 2.5], "v1") != _key(cache, [0.0, 1, 2.5], "v2")
+
+    def test_rounding(self):
+        """Avec arrondi, des valeurs proches partagent la même entrée"""
+        exact = PredictionCache(max_size=10)
+        rounded = PredictionCache(max_size=10, round_decimals=3)
+
+        assert _key(exact, [0.50001]) != _key(exact, [0.50002])
+        assert _key(rounded, [0.50001]) == _key(rounded, [0.50002])
+        np.testing.assert_array_equal(rounded.canonical([0.12345]), [0.123])
+
+    def test_lru_eviction(self):
+        """Plein, le cache évince l'entrée la moins récemment utilisée"""
+        cache = PredictionCache(max_size=2)
+        keys = [_key(cache, [i]) for i in range(3)]
+
+        cache.put(keys[0], {"p": 0})
+        cache.put(keys[1], {"p": 1})
+        cache.get(keys[0])
+        cache.put(keys[2], {"p": 2})
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == {"p": 0}
+        stats = cache.stats()
+        assert stats["evictions"] == 1 and stats["size"] == 2
+        assert stats["hits"] == 2 and stats["misses"] == 1
+
+    def test_ttl_expiration(self):
+        """Une entrée expirée est un miss"""
+        cache = PredictionCache(max_size=10, ttl=60)
+        key = _key(cache, [1.0])
+
+        with patch("api.cache.time.monotonic", return_value=1000.0):
+            cache.put(key, {"p": 1})
+        with patch("api.cache.time.monotonic", return_value=1059.0):
+            assert cache.get(key) == {"p": 1}
+        with patch("api.cache.time.monotonic", return_value=1061.0):
+            assert cache.get(key) is None
+
+        assert cache.stats()["expirations"] == 1
+
+    def test_results_are_copies(self):
+        """Modifier un résultat renvoyé ne modifie pas le cache"""
+        cache = PredictionCache(max_size=10)
+        key = _key(cache, [1.0])
+        cache.put(key, {"p": 1})
+
+        cache.get(key)["p"] = 2
+
+        assert cache.get(key) == {"p": 1}
+
+    def test_disabled(self):
+        """Désactivé, rien n'est mémorisé ni compté"""
+        disabled = PredictionCache(max_size=10, enabled=False)
+        key = _key(disabled, [1.0])
+        disabled.put(key, {"p": 1})
+        assert key is None and disabled.get(key) is None
+        assert disabled.stats()["misses"] == 0
@@ -0,0 +1,82 @@
+"""Tests pour le prédicteur compilé (NumPy pur)"""
+import pytest
+import numpy as np
+import pandas as pd
+import joblib
+from compiled import CompiledModel, compile_pipeline
+from train import train_model
+
+MODEL_PATH = "models/credit_scoring_model.pkl"
+
+
+@pytest.fixture(scope="module")
+def saved_pipeline():
+    """Pipeline entraîné livré avec le projet"""
+    return joblib.load(MODEL_PATH)
+
+
+class TestCompiledModel:
+    """Parité entre le modèle compilé et pipeline.predict_proba"""
+
+    def test_parity_with_trained_pipeline(self, sample_X_y):
+        """Parité sur un pipeline issu de train_model, avec valeurs manquantes"""
+        X, y = sample_X_y
+        X_nan = X.astype(float)
+        X_nan.iloc[::7, 0] = np.nan
+        X_nan.iloc[::5, 4] = np.nan
+
+        pipeline = train_model(X_nan, y)
+        compiled = compile_pipeline(pipeline)
+
+        expected = pipeline.predict_proba(X_nan)
+        np.testing.assert_allclose(compiled.predict_proba(X_nan.to_numpy()), expected, rtol=0, atol=1e-9)
+
+    def test_parity_with_saved_model(self, saved_pipeline):
+        """Parité sur le modèle sauvegardé (toutes les features)"""
+        compiled = compile_pipeline(saved_pipeline)
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(500, compiled.n_features)) * rng.choice([0, 1, 1e5], size=(500, compiled.n_features))
+
+        expected = saved_pipeline.predict_proba(pd.DataFrame(X, columns=saved_pipeline.feature_names_in_))
+        np.testing.assert_allclose(compiled.predict_proba(X), expected, rtol=0, atol=1e-9)
+
+    def test_predict_one_matches_reindex(self, saved_pipeline, client_data_valid):
+        """Un dict partiel est complété par des 0, comme DataFrame.reindex"""
+        compiled = compile_pipeline(saved_pipeline)
+
+        df = pd.DataFrame([client_data_valid]).reindex(columns=saved_pipeline.feature_names_in_, fill_value=0)
+        expected = saved_pipeline.predict_proba(df)[0, 1]
+
+        assert isinstance(compiled, CompiledModel)
+        assert compiled.predict_proba_one(client_data_valid) == pytest.approx(expected, abs=1e-9)
+        assert compiled.predict_proba_one(compiled.feature_vector(client_data_valid)) == pytest.approx(expected, abs=1e-9)
+
+    def test_parity_with_hist_backend(self, sample_X_y):
+        """Parité avec HistGradientBoostingClassifier, NaN compris (float64, missing_go_to_left)"""
+        X, y = sample_X_y
+        X_nan = X.astype(float)
+        X_nan.iloc[::4, 0] = np.nan
+        X_nan.iloc[::3, 5] = np.nan
+
+        pipeline = train_model(X_nan, y, backend="hist")
+        compiled = compile_pipeline(pipeline)
+
+        # NaN aussi sur des features sans NaN à l'entraînement
+        X_test = X_nan.to_numpy().copy()
+        X_test[::6, 2] = np.nan
+
+        expected = pipeline.predict_proba(pd.DataFrame(X_test, columns=X.columns))
+        np.testing.assert_allclose(compiled.predict_proba(X_test), expected, rtol=0, atol=1e-9)
+        for row, proba in zip(X_test[:20], expected[:20, 1]):
+            assert compiled.predict_proba_one(row) == pytest.approx(proba, abs=1e-9)
+
+    def test_unsupported_model(self, sample_X_y):
+        """Un modèle non arborescent est refusé explicitement"""
+        from sklearn.pipeline import Pipeline
+        from sklearn.linear_model import LogisticRegression
+
+        X, y = sample_X_y
+        pipeline = Pipeline([("model", LogisticRegression())]).fit(X, y)
+
+        with pytest.raises(TypeError):
+            compile_pipeline(pipeline)
@@ -0,0 +1,110 @@
+"""Tests pour la recherche contrefactuelle"""
+import itertools
+import pytest
+import numpy as np
+from bundle import load_bundle
+from counterfactual import ACTIONABLE_FEATURES, candidate_values, search
+
+BUNDLE_PATH = "models/credit_scoring_model"
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    """Modèle compilé du bundle livré"""
+    return load_bundle(BUNDLE_PATH)[0]
+
+
+def _client(compiled, **values):
+    """Vecteur de features d'un client refusé par le modèle livré (seuil 0.5)"""
+    data = {
+        "EXT_SOURCE_1": 0.1, "EXT_SOURCE_2": 0.3, "EXT_SOURCE_3": 0.3,
+        "AMT_GOODS_PRICE": 450000.0, "AMT_ANNUITY": 25000.0, "AMT_CREDIT": 500000.0,
+        "DAYS_BIRTH": -9000.0, "DAYS_EMPLOYED": -500.0, "OCCUPATION_TYPE_Laborers": 1,
+    }
+    return compiled.feature_vector({**data, **values})
+
+
+class TestSplitValues:
+    """Tests des seuils de split extraits des arbres"""
+
+    def test_score_constant_between_splits(self, compiled):
+        """Entre deux seuils consécutifs, faire varier la feature ne change pas le score"""
+        x = _client(compiled)
+        i = compiled.feature_names.index("AMT_CREDIT")
+        splits = compiled.split_values("AMT_CREDIT")
+
+        for low, high in zip(splits, splits[1:]):
+            X = np.repeat(x[None, :], 5, axis=0)
+            X[:, i] = np.linspace(low, high, 7)[1:-1]
+            proba = compiled.predict_proba(X)[:, 1]
+            assert np.ptp(proba) == 0
+
+
+class TestSearch:
+    """Tests de la recherche de la plus petite modification"""
+
+    def test_minimal_among_all_candidates(self, compiled):
+        """La solution est acceptée et de coût minimal parmi toutes les combinaisons"""
+        x = _client(compiled)
+        idx = [compiled.feature_names.index(f) for f in ACTIONABLE_FEATURES]
+
+        solution, evaluated = search(compiled, x, 0.5)
+
+        combos = np.array(list(itertools.product(
+            *(candidate_values(compiled, x[i], f) for f, i in zip(ACTIONABLE_FEATURES, idx))
+        )))
+        X = np.repeat(x[None, :], len(combos), axis=0)
+        X[:, idx] = combos
+        accepted = compiled.predict_proba(X)[:, 1] <= 0.5
+        cost = (np.abs(combos - x[idx]) / x[idx]).sum(axis=1)
+
+        assert compiled.predict_proba_one(x) > 0.5
+        assert solution["proba"] <= 0.5
+        assert solution["cost"] == pytest.approx(cost[accepted].min())
+        assert 0 < evaluated < len(combos)
+
+        x_new = x.copy()
+        for name, value in solution["values"].items():
+            x_new[compiled.feature_names.index(name)] = value
+        assert compiled.predict_proba_one(x_new) == pytest.approx(solution["proba"])
+
+    def test_single_feature_matches_dense_sweep(self, compiled):
+        """Sur une feature, aucune valeur plus proche (balayage fin) n'est acceptée"""
+        x = _client(compiled, EXT_SOURCE_3=0.5, EXT_SOURCE_2=0.2)
+        i = compiled.feature_names.index("AMT_GOODS_PRICE")
+
+        solution, _ = search(compiled, x, 0.5, features=["AMT_GOODS_PRICE"])
+
+        value = solution["values"]["AMT_GOODS_PRICE"]
+        sweep = np.arange(x[i] * 0.5, x[i] * 1.5, 50.0)
+        closer = sweep[np.abs(sweep - x[i]) < abs(value - x[i])]
+        X = np.repeat(x[None, :], len(closer), axis=0)
+        X[:, i] = closer
+        assert (compiled.predict_proba(X)[:, 1] > 0.5).all()
+
+    def test_no_solution_within_max_change(self, compiled):
+        """Aucune combinaison ne suffit : None, après avoir scoré toutes les combinaisons"""
+        x = _client(compiled, EXT_SOURCE_2=0.1, EXT_SOURCE_3=0.1)
+
+        solution, evaluated = search(compiled, x, 0.5, max_change=0.1)
+
+        sizes = [len(candidate_values(compiled, x[compiled.feature_names.index(f)], f, 0.1))
+                 for f in ACTIONABLE_FEATURES]
+        assert solution is None
+        assert evaluated == np.prod(sizes) - 1
+
+    def test_nothing_to_change(self, compiled):
+        """Aucune feature modifiable dans le modèle, ou aucun candidat : None sans rien scorer"""
+        x = _client(compiled)
+
+        assert search(compiled, x, 0.0, features=("INCONNUE",)) == (None, 0)
+        assert search(compiled, x, 0.0, features=()) == (None, 0)
+        assert search(compiled, x, 0.0, max_change=0.0) == (None, 0)
+
+    def test_max_candidates(self, compiled):
+        """Au-delà de max_candidates, seules les valeurs les plus proches sont gardées"""
+        x = _client(compiled)
+
+        _, evaluated = search(compiled, x, 0.0, max_candidates=64)
+
+        assert evaluated <= 64
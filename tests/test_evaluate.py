@@ -75,3 +75,45 @@ class TestEvaluateModel:
 
         # Ne devrait pas lever d'exception même avec de mauvais résultats
         evaluate_model(mock_model, X, y)
+
+
+class TestCrossValidateModel:
+    """Tests de la validation croisée stratifiée en parallèle"""
+
+    def test_cv_summary(self, sample_X_y):
+        """Moyenne, écart-type, détail par pli et probabilités hors-pli"""
+        from evaluate import cross_validate_model, METRICS
+
+        X, y = sample_X_y
+        with patch('evaluate.mlflow') as mock_mlflow:
+            summary = cross_validate_model(X, y, backend="gb", params={"n_estimators": 10},
+                                           n_splits=4, n_jobs=2)
+
+        assert len(summary["folds"]) == 4
+        for m in METRICS:
+            assert 0 <= summary["mean"][m] <= 1
+            assert summary["std"][m] >= 0
+        assert all(f["fit_seconds"] > 0 for f in summary["folds"])
+        assert summary["oof_proba"].shape == (len(y),)
+        assert np.all((summary["oof_proba"] >= 0) & (summary["oof_proba"] <= 1))
+
+        logged = {c.args[0] for c in mock_mlflow.log_metric.call_args_list}
+        assert {"cv_auc_mean", "cv_auc_std", "cv_recall_mean", "cv_fold_fit_seconds"} <= logged
+
+    def test_cv_matches_serial_fit(self, sample_X_y):
+        """Un pli calculé en parallèle donne le même score qu'un entraînement direct"""
+        from evaluate import cross_validate_model
+        from sklearn.model_selection import StratifiedKFold
+        from sklearn.metrics import roc_auc_score
+        from train import build_pipeline
+
+        X, y = sample_X_y
+        with patch('evaluate.mlflow'):
+            summary = cross_validate_model(X, y, backend="gb", params={"n_estimators": 10},
+                                           n_splits=3, n_jobs=3, seed=0)
+
+        train_idx, test_idx = next(StratifiedKFold(3, shuffle=True, random_state=0).split(X, y))
+        pipeline = build_pipeline("gb", {"n_estimators": 10}).fit(X.to_numpy(float)[train_idx], y.iloc[train_idx])
+        auc = roc_auc_score(y.iloc[test_idx], pipeline.predict_proba(X.to_numpy(float)[test_idx])[:, 1])
+
+        assert summary["folds"][0]["auc"] == pytest.approx(auc)
@@ -0,0 +1,75 @@
+"""Tests pour la construction des vecteurs de features de l'API"""
+import threading
+import pytest
+import numpy as np
+from api.features import FeatureBuilder
+from bundle import load_bundle
+
+BUNDLE_PATH = "models/credit_scoring_model"
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    """Modèle compilé du bundle livré"""
+    return load_bundle(BUNDLE_PATH)[0]
+
+
+@pytest.fixture(scope="module")
+def builder(compiled):
+    return FeatureBuilder(compiled.feature_names)
+
+
+class TestFeatureBuilder:
+    """Parité avec CompiledModel.feature_vector et tampon par thread"""
+
+    def test_vector_matches_feature_vector(self, compiled, builder, client_data_valid):
+        """Mêmes valeurs que le chemin dict -> vecteur du modèle compilé, 0 ailleurs"""
+        x = builder.vector(client_data_valid)
+
+        np.testing.assert_array_equal(x, compiled.feature_vector(client_data_valid))
+        assert x.dtype == np.float64
+        assert np.count_nonzero(x) <= len(builder.fields)
+
+    def test_buffer_reused(self, builder, client_data_valid):
+        """Un seul tampon par thread : un nouvel appel réécrit les mêmes positions"""
+        first = builder.vector(client_data_valid)
+        second = builder.vector(dict(client_data_valid, AMT_CREDIT=1.0))
+
+        i = builder.positions[builder.fields.index("AMT_CREDIT")]
+        assert first is second
+        assert second[i] == 1.0
+
+    def test_buffer_per_thread(self, builder, client_data_valid):
+        """Chaque thread écrit dans son propre tampon"""
+        vectors = {}
+
+        def build(amount):
+            vectors[amount] = builder.vector(dict(client_data_valid, AMT_CREDIT=amount))
+
+        threads = [threading.Thread(target=build, args=(a,)) for a in (1.0, 2.0)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        i = builder.positions[builder.fields.index("AMT_CREDIT")]
+        assert vectors[1.0] is not vectors[2.0]
+        assert (vectors[1.0][i], vectors[2.0][i]) == (1.0, 2.0)
+
+    def test_matrix_and_missing_fields(self, compiled, builder, client_data_valid):
+        """Matrice d'un lot ; un champ absent vaut 0 (comme feature_vector)"""
+        partial = {k: v for k, v in client_data_valid.items() if k != "EXT_SOURCE_2"}
+        records = [client_data_valid, partial, dict(client_data_valid, EXT_SOURCE_1=0.9)]
+
+        X = builder.matrix(records)
+
+        np.testing.assert_array_equal(X, np.vstack([compiled.feature_vector(r) for r in records]))
+        assert builder.matrix([]).shape == (0, compiled.n_features)
+
+    def test_fields_absent_from_model(self, client_data_valid):
+        """Les champs du schéma inconnus du modèle sont ignorés"""
+        builder = FeatureBuilder(["AMT_CREDIT", "AUTRE"])
+
+        assert builder.fields == ("AMT_CREDIT",)
+        np.testing.assert_array_equal(builder.vector(client_data_valid), [client_data_valid["AMT_CREDIT"], 0.0])
+        np.testing.assert_array_equal(FeatureBuilder(["AUTRE"]).matrix([client_data_valid]), [[0.0]])
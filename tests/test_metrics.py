@@ -0,0 +1,73 @@
+"""Tests pour les métriques au format Prometheus"""
+import pytest
+from unittest.mock import patch
+from api.metrics import Counter, Gauge, Histogram, lap, render, STAGE_SECONDS
+
+
+@pytest.fixture
+def registry():
+    """Registre isolé des métriques de l'API"""
+    return {}
+
+
+class TestMetrics:
+    """Tests des compteurs, histogrammes, jauges et de l'export texte"""
+
+    def test_counter(self, registry):
+        """Un compteur par combinaison de labels, valeurs échappées"""
+        requests = Counter("requests_total", "Requêtes", ("endpoint",), registry=registry)
+        requests.inc(endpoint="/predict")
+        requests.inc(2, endpoint="/predict")
+        requests.inc(endpoint='/a"b')
+
+        text = render(registry)
+
+        assert requests.value(endpoint="/predict") == 3
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{endpoint="/predict"} 3' in text
+        assert 'requests_total{endpoint="/a\\"b"} 1' in text
+
+    def test_histogram(self, registry):
+        """Seaux cumulés (le), somme et nombre d'observations"""
+        latency = Histogram("latency_seconds", "Latence", ("stage",), buckets=(0.1, 1.0), registry=registry)
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value, stage="inference")
+
+        lines = render(registry).splitlines()
+
+        assert 'latency_seconds_bucket{stage="inference",le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{stage="inference",le="1.0"} 3' in lines
+        assert 'latency_seconds_bucket{stage="inference",le="+Inf"} 4' in lines
+        assert 'latency_seconds_sum{stage="inference"} 3.65' in lines
+        assert 'latency_seconds_count{stage="inference"} 4' in lines
+        assert latency.count(stage="inference") == (4, pytest.approx(3.65))
+
+    def test_gauge(self, registry):
+        """Valeur calculée à l'export, avec ou sans labels ; une métrique recréée remplace l'ancienne"""
+        Gauge("queue_depth", "File", lambda: 1, registry=registry)
+        Gauge("queue_depth", "File", lambda: 7, registry=registry)
+        Gauge("model_info", "Modèle", lambda: {("abc",): 1}, ("version",), registry=registry)
+
+        text = render(registry)
+
+        assert text.count("# TYPE queue_depth gauge") == 1
+        assert "queue_depth 7" in text
+        assert 'model_info{version="abc"} 1' in text
+
+    def test_disabled(self, registry):
+        """METRICS_ENABLED=0 : aucune mesure enregistrée"""
+        counter = Counter("calls_total", "Appels", registry=registry)
+        with patch("api.metrics.METRICS_ENABLED", False):
+            counter.inc()
+            lap("inference", 0.0)
+
+        assert counter.value() == 0
+
+    def test_lap(self):
+        """lap enregistre la durée de l'étape et renvoie l'instant de fin"""
+        before = STAGE_SECONDS.count(stage="test")[0]
+
+        end = lap("test", 0.0)
+
+        assert end > 0
+        assert STAGE_SECONDS.count(stage="test")[0] == before + 1
@@ -1,4 +1,5 @@
 """Tests pour le module de préparation des données"""
+import os
 import pytest
 import pandas as pd
 import numpy as np
@@ -66,3 +67,160 @@ class TestLoadData:
         test_indices = set(X_test.index)
 
         assert len(train_indices.intersection(test_indices)) == 0
+
+
+@pytest.fixture
+def csv_path(sample_data, tmp_path):
+    """CSV réel (valeurs manquantes et colonne texte comprises)"""
+    df = sample_data.copy()
+    df.loc[::10, 'EXT_SOURCE_1'] = np.nan
+    df['CODE_GENDER'] = np.where(np.arange(len(df)) < 80, 'F', 'M')
+    path = tmp_path / "data_fe.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+class TestReadDataset:
+    """Tests du chargement par blocs avec types réduits"""
+
+    def test_downcast_dtypes(self, csv_path):
+        """float32 pour les décimaux, int8 pour les indicateurs, category pour le texte"""
+        from prepare import read_dataset
+
+        df = read_dataset(csv_path, chunksize=30)
+
+        assert df['EXT_SOURCE_1'].dtype == np.float32
+        assert df['AMT_CREDIT'].dtype == np.float32
+        assert df['FLAG_DOCUMENT_3'].dtype == np.int8
+        assert df['TARGET'].dtype == np.int8
+        assert isinstance(df['CODE_GENDER'].dtype, pd.CategoricalDtype)
+
+    def test_chunks_match_full_read(self, csv_path):
+        """Lecture par blocs identique (à la précision float32 près) à une lecture complète"""
+        from prepare import read_dataset
+
+        reference = pd.read_csv(csv_path)
+        df = read_dataset(csv_path, chunksize=7)
+
+        assert df.shape == reference.shape
+        assert list(df['CODE_GENDER']) == list(reference['CODE_GENDER'])
+        assert df['CODE_GENDER'].cat.categories.tolist() == ['F', 'M']
+        np.testing.assert_allclose(df['AMT_CREDIT'], reference['AMT_CREDIT'], rtol=1e-6)
+        assert df['EXT_SOURCE_1'].isna().sum() == reference['EXT_SOURCE_1'].isna().sum()
+
+    def test_column_pruning(self, csv_path):
+        """Seules les features demandées et la cible sont lues"""
+        from prepare import read_dataset
+
+        df = read_dataset(csv_path, columns=['AMT_CREDIT', 'EXT_SOURCE_2'])
+
+        assert list(df.columns) == ['EXT_SOURCE_2', 'AMT_CREDIT', 'TARGET']
+
+    def test_unknown_column(self, csv_path):
+        """Une feature absente du fichier est signalée"""
+        from prepare import read_dataset
+
+        with pytest.raises(ValueError, match="Colonnes absentes"):
+            read_dataset(csv_path, columns=['INCONNUE'])
+
+    def test_pyarrow_engine(self, csv_path):
+        """Le moteur pyarrow produit le même résultat que le moteur par blocs"""
+        pytest.importorskip('pyarrow')
+        from prepare import read_dataset
+
+        pd.testing.assert_frame_equal(read_dataset(csv_path, engine='pyarrow'),
+                                      read_dataset(csv_path, chunksize=25))
+
+
+class TestDatasetCache:
+    """Tests du cache Feather du dataset typé"""
+
+    def test_cache_written_then_reused(self, csv_path, tmp_path):
+        """Le premier chargement écrit le cache, le suivant ne relit pas le CSV"""
+        from prepare import load_dataset
+
+        cache_dir = tmp_path / "cache"
+        first = load_dataset(csv_path, columns=None, cache_dir=cache_dir)
+        assert len(list(cache_dir.glob("*.feather"))) == 1
+
+        with patch('prepare.pd.read_csv') as mock_read_csv:
+            second = load_dataset(csv_path, columns=None, cache_dir=cache_dir)
+            assert not mock_read_csv.called
+
+        pd.testing.assert_frame_equal(first, second)
+        assert isinstance(second['CODE_GENDER'].dtype, pd.CategoricalDtype)
+        assert second['AMT_CREDIT'].dtype == np.float32
+
+    def test_column_projection(self, csv_path, tmp_path):
+        """Depuis le cache, seules les colonnes demandées (+ la cible) sont lues"""
+        from prepare import load_dataset
+
+        cache_dir = tmp_path / "cache"
+        load_dataset(csv_path, columns=None, cache_dir=cache_dir)
+        df = load_dataset(csv_path, columns=['AMT_CREDIT'], cache_dir=cache_dir)
+
+        assert list(df.columns) == ['AMT_CREDIT', 'TARGET']
+        with pytest.raises(ValueError, match="Colonnes absentes"):
+            load_dataset(csv_path, columns=['INCONNUE'], cache_dir=cache_dir)
+
+    def test_cold_start_reads_requested_columns(self, csv_path, tmp_path):
+        """Cache absent : seules les colonnes demandées (+ la cible) sont lues du CSV et mises en cache"""
+        from prepare import load_dataset, read_dataset
+
+        cache_dir = tmp_path / "cache"
+        with patch('prepare.read_dataset', wraps=read_dataset) as spy:
+            df = load_dataset(csv_path, columns=['AMT_CREDIT'], cache_dir=cache_dir)
+        assert spy.call_args.kwargs["columns"] == ['AMT_CREDIT']
+        assert list(df.columns) == ['AMT_CREDIT', 'TARGET']
+
+        with patch('prepare.pd.read_csv') as mock_read_csv:
+            cached = load_dataset(csv_path, columns=['AMT_CREDIT'], cache_dir=cache_dir)
+            assert not mock_read_csv.called
+        pd.testing.assert_frame_equal(df, cached)
+
+    def test_cache_keyed_on_columns(self, csv_path, tmp_path):
+        """Un autre jeu de colonnes a son propre fichier ; un fichier qui le contient est réutilisé"""
+        from prepare import load_dataset
+
+        cache_dir = tmp_path / "cache"
+        load_dataset(csv_path, columns=['AMT_CREDIT'], cache_dir=cache_dir)
+        wide = load_dataset(csv_path, columns=['AMT_CREDIT', 'EXT_SOURCE_2'], cache_dir=cache_dir)
+        assert list(wide.columns) == ['EXT_SOURCE_2', 'AMT_CREDIT', 'TARGET']
+        assert len(list(cache_dir.glob("*.feather"))) == 2
+
+        with patch('prepare.pd.read_csv') as mock_read_csv:
+            narrow = load_dataset(csv_path, columns=['EXT_SOURCE_2'], cache_dir=cache_dir)
+            assert not mock_read_csv.called
+        assert list(narrow.columns) == ['EXT_SOURCE_2', 'TARGET']
+        assert len(list(cache_dir.glob("*.feather"))) == 2
+
+    def test_invalidated_when_source_changes(self, csv_path, tmp_path):
+        """Un CSV modifié produit un nouveau cache et l'ancien est supprimé"""
+        from prepare import load_dataset
+
+        cache_dir = tmp_path / "cache"
+        load_dataset(csv_path, columns=None, cache_dir=cache_dir)
+        old = set(cache_dir.glob("*.feather"))
+
+        df = pd.read_csv(csv_path)
+        df['AMT_CREDIT'] = 1.0
+        df.to_csv(csv_path, index=False)
+
+        reloaded = load_dataset(csv_path, columns=None, cache_dir=cache_dir)
+        new = set(cache_dir.glob("*.feather"))
+
+        assert (reloaded['AMT_CREDIT'] == 1.0).all()
+        assert len(new) == 1 and new != old
+
+    def test_touch_keeps_cache(self, csv_path, tmp_path):
+        """Même contenu avec une nouvelle date : même clé de cache"""
+        from prepare import load_dataset
+
+        cache_dir = tmp_path / "cache"
+        load_dataset(csv_path, columns=None, cache_dir=cache_dir)
+        before = set(cache_dir.glob("*.feather"))
+
+        os.utime(csv_path, None)
+        load_dataset(csv_path, columns=None, cache_dir=cache_dir)
+
+        assert set(cache_dir.glob("*.feather")) == before
@@ -0,0 +1,143 @@
+"""Tests pour le registre du modèle (rechargement à chaud)"""
+import threading
+import time
+import pytest
+import numpy as np
+from bundle import load_bundle, save_bundle
+from api.registry import ModelNotReadyError, ModelRegistry, ReloadInProgressError
+
+BUNDLE_PATH = "models/credit_scoring_model"
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    """Modèle compilé du bundle livré"""
+    return load_bundle(BUNDLE_PATH)[0]
+
+
+@pytest.fixture
+def bundle(compiled, tmp_path):
+    """Copie du bundle dans un répertoire temporaire"""
+    path = str(tmp_path / "model")
+    save_bundle(compiled, path)
+    return path
+
+
+def _wait(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+class TestModelRegistry:
+    """Tests du chargement, de la publication et des rechargements"""
+
+    def test_reload_swaps_reference(self, compiled, bundle):
+        """Un rechargement publie un nouveau modèle ; la référence déjà lue reste utilisable"""
+        registry = ModelRegistry(bundle)
+        first = registry.load()
+        first.cache.put(b"cle", {"probabilite_defaut": 0.1})
+
+        save_bundle(compiled, bundle, extra={"decision": {"threshold": 0.3, "risk_bands": [0.1, 0.3]}})
+        second = registry.load()
+
+        assert registry.current is second and second is not first
+        assert second.decision["threshold"] == 0.3
+        assert second.cache.stats()["size"] == 0
+        # Une requête qui a lu l'ancien modèle termine avec lui
+        X = np.zeros((1, compiled.n_features))
+        np.testing.assert_allclose(first.compiled.predict_proba(X), second.compiled.predict_proba(X))
+
+        status = registry.status()
+        assert status["status"] == "ready" and status["reloads"] == 1
+        assert status["version"] == second.version
+
+    def test_failed_reload_keeps_model(self, bundle, tmp_path):
+        """Un artefact illisible laisse l'ancien modèle en service"""
+        registry = ModelRegistry(bundle)
+        model = registry.load()
+
+        with pytest.raises(Exception):
+            registry.load(str(tmp_path / "absent"))
+
+        assert registry.current is model
+        status = registry.status()
+        assert status["status"] == "ready" and status["reloads"] == 0
+        assert status["last_reload_error"]
+
+    def test_first_load_failure(self, tmp_path):
+        """Sans modèle chargé, l'erreur est remontée aux requêtes"""
+        registry = ModelRegistry(str(tmp_path / "absent"), load_timeout=5)
+
+        with pytest.raises(ModelNotReadyError):
+            registry.require()
+        assert registry.status()["status"] == "error"
+
+    def test_one_reload_at_a_time(self, bundle):
+        """Un second rechargement simultané est refusé"""
+        registry = ModelRegistry(bundle)
+        registry.load()
+
+        with registry._reload_lock:
+            with pytest.raises(ReloadInProgressError):
+                registry.load()
+
+    def test_requests_during_reload(self, compiled, bundle):
+        """Les requêtes servies pendant les rechargements ne voient jamais de modèle absent"""
+        registry = ModelRegistry(bundle)
+        registry.load()
+        X = np.zeros(compiled.n_features)
+        stop, errors = threading.Event(), []
+
+        def score():
+            while not stop.is_set():
+                try:
+                    registry.require_nowait().compiled.predict_proba_one(X)
+                except Exception as e:  # pragma: no cover - échec du test
+                    errors.append(e)
+
+        worker = threading.Thread(target=score)
+        worker.start()
+        for _ in range(3):
+            registry.load()
+        stop.set()
+        worker.join()
+
+        assert errors == []
+        assert registry.status()["reloads"] == 3
+
+    def test_watcher_picks_up_new_artifact(self, compiled, bundle):
+        """Un nouveau bundle écrit sur disque est chargé sans appel explicite"""
+        registry = ModelRegistry(bundle, watch_interval=0.05)
+        registry.start()
+        first = registry.require()
+
+        save_bundle(compiled, bundle, extra={"decision": {"threshold": 0.4, "risk_bands": [0.1, 0.4]}})
+        try:
+            assert _wait(lambda: registry.current is not first)
+        finally:
+            registry.stop()
+        assert registry.current.decision["threshold"] == 0.4
+        assert registry.status()["reloads"] == 1
+
+    def test_watcher_picks_up_global_explanation(self, compiled, bundle):
+        """explain/global.json écrit après le bundle (pipeline) : rechargé et servi"""
+        from shap_job import explain_global
+
+        registry = ModelRegistry(bundle, watch_interval=0.05)
+        registry.start()
+        first = registry.require()
+        assert first.global_explanation is None
+
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(300, compiled.n_features))
+        explain_global(X, rng.integers(0, 2, 300), bundle, sample_size=200, n_jobs=1)
+        try:
+            assert _wait(lambda: registry.current is not first)
+        finally:
+            registry.stop()
+        assert registry.current.global_explanation is not None
+        assert registry.current.version == first.version
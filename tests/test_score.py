@@ -0,0 +1,120 @@
+"""Tests pour le scoring d'un fichier par blocs"""
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from bundle import load_bundle, save_bundle
+from score import _csv_tasks, score_file
+
+BUNDLE_PATH = "models/credit_scoring_model"
+
+
+@pytest.fixture(scope="module")
+def model():
+    """(CompiledModel, TreeShapEngine, manifeste) du bundle livré"""
+    return load_bundle(BUNDLE_PATH)
+
+
+@pytest.fixture(scope="module")
+def clients(model):
+    """Clients synthétiques aux colonnes du modèle, avec valeurs manquantes et une colonne texte"""
+    compiled = model[0]
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(2500, compiled.n_features)).round(6), columns=compiled.feature_names)
+    df.iloc[::9, 1] = np.nan
+    df["SK_ID_CURR"] = np.arange(len(df))
+    df["AGENCE"] = "Lyon"
+    return df
+
+
+@pytest.fixture(scope="module")
+def clients_csv(clients, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("score") / "clients.csv")
+    clients.to_csv(path, index=False)
+    return path
+
+
+def _read(path):
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+
+
+class TestCsvTasks:
+    """Tests du découpage d'un CSV en plages d'octets"""
+
+    def test_tasks_cover_whole_lines(self, clients, clients_csv):
+        """Les plages se suivent, couvrent le fichier et finissent en fin de ligne"""
+        columns, tasks = _csv_tasks(clients_csv, 300)
+
+        with open(clients_csv, "rb") as f:
+            data = f.read()
+        assert columns == clients.columns.tolist()
+        assert len(tasks) > 5
+        assert tasks[0][0] == data.index(b"\n") + 1 and tasks[-1][1] == len(data)
+        assert all(a[1] == b[0] for a, b in zip(tasks, tasks[1:]))
+        assert all(data[stop - 1:stop] == b"\n" for _, stop in tasks)
+
+
+class TestScoreFile:
+    """Tests du scoring par blocs"""
+
+    @pytest.mark.parametrize("output, n_jobs", [("scores.parquet", 1), ("scores.csv", 2)])
+    def test_matches_model(self, model, clients, clients_csv, tmp_path, output, n_jobs):
+        """Mêmes probabilités que le modèle, dans l'ordre du fichier, colonnes gardées recopiées"""
+        compiled = model[0]
+        out = str(tmp_path / output)
+
+        summary = score_file(clients_csv, out, BUNDLE_PATH, chunk_size=300, n_jobs=n_jobs,
+                             keep=["SK_ID_CURR", "AGENCE"])
+
+        result = _read(out)
+        expected = compiled.predict_proba(clients[compiled.feature_names].to_numpy())[:, 1]
+        assert summary["n_rows"] == len(clients) and summary["n_tasks"] > 1
+        assert result.columns.tolist() == ["SK_ID_CURR", "AGENCE", "probabilite_defaut", "decision", "niveau_risque"]
+        np.testing.assert_array_equal(result["SK_ID_CURR"], clients["SK_ID_CURR"])
+        np.testing.assert_allclose(result["probabilite_defaut"], expected, rtol=1e-12)
+        assert (result["AGENCE"] == "Lyon").all()
+        np.testing.assert_array_equal(result["decision"] == "REFUSÉ", expected > 0.5)
+        assert not any(name.startswith("scores") and ".tmp" in name for name in os.listdir(tmp_path))
+
+    def test_parquet_input_with_factors(self, model, clients, tmp_path):
+        """Entrée Parquet (un groupe de lignes par tâche) et facteurs SHAP par ligne"""
+        compiled, engine, _ = model
+        path = str(tmp_path / "clients.parquet")
+        clients.iloc[:600].to_parquet(path, row_group_size=250)
+
+        summary = score_file(path, str(tmp_path / "scores.parquet"), BUNDLE_PATH, chunk_size=100,
+                             n_jobs=1, top_k=3)
+
+        result = pd.read_parquet(tmp_path / "scores.parquet")
+        idx, values = engine.top_k(compiled.transform(clients.iloc[:600][compiled.feature_names].to_numpy()), 3)
+        assert summary["n_tasks"] == 3
+        assert result["facteur_1"].tolist() == [compiled.feature_names[j] for j in idx[:, 0]]
+        np.testing.assert_allclose(result[["impact_1", "impact_2", "impact_3"]], values)
+
+    def test_decision_from_manifest(self, model, clients_csv, tmp_path):
+        """Seuil et niveaux de risque lus dans la section "decision" du bundle"""
+        bundle = str(tmp_path / "bundle")
+        save_bundle(model[0], bundle, extra={"decision": {"threshold": 0.0, "risk_bands": [0.0, 0.0]}})
+
+        score_file(clients_csv, str(tmp_path / "scores.csv"), bundle, n_jobs=1)
+
+        result = pd.read_csv(tmp_path / "scores.csv")
+        assert (result["decision"] == "REFUSÉ").all()
+        assert (result["niveau_risque"] == "Élevé").all()
+
+    def test_missing_columns(self, clients, tmp_path):
+        """Un fichier sans toutes les features du modèle est refusé, sans fichier de sortie"""
+        path = str(tmp_path / "partiel.csv")
+        clients.iloc[:10, :5].to_csv(path, index=False)
+
+        with pytest.raises(ValueError, match="Colonnes absentes"):
+            score_file(path, str(tmp_path / "scores.csv"), BUNDLE_PATH, n_jobs=1)
+        assert not os.path.exists(tmp_path / "scores.csv")
+
+    def test_pool_creation_error_is_raised(self, clients_csv, tmp_path):
+        """Une erreur à la création des process remonte telle quelle, sans fichier de sortie"""
+        with patch("score.ProcessPoolExecutor", side_effect=OSError("plus de process")):
+            with pytest.raises(OSError, match="plus de process"):
+                score_file(clients_csv, str(tmp_path / "scores.csv"), BUNDLE_PATH, chunk_size=300, n_jobs=2)
+        assert not os.path.exists(tmp_path / "scores.csv")
@@ -0,0 +1,50 @@
+"""Tests pour le décodage, la validation et l'encodage JSON de l'API"""
+import json
+import pytest
+from unittest.mock import patch
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from api.serialization import CLIENT_FIELDS, dumps, parse_client, validate_client
+
+
+class TestParseClient:
+    """Tests des deux formats d'entrée d'un client"""
+
+    def test_object_and_array_equivalent(self, client_data_valid):
+        """Objet à champs nommés et tableau compact donnent le même enregistrement"""
+        as_object = parse_client(json.dumps(client_data_valid).encode())
+        as_array = parse_client(json.dumps([client_data_valid[f] for f in CLIENT_FIELDS]).encode())
+
+        assert as_object == as_array == client_data_valid
+        assert list(as_array) == list(CLIENT_FIELDS)
+
+    @pytest.mark.parametrize("body", [b"[0.5, 0.6]", b"{\"EXT_SOURCE_1\": 0.5}", b"{invalide", b""])
+    def test_invalid_body(self, body):
+        """Corps incomplet ou mal formé : erreur de validation localisée dans le corps"""
+        with pytest.raises(RequestValidationError) as info:
+            parse_client(body)
+
+        assert all(err["loc"][0] == "body" for err in info.value.errors())
+
+    def test_array_types(self, client_data_valid):
+        """Les champs entiers du tableau refusent une partie décimale"""
+        values = [client_data_valid[f] for f in CLIENT_FIELDS]
+        values[CLIENT_FIELDS.index("FLAG_DOCUMENT_3")] = 0.5
+
+        with pytest.raises(ValidationError):
+            validate_client(values)
+
+
+class TestDumps:
+    """Tests de l'encodage des réponses"""
+
+    def test_json_fallback_same_content(self):
+        """Sans orjson, json produit le même contenu, compact et en UTF-8"""
+        content = {"probabilite_defaut": 0.1234567890123, "decision": "ACCORDÉ",
+                   "facteurs_principaux": [{"feature": "EXT_SOURCE_2", "impact": -1e-05}]}
+
+        with patch("api.serialization.orjson", None):
+            fallback = dumps(content)
+
+        assert json.loads(fallback) == json.loads(dumps(content)) == content
+        assert b" " not in fallback and "ACCORDÉ".encode() in fallback
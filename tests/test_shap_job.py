@@ -0,0 +1,127 @@
+"""Tests pour l'explication globale (valeurs SHAP sur un échantillon)"""
+import os
+import pytest
+import numpy as np
+import pandas as pd
+import joblib
+from unittest.mock import patch
+from bundle import save_bundle
+from compiled import compile_pipeline
+from shap_job import explain_global, global_summary, load_global, stratified_sample
+
+MODEL_PATH = "models/credit_scoring_model.pkl"
+
+
+@pytest.fixture(scope="module")
+def bundle_dir(tmp_path_factory):
+    """Bundle du modèle enregistré dans un répertoire temporaire"""
+    path = str(tmp_path_factory.mktemp("bundle") / "model")
+    save_bundle(compile_pipeline(joblib.load(MODEL_PATH)), path)
+    return path
+
+
+@pytest.fixture
+def scoring_data(bundle_dir):
+    """Clients synthétiques (avec valeurs manquantes) et cible déséquilibrée"""
+    from bundle import read_manifest
+
+    names = read_manifest(bundle_dir)["feature_names"]
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(3000, len(names))), columns=names)
+    X.iloc[::7, 0] = np.nan
+    y = pd.Series((rng.uniform(size=3000) < 0.1).astype(int))
+    return X, y
+
+
+class TestStratifiedSample:
+    """Tests de l'échantillonnage stratifié"""
+
+    def test_preserves_class_ratio(self):
+        """La proportion de chaque classe est conservée"""
+        y = np.r_[np.zeros(9000), np.ones(1000)]
+
+        idx = stratified_sample(y, 1000, seed=0)
+
+        assert len(idx) == 1000 and len(np.unique(idx)) == 1000
+        assert y[idx].mean() == pytest.approx(0.1, abs=0.002)
+        assert np.all(np.diff(idx) > 0)
+
+    def test_small_dataset_is_kept_whole(self):
+        """Un dataset plus petit que l'échantillon est pris en entier"""
+        np.testing.assert_array_equal(stratified_sample(np.array([0, 1, 0]), 10), [0, 1, 2])
+
+
+class TestExplainGlobal:
+    """Tests du calcul parallèle et du stockage de la matrice SHAP"""
+
+    def test_matches_engine(self, bundle_dir, scoring_data):
+        """La matrice stockée correspond au moteur TreeSHAP sur l'échantillon"""
+        from bundle import load_bundle
+
+        X, y = scoring_data
+        summary = explain_global(X, y, bundle_dir, sample_size=1000, chunk_size=300, n_jobs=2)
+        stored_summary, features, values = load_global(bundle_dir)
+
+        compiled, engine, manifest = load_bundle(bundle_dir)
+        idx = stratified_sample(y, 1000)
+        np.testing.assert_array_equal(features, X.to_numpy()[idx])
+        np.testing.assert_allclose(values, engine.shap_values(compiled.transform(features)), atol=1e-5)
+
+        assert isinstance(values, np.memmap)
+        assert stored_summary == summary
+        assert summary["n_rows"] == 1000
+        assert summary["bundle_sha256"] == manifest["sha256"]
+        assert not any(name.startswith("explain.tmp") for name in os.listdir(bundle_dir))
+
+    def test_result_does_not_depend_on_workers(self, bundle_dir, scoring_data):
+        """Même matrice quel que soit le découpage et le nombre de process"""
+        X, y = scoring_data
+
+        explain_global(X, y, bundle_dir, sample_size=500, chunk_size=500, n_jobs=1)
+        serial = np.array(load_global(bundle_dir)[2])
+        explain_global(X, y, bundle_dir, sample_size=500, chunk_size=64, n_jobs=2)
+
+        np.testing.assert_array_equal(load_global(bundle_dir)[2], serial)
+
+    def test_render_without_recomputation(self, bundle_dir, scoring_data):
+        """Graphiques et tableau d'importance sont produits depuis la matrice stockée"""
+        from explain import render_global
+
+        X, y = scoring_data
+        explain_global(X, y, bundle_dir, sample_size=500, n_jobs=1)
+        values = np.asarray(load_global(bundle_dir)[2])
+
+        with patch("treeshap.TreeShapEngine.shap_values", side_effect=AssertionError("recalcul")):
+            paths = render_global(bundle_dir)
+
+        assert all(os.path.getsize(p) > 0 for p in paths)
+        importance = pd.read_csv(paths[-1])
+        assert importance["mean_abs_shap"].iloc[0] == pytest.approx(np.abs(values).mean(axis=0).max())
+
+
+class TestGlobalSummary:
+    """Tests des statistiques agrégées par feature"""
+
+    def test_statistics(self):
+        """|SHAP| moyen, tri, courbes discrète / par intervalles et valeurs manquantes"""
+        rng = np.random.default_rng(0)
+        features = np.c_[rng.normal(size=1000), rng.integers(0, 3, 1000)]
+        features[:50, 0] = np.nan
+        values = np.c_[features[:, 1] * 0.1, np.nan_to_num(features[:, 0]) * 2]
+        summary = {"feature_names": ["continue", "discrete"], "bundle_sha256": "abc",
+                   "created_at": "2026-01-01", "n_rows": 1000, "expected_value": -2.0}
+
+        stats = global_summary(summary, features, values, n_bins=10)
+
+        continuous, discrete = sorted(stats["features"], key=lambda f: f["feature"])
+        assert [f["feature"] for f in stats["features"]] == ["discrete", "continue"]
+        assert discrete["mean_abs_shap"] == pytest.approx(np.abs(values[:, 1]).mean())
+        assert discrete["dependence"]["kind"] == "values"
+        assert discrete["dependence"]["values"] == [0.0, 1.0, 2.0]
+        assert discrete["dependence"]["missing"] == {"count": 0, "mean_shap": None}
+
+        curve = continuous["dependence"]
+        assert curve["kind"] == "bins" and len(curve["edges"]) == len(curve["count"]) + 1
+        assert sum(curve["count"]) == 950
+        assert curve["missing"]["count"] == 50
+        assert continuous["shap_quantiles"]["p50"] == pytest.approx(np.median(values[:, 0]))
@@ -0,0 +1,87 @@
+"""Tests pour le partage des poids du modèle en mémoire partagée"""
+import multiprocessing as mp
+import os
+import pytest
+import numpy as np
+import joblib
+from compiled import compile_pipeline
+from treeshap import TreeShapEngine
+from api.shared_model import attach, publish, shared_manifest
+
+MODEL_PATH = "models/credit_scoring_model.pkl"
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture(scope="module")
+def published():
+    """Modèle compilé publié dans un bloc de mémoire partagée"""
+    compiled = compile_pipeline(joblib.load(MODEL_PATH))
+    engine = TreeShapEngine.from_compiled(compiled)
+    shm = publish(compiled, engine)
+    yield compiled, engine, shm
+    shm.close()
+    shm.unlink()
+
+
+def _score_in_child(shm_name, x, results):
+    import sys
+    sys.path.insert(0, ROOT)
+    from api.shared_model import attach
+
+    compiled, engine, _ = attach(shm_name)
+    results.put((compiled.predict_proba_one(x), engine.shap_values(compiled.transform(x))[0]))
+
+
+class TestSharedModel:
+    """Publication du modèle par le maître et attachement des workers"""
+
+    def test_attach_matches_original(self, published):
+        """Le modèle attaché donne les mêmes prédictions et valeurs SHAP"""
+        compiled, engine, shm = published
+        shared_compiled, shared_engine, _ = attach(shm.name)
+
+        X = np.random.default_rng(0).normal(size=(50, compiled.n_features))
+
+        np.testing.assert_array_equal(shared_compiled.predict_proba(X), compiled.predict_proba(X))
+        np.testing.assert_array_equal(shared_engine.shap_values(compiled.transform(X)),
+                                      engine.shap_values(compiled.transform(X)))
+        assert shared_compiled.feature_names == compiled.feature_names
+
+    def test_attach_is_zero_copy(self, published):
+        """Les tableaux sont des vues en lecture seule sur le bloc partagé"""
+        _, _, shm = published
+        shared_compiled, shared_engine, block = attach(shm.name)
+        buffer = np.frombuffer(block.buf, dtype=np.uint8)
+
+        for arr in (shared_compiled.threshold, shared_compiled.value, shared_engine.tables):
+            assert np.shares_memory(arr, buffer)
+            assert not arr.flags.writeable
+
+    def test_attach_from_another_process(self, published):
+        """Un worker (process séparé) s'attache au bloc et score à l'identique"""
+        compiled, engine, shm = published
+        x = np.random.default_rng(1).normal(size=compiled.n_features)
+
+        ctx = mp.get_context("spawn")
+        results = ctx.Queue()
+        child = ctx.Process(target=_score_in_child, args=(shm.name, x, results))
+        child.start()
+        proba, shap_row = results.get(timeout=60)
+        child.join(timeout=60)
+
+        assert child.exitcode == 0
+        assert proba == compiled.predict_proba_one(x)
+        np.testing.assert_array_equal(shap_row, engine.shap_values(compiled.transform(x))[0])
+
+    def test_manifest_is_published(self, published):
+        """Le manifeste (seuil de décision) accompagne le modèle ; absent pour un pickle"""
+        compiled, engine, shm = published
+        manifest = {"sha256": "abc", "decision": {"threshold": 0.3, "risk_bands": [0.1, 0.3]}}
+
+        block = publish(compiled, engine, manifest=manifest)
+        try:
+            assert shared_manifest(block) == manifest
+            assert shared_manifest(shm) is None
+        finally:
+            block.close()
+            block.unlink()
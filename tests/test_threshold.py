@@ -0,0 +1,108 @@
+"""Tests pour le seuil de décision au coût minimal"""
+import pytest
+import numpy as np
+from threshold import cost_curve, decision_policy
+
+
+@pytest.fixture
+def scored():
+    """Probabilités arrondies (nombreux ex aequo) et cibles corrélées"""
+    rng = np.random.default_rng(0)
+    proba = np.round(rng.uniform(0, 1, 2000), 2)
+    y = (rng.uniform(0, 1, 2000) < proba ** 2).astype(int)
+    return y, proba
+
+
+def _brute_force_cost(y, proba, threshold, cost_fn, cost_fp):
+    refused = proba > threshold
+    return cost_fn * np.sum(~refused & (y == 1)) + cost_fp * np.sum(refused & (y == 0))
+
+
+class TestCostCurve:
+    """Tests de la courbe de coût vectorisée"""
+
+    def test_matches_brute_force(self, scored):
+        """Chaque point de la courbe correspond au coût recalculé au seuil"""
+        y, proba = scored
+
+        curve = cost_curve(y, proba, cost_fn=5, cost_fp=1)
+
+        for t, c in zip(curve["threshold"], curve["cost"]):
+            assert c == _brute_force_cost(y, proba, t, 5, 1)
+
+    def test_one_point_per_distinct_threshold(self, scored):
+        """Les ex aequo forment un seul point, de 0 à n refus"""
+        y, proba = scored
+
+        curve = cost_curve(y, proba)
+
+        assert len(curve["threshold"]) == len(np.unique(proba)) + 1
+        assert curve["fp"][0] == 0 and curve["fn"][0] == y.sum()
+        assert curve["fn"][-1] == 0 and curve["fp"][-1] == (y == 0).sum()
+
+    def test_rejects_mismatched_inputs(self):
+        """Tailles différentes, entrées vides ou hors de [0, 1] : ValueError"""
+        with pytest.raises(ValueError):
+            cost_curve([0, 1], [0.5])
+        with pytest.raises(ValueError):
+            cost_curve([], [])
+        with pytest.raises(ValueError):
+            cost_curve([0, 1], [0.5, np.nan])
+
+
+class TestDecisionPolicy:
+    """Tests du seuil optimal et des niveaux de risque"""
+
+    def test_threshold_minimizes_cost(self, scored):
+        """Aucun seuil candidat ne coûte moins que le seuil retenu"""
+        y, proba = scored
+
+        policy = decision_policy(y, proba, cost_fn=10, cost_fp=1)
+
+        best = _brute_force_cost(y, proba, policy["threshold"], 10, 1)
+        for t in np.unique(np.r_[proba, 0.0, 1.0]):
+            assert best <= _brute_force_cost(y, proba, t, 10, 1)
+        assert policy["expected_cost"] == pytest.approx(best / len(y))
+
+    def test_costlier_defaults_lower_the_threshold(self, scored):
+        """Plus un défaut accordé coûte cher, plus le seuil de refus est bas"""
+        y, proba = scored
+
+        low = decision_policy(y, proba, cost_fn=20, cost_fp=1)["threshold"]
+        high = decision_policy(y, proba, cost_fn=1, cost_fp=1)["threshold"]
+
+        assert low < high
+
+    def test_risk_bands(self, scored):
+        """Le niveau "Faible" respecte le taux de défaut cible, sous le seuil de refus"""
+        y, proba = scored
+
+        policy = decision_policy(y, proba, low_default_rate=0.05, source="test")
+        low, high = policy["risk_bands"]
+
+        assert 0 <= low <= high == policy["threshold"]
+        assert y[proba <= low].mean() <= 0.05
+        assert policy["source"] == "test"
+
+    def test_is_json_serializable(self, scored):
+        """La politique est écrite telle quelle dans le manifeste du bundle"""
+        import json
+
+        y, proba = scored
+
+        policy = decision_policy(y, proba)
+
+        assert json.loads(json.dumps(policy)) == policy
+
+    def test_million_rows_under_a_second(self):
+        """Un million de probabilités traitées en moins d'une seconde"""
+        import time
+
+        rng = np.random.default_rng(1)
+        proba = rng.uniform(0, 1, 1_000_000)
+        y = (rng.uniform(0, 1, 1_000_000) < proba).astype(np.int8)
+
+        start = time.perf_counter()
+        decision_policy(y, proba)
+
+        assert time.perf_counter() - start < 1.0
@@ -74,3 +74,45 @@ class TestTrainModel:
 
         # Le modèle doit quand même détecter les deux classes
         assert len(np.unique(predictions)) > 0
+
+
+class TestHistBackend:
+    """Tests du moteur HistGradientBoostingClassifier"""
+
+    def test_hist_pipeline_without_preprocessing(self, sample_X_y):
+        """Le moteur "hist" n'a ni scaler ni imputer (NaN gérés nativement)"""
+        X, y = sample_X_y
+        X_nan = X.astype(float)
+        X_nan.iloc[::5, 0] = np.nan
+
+        model = train_model(X_nan, y, backend="hist")
+
+        assert [name for name, _ in model.steps] == ["model"]
+        probas = model.predict_proba(X_nan)
+        assert probas.shape == (len(X), 2)
+        assert np.all(np.isfinite(probas))
+
+    def test_hist_early_stopping(self, sample_X_y):
+        """L'arrêt anticipé s'arrête bien avant le plafond d'itérations"""
+        from config import HIST_MAX_ITER
+
+        X, y = sample_X_y
+        model = train_model(X, y, backend="hist")
+
+        assert model.named_steps["model"].n_iter_ < HIST_MAX_ITER
+
+    def test_hist_reproducibility(self, sample_X_y):
+        """Même random_state, mêmes prédictions"""
+        X, y = sample_X_y
+
+        pred1 = train_model(X, y, backend="hist").predict_proba(X)
+        pred2 = train_model(X, y, backend="hist").predict_proba(X)
+
+        np.testing.assert_array_equal(pred1, pred2)
+
+    def test_unknown_backend(self, sample_X_y):
+        """Un moteur inconnu est refusé"""
+        X, y = sample_X_y
+
+        with pytest.raises(ValueError, match="Moteur"):
+            train_model(X, y, backend="xgboost")
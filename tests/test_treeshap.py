@@ -0,0 +1,100 @@
+"""Tests pour le moteur TreeSHAP à tables précalculées"""
+import pytest
+import numpy as np
+import joblib
+import shap
+from compiled import compile_pipeline
+from treeshap import TreeShapEngine
+from train import train_model
+
+MODEL_PATH = "models/credit_scoring_model.pkl"
+
+
+@pytest.fixture(scope="module")
+def saved_pipeline():
+    """Pipeline entraîné livré avec le projet"""
+    return joblib.load(MODEL_PATH)
+
+
+def _random_rows(n_rows, n_features, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n_rows, n_features)) * rng.choice([0, 1, 1e5], size=(n_rows, n_features))
+
+
+class TestTreeShapEngine:
+    """Parité avec shap.TreeExplainer et propriétés des valeurs SHAP"""
+
+    def test_matches_shap_on_saved_model(self, saved_pipeline):
+        """Mêmes valeurs que TreeExplainer sur le modèle sauvegardé"""
+        compiled = compile_pipeline(saved_pipeline)
+        engine = TreeShapEngine.from_compiled(compiled)
+        explainer = shap.TreeExplainer(saved_pipeline.named_steps["model"])
+
+        X = compiled.transform(_random_rows(200, compiled.n_features))
+
+        np.testing.assert_allclose(engine.shap_values(X), explainer.shap_values(X), rtol=0, atol=1e-9)
+        assert engine.expected_value == pytest.approx(float(np.ravel(explainer.expected_value)[0]), abs=1e-9)
+
+    def test_matches_shap_on_trained_pipeline(self, sample_X_y):
+        """Mêmes valeurs que TreeExplainer sur un pipeline issu de train_model"""
+        X, y = sample_X_y
+        pipeline = train_model(X, y)
+        compiled = compile_pipeline(pipeline)
+        engine = TreeShapEngine.from_compiled(compiled)
+        explainer = shap.TreeExplainer(pipeline.named_steps["model"])
+
+        X_t = compiled.transform(X.to_numpy())
+
+        np.testing.assert_allclose(engine.shap_values(X_t), explainer.shap_values(X_t), rtol=0, atol=1e-9)
+
+    def test_matches_shap_on_hist_backend(self, sample_X_y):
+        """Mêmes valeurs que TreeExplainer sur HistGradientBoostingClassifier, NaN compris"""
+        X, y = sample_X_y
+        X_nan = X.astype(float)
+        X_nan.iloc[::4, 0] = np.nan
+
+        pipeline = train_model(X_nan, y, backend="hist")
+        compiled = compile_pipeline(pipeline)
+        engine = TreeShapEngine.from_compiled(compiled)
+        explainer = shap.TreeExplainer(pipeline.named_steps["model"])
+
+        X_t = compiled.transform(X_nan.to_numpy())
+
+        np.testing.assert_allclose(engine.shap_values(X_t), explainer.shap_values(X_t), rtol=0, atol=1e-9)
+        np.testing.assert_allclose(engine.shap_values(X_t).sum(axis=1) + engine.expected_value,
+                                   compiled.raw_predict(X_t), atol=1e-9)
+
+    def test_additivity(self, saved_pipeline):
+        """Somme des contributions + valeur attendue = score brut du modèle"""
+        compiled = compile_pipeline(saved_pipeline)
+        engine = TreeShapEngine.from_compiled(compiled)
+
+        X_t = compiled.transform(_random_rows(50, compiled.n_features, seed=1))
+        raw = compiled.raw_predict(X_t)
+
+        np.testing.assert_allclose(engine.shap_values(X_t).sum(axis=1) + engine.expected_value, raw, atol=1e-9)
+
+    def test_top_k(self, saved_pipeline):
+        """top_k renvoie les k plus forts impacts absolus, triés"""
+        compiled = compile_pipeline(saved_pipeline)
+        engine = TreeShapEngine.from_compiled(compiled)
+
+        X_t = compiled.transform(_random_rows(20, compiled.n_features, seed=2))
+        full = engine.shap_values(X_t)
+        idx, values = engine.top_k(X_t, k=5)
+
+        assert idx.shape == values.shape == (20, 5)
+        np.testing.assert_array_equal(values, np.take_along_axis(full, idx, axis=1))
+        expected = -np.sort(-np.abs(full), axis=1)[:, :5]
+        np.testing.assert_allclose(np.abs(values), expected)
+
+    def test_batch_equals_single_rows(self, saved_pipeline):
+        """Le découpage interne en blocs ne change pas les résultats"""
+        compiled = compile_pipeline(saved_pipeline)
+        engine = TreeShapEngine.from_compiled(compiled)
+
+        X_t = compiled.transform(_random_rows(100, compiled.n_features, seed=3))
+        batch = engine.shap_values(X_t)
+
+        for i in (0, 37, 99):
+            np.testing.assert_allclose(engine.shap_values(X_t[i]), batch[i:i + 1])
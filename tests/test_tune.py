@@ -0,0 +1,76 @@
+"""Tests pour la recherche d'hyperparamètres (successive halving)"""
+import pytest
+import numpy as np
+from unittest.mock import patch
+from sklearn.pipeline import Pipeline
+from tune import _stratified_order, sample_candidates, successive_halving, tune_model
+
+
+@pytest.fixture
+def small_candidates():
+    """9 configurations rapides à entraîner"""
+    return [{"n_estimators": 10, "max_depth": d, "learning_rate": lr}
+            for d in (1, 2, 3) for lr in (0.05, 0.1, 0.3)]
+
+
+class TestTune:
+    """Tests du successive halving et de l'étape de recherche"""
+
+    def test_sample_candidates_reproducible(self):
+        """Même graine, mêmes configurations, dans les bornes de l'espace"""
+        first = sample_candidates("hist", n=10, seed=0)
+        second = sample_candidates("hist", n=10, seed=0)
+
+        assert first == second
+        assert all(0.02 <= c["learning_rate"] <= 0.3 for c in first)
+        with pytest.raises(ValueError):
+            sample_candidates("xgboost", n=1)
+
+    def test_stratified_prefixes(self):
+        """Chaque préfixe de l'ordre garde la proportion de positifs"""
+        y = np.array([1] * 10 + [0] * 90)
+        order = _stratified_order(y, seed=0)
+
+        assert sorted(order) == list(range(100))
+        assert y[order[:20]].sum() == 2
+        assert y[order[:50]].sum() == 5
+
+    def test_halving_rounds(self, sample_X_y, small_candidates):
+        """9 essais, puis 3 ; arrêt au dernier survivant, meilleur du dernier tour"""
+        X, y = sample_X_y
+        best, trials, wall = successive_halving(X, y, "gb", small_candidates, factor=3, n_jobs=2)
+
+        rounds = [t["round"] for t in trials]
+        assert [rounds.count(r) for r in range(3)] == [9, 3, 0]
+        assert trials[-1]["n_rows"] == 3 * trials[0]["n_rows"]
+        assert best == max((t for t in trials if t["round"] == 1), key=lambda t: t["auc"])["params"]
+        assert wall > 0
+
+        # Les survivants d'un tour sont les meilleurs du tour précédent
+        first = sorted((t for t in trials if t["round"] == 0), key=lambda t: -t["auc"])
+        assert {t["trial"] for t in trials if t["round"] == 1} == {t["trial"] for t in first[:3]}
+
+    def test_full_data_round_has_several_candidates(self, sample_X_y, small_candidates):
+        """Dernier tour sur tout le jeu seulement s'il reste plusieurs configurations à départager"""
+        X, y = sample_X_y
+
+        _, trials, _ = successive_halving(X, y, "gb", small_candidates[:6], factor=3, n_jobs=1)
+        full = [t for t in trials if t["round"] == 1]
+        assert len(trials) == 8 and len(full) == 2
+        assert full[0]["n_rows"] > trials[0]["n_rows"]
+
+        best, trials, _ = successive_halving(X, y, "gb", small_candidates[:1], factor=3, n_jobs=1)
+        assert trials == [] and best == small_candidates[0]
+
+    def test_tune_model_logs_nested_runs(self, sample_X_y, small_candidates):
+        """Un run MLflow imbriqué par essai et un pipeline final entraîné"""
+        X, y = sample_X_y
+
+        with patch("tune.mlflow") as mock_mlflow:
+            model, best = tune_model(X, y, "gb", small_candidates, n_jobs=2)
+
+        nested = [c for c in mock_mlflow.start_run.call_args_list if c.kwargs.get("nested")]
+        assert len(nested) == 12
+        assert isinstance(model, Pipeline)
+        assert model.named_steps["model"].max_depth == best["max_depth"]
+        assert model.predict_proba(X).shape == (len(X), 2)